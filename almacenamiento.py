@@ -0,0 +1,311 @@
+"""
+Almacenamiento Persistente - Blockchain Educativo
+=================================================
+Registro de bloques en disco, solo de anexado, con índice de offsets
+
+Componentes:
+- Segmentos de datos donde cada bloque se escribe una sola vez
+- Índice de registros de tamaño fijo (segmento, offset, longitud, hash)
+- Lectura perezosa de bloques a través del índice
+- Recuperación de escrituras incompletas al abrir el almacén
+- CacheBloques: caché LRU de bloques decodificados, segura entre hilos
+- Bloques en JSON canónico o en formato binario (ver formato_binario.py)
+
+Estructura del directorio:
+    datos/
+    ├── indice.idx            # Un registro de 48 bytes por bloque
+    ├── segmento_000000.log   # Bloques serializados (JSON canónico o binario)
+    └── segmento_000001.log
+"""
+
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from formato_binario import codificar_bloque, decodificar_bloque, es_binario
+
+# Registro del índice: segmento (uint32), offset (uint64), longitud (uint32), hash (32 bytes)
+FORMATO_INDICE = struct.Struct('>IQI32s')
+
+# Tamaño a partir del cual se abre un segmento nuevo
+TAMANO_SEGMENTO = 64 * 1024 * 1024
+
+# Bloques decodificados que se conservan en memoria
+TAMANO_CACHE = 1024
+
+# Formatos de escritura de los bloques
+FORMATOS = ('json', 'binario')
+
+
+class AlmacenBloques:
+    """
+    Almacén de bloques en disco de solo anexado.
+
+    Los bloques se guardan en segmentos consecutivos. El índice permite
+    localizar cualquier bloque (y conocer su hash) sin leer ni decodificar
+    el resto, por lo que abrir un almacén con cientos de miles de bloques
+    solo requiere leer el índice.
+
+    El formato solo afecta a los bloques que se escriben: al leer, cada
+    registro se reconoce por su cabecera, así que un almacén puede mezclar
+    bloques JSON y binarios (p. ej. tras cambiar de formato).
+    """
+
+    def __init__(self, directorio, tamano_segmento=TAMANO_SEGMENTO, formato='json'):
+        if formato not in FORMATOS:
+            raise ValueError(f'Formato de almacén desconocido: {formato}')
+        self.directorio = directorio
+        self.tamano_segmento = tamano_segmento
+        self.formato = formato
+        self._cerrojo = threading.Lock()
+        self._lectores = {}
+
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_indice = os.path.join(directorio, 'indice.idx')
+
+        with open(self._ruta_indice, 'ab+') as archivo:
+            archivo.seek(0)
+            self._indice = bytearray(archivo.read())
+
+        self._recuperar()
+        self._archivo_indice = open(self._ruta_indice, 'ab')
+        self._segmento_actual, fin = self._ultima_posicion()
+        self._escritor = self._abrir_escritor(self._segmento_actual, fin)
+
+    def _ruta_segmento(self, segmento):
+        return os.path.join(self.directorio, f'segmento_{segmento:06d}.log')
+
+    def _registro(self, posicion):
+        """Decodifica el registro del índice de una posición"""
+        return FORMATO_INDICE.unpack_from(self._indice, posicion * FORMATO_INDICE.size)
+
+    def _recuperar(self):
+        """
+        Descarta restos de una escritura interrumpida.
+
+        Un registro de índice incompleto, o que apunta más allá del final
+        de su segmento, se elimina junto con los registros posteriores.
+        """
+        sobrante = len(self._indice) % FORMATO_INDICE.size
+        if sobrante:
+            del self._indice[-sobrante:]
+
+        validos = len(self)
+        while validos:
+            segmento, offset, longitud, _ = self._registro(validos - 1)
+            ruta = self._ruta_segmento(segmento)
+            if os.path.exists(ruta) and os.path.getsize(ruta) >= offset + longitud:
+                break
+            validos -= 1
+
+        if validos != len(self) or sobrante:
+            del self._indice[validos * FORMATO_INDICE.size:]
+            with open(self._ruta_indice, 'r+b') as archivo:
+                archivo.truncate(len(self._indice))
+
+    def _ultima_posicion(self):
+        """Segmento y offset donde debe escribirse el próximo bloque"""
+        if not len(self):
+            return 0, 0
+        segmento, offset, longitud, _ = self._registro(len(self) - 1)
+        return segmento, offset + longitud
+
+    def _abrir_escritor(self, segmento, fin):
+        """Abre el segmento para anexar, descartando datos sin indexar tras fin"""
+        ruta = self._ruta_segmento(segmento)
+        with open(ruta, 'ab') as archivo:
+            archivo.truncate(fin)
+        return open(ruta, 'ab')
+
+    def _lector(self, segmento):
+        if segmento not in self._lectores:
+            self._lectores[segmento] = open(self._ruta_segmento(segmento), 'rb')
+        return self._lectores[segmento]
+
+    def __len__(self):
+        return len(self._indice) // FORMATO_INDICE.size
+
+    def hash_en(self, posicion):
+        """Hash del bloque en la posición indicada, leído del índice"""
+        return self._registro(posicion)[3].hex()
+
+    def leer(self, posicion):
+        """
+        Lee y decodifica un bloque del disco.
+
+        Returns:
+            dict: Diccionario del bloque (formato de Bloque.to_dict)
+        """
+        with self._cerrojo:
+            segmento, offset, longitud, _ = self._registro(posicion)
+            if segmento == self._segmento_actual:
+                self._escritor.flush()
+            lector = self._lector(segmento)
+            lector.seek(offset)
+            datos = lector.read(longitud)
+        if es_binario(datos):
+            return decodificar_bloque(datos)
+        return json.loads(datos)
+
+    def anexar(self, bloque_dict, hash_bloque):
+        """
+        Escribe un bloque al final del almacén.
+
+        Primero se escriben los datos y después el registro del índice, de
+        modo que una interrupción nunca deja un índice apuntando a datos
+        inexistentes. Cada escritura se lleva al disco con fsync antes de
+        la siguiente: flush solo vacía el búfer de Python, y tras un corte
+        de luz el sistema operativo podría haber guardado el índice sin
+        los datos.
+        """
+        if self.formato == 'binario':
+            datos = codificar_bloque(bloque_dict)
+        else:
+            datos = json.dumps(bloque_dict, sort_keys=True).encode()
+        with self._cerrojo:
+            segmento, offset = self._ultima_posicion()
+            if offset and offset + len(datos) > self.tamano_segmento:
+                segmento, offset = segmento + 1, 0
+            if segmento != self._segmento_actual:
+                self._escritor.close()
+                self._segmento_actual = segmento
+                self._escritor = self._abrir_escritor(segmento, 0)
+
+            self._escritor.write(datos)
+            self._escritor.flush()
+            os.fsync(self._escritor.fileno())
+
+            registro = FORMATO_INDICE.pack(segmento, offset, len(datos), bytes.fromhex(hash_bloque))
+            self._archivo_indice.write(registro)
+            self._archivo_indice.flush()
+            os.fsync(self._archivo_indice.fileno())
+            self._indice += registro
+
+    def truncar(self, longitud):
+        """Elimina los bloques a partir de la posición longitud (reorganización)"""
+        with self._cerrojo:
+            if longitud >= len(self):
+                return
+            del self._indice[longitud * FORMATO_INDICE.size:]
+            self._archivo_indice.truncate(len(self._indice))
+            os.fsync(self._archivo_indice.fileno())
+
+            # Borrar los segmentos que quedaron completamente sin uso
+            segmento, fin = self._ultima_posicion()
+            for sobrante in range(segmento + 1, self._segmento_actual + 1):
+                lector = self._lectores.pop(sobrante, None)
+                if lector is not None:
+                    lector.close()
+                if os.path.exists(self._ruta_segmento(sobrante)):
+                    os.remove(self._ruta_segmento(sobrante))
+
+            self._escritor.close()
+            self._segmento_actual = segmento
+            self._escritor = self._abrir_escritor(segmento, fin)
+
+    def cerrar(self):
+        """Cierra todos los archivos abiertos"""
+        with self._cerrojo:
+            self._escritor.close()
+            self._archivo_indice.close()
+            for lector in self._lectores.values():
+                lector.close()
+            self._lectores.clear()
+
+
+class CacheBloques:
+    """
+    Caché LRU posición -> Bloque compartida por los hilos del servidor.
+
+    Todas las operaciones toman un cerrojo propio: sin él, una expulsión
+    entre la consulta y el move_to_end de otro hilo lanzaría KeyError.
+    La usan CadenaPersistente y cadena_columnar.CadenaColumnar.
+    """
+
+    def __init__(self, tamano):
+        self.tamano = tamano
+        self._bloques = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    def __len__(self):
+        return len(self._bloques)
+
+    def obtener(self, posicion):
+        """Bloque de la posición (marcándolo como reciente), o None"""
+        with self._cerrojo:
+            bloque = self._bloques.get(posicion)
+            if bloque is not None:
+                self._bloques.move_to_end(posicion)
+            return bloque
+
+    def guardar(self, posicion, bloque):
+        """Guarda un bloque y expulsa los menos recientes si sobra alguno"""
+        with self._cerrojo:
+            self._bloques[posicion] = bloque
+            self._bloques.move_to_end(posicion)
+            while len(self._bloques) > self.tamano:
+                self._bloques.popitem(last=False)
+
+    def descartar_desde(self, longitud):
+        """Elimina los bloques de las posiciones >= longitud"""
+        with self._cerrojo:
+            for posicion in [posicion for posicion in self._bloques if posicion >= longitud]:
+                del self._bloques[posicion]
+
+
+class CadenaPersistente:
+    """
+    Secuencia de bloques respaldada por un AlmacenBloques.
+
+    Se comporta como la lista self.cadena de Blockchain (longitud, acceso
+    por posición y por slice, iteración, append y del cadena[n:]), pero
+    solo decodifica los bloques que se leen y mantiene una caché LRU de
+    los más recientes.
+    """
+
+    def __init__(self, almacen, fabrica, tamano_cache=TAMANO_CACHE):
+        """
+        Args:
+            almacen: AlmacenBloques subyacente
+            fabrica: Función (diccionario, hash) -> Bloque
+            tamano_cache: Bloques decodificados que se conservan en memoria
+        """
+        self.almacen = almacen
+        self.fabrica = fabrica
+        self._cache = CacheBloques(tamano_cache)
+
+    def __len__(self):
+        return len(self.almacen)
+
+    def _bloque(self, posicion):
+        bloque = self._cache.obtener(posicion)
+        if bloque is None:
+            bloque = self.fabrica(self.almacen.leer(posicion), self.almacen.hash_en(posicion))
+            self._cache.guardar(posicion, bloque)
+        return bloque
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self._bloque(i) for i in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError('Posición fuera de la cadena')
+        return self._bloque(posicion)
+
+    def __iter__(self):
+        for posicion in range(len(self)):
+            yield self._bloque(posicion)
+
+    def append(self, bloque):
+        self.almacen.anexar(bloque.to_dict(), bloque.hash)
+        self._cache.guardar(len(self) - 1, bloque)
+
+    def __delitem__(self, posicion):
+        if not isinstance(posicion, slice) or posicion.stop is not None or posicion.step is not None:
+            raise TypeError('Solo se pueden eliminar sufijos: del cadena[n:]')
+        longitud = posicion.indices(len(self))[0]
+        self.almacen.truncar(longitud)
+        self._cache.descartar_desde(longitud)
@@ -0,0 +1,7 @@
+"""
+Benchmarks - Blockchain Educativo
+=================================
+Scripts de medición de rendimiento. Se ejecutan desde la raíz del proyecto:
+
+    python -m benchmarks.bench_mineria
+"""
@@ -0,0 +1,76 @@
+"""
+Benchmark de Arranque - Blockchain Educativo
+============================================
+Mide cuánto tarda un nodo en arrancar desde el almacén persistente con
+cadenas de 10.000 y 100.000 bloques, frente a decodificar todos los bloques.
+La cadena sintética incluye un punto de control en la punta, por lo que el
+arranque no revalida el historial.
+
+Uso:
+    python -m benchmarks.bench_arranque [--bloques 10000 100000]
+"""
+
+import shutil
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+from almacenamiento import AlmacenBloques
+from blockchain import Bloque, Blockchain
+from puntos_control import crear_punto_control
+
+
+def generar_almacen(directorio, cantidad):
+    """Escribe una cadena sintética (enlazada por hash, sin PoW real)"""
+    almacen = AlmacenBloques(directorio)
+    hash_previo = '1'
+    for indice in range(1, cantidad + 1):
+        bloque = Bloque(
+            indice=indice,
+            timestamp=1700000000.0 + indice,
+            transacciones=[{'emisor': f'usuario{indice}', 'receptor': 'minero', 'cantidad': 1}],
+            prueba=indice * 7,
+            hash_previo=hash_previo,
+        )
+        almacen.anexar(bloque.to_dict(), bloque.hash)
+        hash_previo = bloque.hash
+    almacen.cerrar()
+
+    # Punto de control en la punta (la cadena sintética no tiene PoW real)
+    nodo = Blockchain(trabajadores=1, directorio_datos=directorio, validar_al_arrancar=False)
+    nodo.puntos_control.guardar(crear_punto_control(nodo))
+    nodo.cadena.almacen.cerrar()
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de arranque desde disco')
+    parser.add_argument('--bloques', nargs='+', type=int, default=[10000, 100000],
+                        help='Longitudes de cadena a medir')
+    args = parser.parse_args()
+
+    print(f"\n{'Bloques':>10}{'Arranque (ms)':>16}{'Decodificar todo (ms)':>24}")
+    print("-" * 50)
+
+    for cantidad in args.bloques:
+        directorio = tempfile.mkdtemp(prefix='bench_arranque_')
+        try:
+            generar_almacen(directorio, cantidad)
+
+            inicio = perf_counter()
+            nodo = Blockchain(trabajadores=1, directorio_datos=directorio)
+            nodo.ultimo_bloque.hash
+            arranque = perf_counter() - inicio
+
+            inicio = perf_counter()
+            for bloque in nodo.cadena:
+                pass
+            completo = perf_counter() - inicio
+
+            nodo.cadena.almacen.cerrar()
+            print(f"{cantidad:>10}{arranque * 1000:>16.1f}{completo * 1000:>24.1f}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
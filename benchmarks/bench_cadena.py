@@ -0,0 +1,100 @@
+"""
+Benchmark de /cadena - Blockchain Educativo
+===========================================
+Compara la respuesta JSON de /cadena materializada de una vez (lista de
+diccionarios + jsonify, como antes) con la respuesta por fragmentos de
+generar_cadena_json: pico de memoria por petición (tracemalloc), tiempo
+hasta el primer bloque y tiempo total.
+
+Uso:
+    python -m benchmarks.bench_cadena [--bloques 1000 10000 50000]
+"""
+
+import gc
+import json
+import tracemalloc
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blockchain import Bloque, generar_cadena_json
+from cadena_columnar import CadenaColumnar
+from servidor import create_app
+
+# Aplicación usada solo para serializar como lo hace jsonify
+app = create_app()
+
+
+def generar_cadena(cantidad, transacciones=3):
+    """Cadena columnar sintética enlazada por hash (sin PoW real)"""
+    cadena = CadenaColumnar(Bloque.desde_dict)
+    hash_previo = 'f' * 64
+    for indice in range(1, cantidad + 1):
+        bloque = Bloque(
+            indice=indice,
+            timestamp=1700000000.5 + indice,
+            transacciones=[{'emisor': f'usuario{indice}', 'receptor': f'usuario{i}', 'cantidad': i + 1}
+                           for i in range(transacciones)],
+            prueba=indice * 7919,
+            hash_previo=hash_previo,
+        )
+        cadena.append(bloque)
+        hash_previo = bloque.hash
+    return cadena
+
+
+def materializada(cadena):
+    """Respuesta anterior: todo el documento de una vez"""
+    with app.app_context():
+        respuesta = {
+            'cadena': [bloque.to_dict(incluir_hash=True) for bloque in cadena],
+            'longitud': len(cadena),
+        }
+        yield app.json.response(respuesta).get_data()
+
+
+def medir(generador):
+    """
+    Consume una respuesta fragmento a fragmento.
+
+    Returns:
+        tuple: (bytes, ms hasta el primer bloque, ms totales, pico de KiB)
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = perf_counter()
+    primer_bloque = None
+    total = 0
+    for fragmento in generador:
+        total += len(fragmento)
+        if primer_bloque is None and total > len('{"cadena":['):
+            primer_bloque = perf_counter() - inicio
+    duracion = perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, primer_bloque * 1000, duracion * 1000, pico / 1024
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de la respuesta de /cadena')
+    parser.add_argument('--bloques', nargs='+', type=int, default=[1000, 10000, 50000],
+                        help='Longitudes de cadena a medir')
+    args = parser.parse_args()
+
+    print(f"\n{'Bloques':>9}{'Respuesta':>16}{'MiB':>8}{'1er bloque (ms)':>18}"
+          f"{'Total (ms)':>13}{'Pico (KiB)':>13}")
+    print("-" * 77)
+
+    for cantidad in args.bloques:
+        cadena = generar_cadena(cantidad)
+        for nombre, generar in (('materializada', materializada),
+                                ('fragmentos', generar_cadena_json)):
+            total, primero, duracion, pico = medir(generar(cadena))
+            print(f"{cantidad:>9}{nombre:>16}{total / 2 ** 20:>8.1f}{primero:>18.1f}"
+                  f"{duracion:>13.1f}{pico:>13.0f}")
+
+        documento = json.loads(''.join(generar_cadena_json(cadena)))
+        assert documento['longitud'] == cantidad
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de Formato - Blockchain Educativo
+===========================================
+Compara el tamaño y la velocidad de codificación y decodificación de
+bloques en JSON canónico (formato actual de la red y del disco) frente al
+formato binario de formato_binario.py.
+
+Uso:
+    python -m benchmarks.bench_formato [--bloques 2000] [--transacciones 1 10 100]
+"""
+
+import json
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blockchain import Bloque
+from formato_binario import codificar_bloque, decodificar_bloque
+
+
+def generar_bloques(cantidad, transacciones):
+    """Bloques sintéticos con hashes de 64 caracteres y timestamps decimales"""
+    bloques = []
+    hash_previo = '1'
+    for indice in range(1, cantidad + 1):
+        bloque = Bloque(
+            indice=indice,
+            timestamp=1700000000.123456 + indice,
+            transacciones=[{'emisor': f'usuario{indice}_{i}', 'receptor': f'usuario{i}', 'cantidad': i}
+                           for i in range(transacciones)],
+            prueba=indice * 7919,
+            hash_previo=hash_previo,
+        )
+        bloques.append(bloque.to_dict())
+        hash_previo = bloque.hash
+    return bloques
+
+
+def medir(codificar, decodificar, bloques):
+    """
+    Returns:
+        tuple: (bytes totales, ms codificando, ms decodificando)
+    """
+    inicio = perf_counter()
+    codificados = [codificar(bloque) for bloque in bloques]
+    codificacion = perf_counter() - inicio
+
+    inicio = perf_counter()
+    for datos in codificados:
+        decodificar(datos)
+    decodificacion = perf_counter() - inicio
+
+    return sum(map(len, codificados)), codificacion * 1000, decodificacion * 1000
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark del formato binario frente a JSON')
+    parser.add_argument('--bloques', type=int, default=2000,
+                        help='Bloques codificados en cada medición')
+    parser.add_argument('--transacciones', nargs='+', type=int, default=[1, 10, 100],
+                        help='Transacciones por bloque a medir')
+    args = parser.parse_args()
+
+    formatos = [
+        ('JSON', lambda bloque: json.dumps(bloque, sort_keys=True).encode(), json.loads),
+        ('Binario', codificar_bloque, decodificar_bloque),
+    ]
+
+    print(f"\n{'Tx/bloque':>10}{'Formato':>10}{'Bytes/bloque':>15}"
+          f"{'Codificar (us)':>17}{'Decodificar (us)':>19}")
+    print("-" * 71)
+
+    for transacciones in args.transacciones:
+        bloques = generar_bloques(args.bloques, transacciones)
+        for nombre, codificar, decodificar in formatos:
+            tamano, codificacion, decodificacion = medir(codificar, decodificar, bloques)
+            print(f"{transacciones:>10}{nombre:>10}{tamano / len(bloques):>15.0f}"
+                  f"{codificacion * 1000 / len(bloques):>17.1f}"
+                  f"{decodificacion * 1000 / len(bloques):>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
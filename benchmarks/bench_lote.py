@@ -0,0 +1,75 @@
+"""
+Benchmark de Ingesta en Lote - Blockchain Educativo
+===================================================
+Compara el rendimiento de /transacciones/nueva (una petición por
+transacción) frente a /transacciones/lote en JSON y en NDJSON, usando el
+cliente de pruebas de Flask para medir solo el coste del servidor.
+
+Uso:
+    python -m benchmarks.bench_lote [--transacciones 5000]
+"""
+
+import json
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blockchain import Blockchain
+from servidor import Nodo
+
+
+def generar(cantidad, prefijo):
+    """Transacciones distintas entre sí (el mempool rechaza duplicados)"""
+    return [{'emisor': f'{prefijo}{i}', 'receptor': 'Bob', 'cantidad': i}
+            for i in range(cantidad)]
+
+
+def medir_individual(cliente, transacciones):
+    inicio = perf_counter()
+    for transaccion in transacciones:
+        cliente.post('/transacciones/nueva', json=transaccion)
+    return perf_counter() - inicio
+
+
+def medir_lote_json(cliente, transacciones):
+    inicio = perf_counter()
+    cliente.post('/transacciones/lote', json=transacciones)
+    return perf_counter() - inicio
+
+
+def medir_lote_ndjson(cliente, transacciones):
+    cuerpo = '\n'.join(json.dumps(transaccion) for transaccion in transacciones)
+    inicio = perf_counter()
+    cliente.post('/transacciones/lote', data=cuerpo, content_type='application/x-ndjson')
+    return perf_counter() - inicio
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de ingesta de transacciones en lote')
+    parser.add_argument('--transacciones', type=int, default=5000,
+                        help='Transacciones enviadas en cada modo')
+    args = parser.parse_args()
+
+    modos = [
+        ('Individual', medir_individual),
+        ('Lote JSON', medir_lote_json),
+        ('Lote NDJSON', medir_lote_ndjson),
+    ]
+
+    print(f"\n{'Modo':<14}{'Tiempo (s)':>12}{'Tx/s':>12}{'Aceleración':>14}")
+    print("-" * 52)
+
+    base = None
+    for nombre, medir in modos:
+        # Nodo nuevo por modo para que el mempool parta vacío
+        nodo = Nodo(Blockchain(trabajadores=1))
+        transacciones = generar(args.transacciones, nombre.replace(' ', '_'))
+        with nodo.app.test_client() as cliente:
+            segundos = medir(cliente, transacciones)
+        assert len(nodo.blockchain.mempool) == args.transacciones
+        base = base or segundos
+        print(f"{nombre:<14}{segundos:>12.3f}{args.transacciones / segundos:>12.0f}"
+              f"{base / segundos:>13.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de Memoria - Blockchain Educativo
+===========================================
+Mide con tracemalloc los bytes por bloque que ocupa una cadena en memoria
+de 100.000 bloques según su representación: lista de diccionarios (como
+las cadenas recibidas por JSON), lista de objetos Bloque y CadenaColumnar.
+
+Uso:
+    python -m benchmarks.bench_memoria [--bloques 100000] [--transacciones 1]
+"""
+
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blockchain import Bloque
+from cadena_columnar import CadenaColumnar
+
+
+def generar_bloques(cantidad, transacciones):
+    """Bloques sintéticos enlazados por hash (sin PoW real)"""
+    hash_previo = 'f' * 64
+    for indice in range(1, cantidad + 1):
+        bloque = Bloque(
+            indice=indice,
+            timestamp=1700000000.5 + indice,
+            transacciones=[{'emisor': f'usuario{indice}', 'receptor': f'usuario{i}', 'cantidad': i + 1}
+                           for i in range(transacciones)],
+            prueba=indice * 7919,
+            hash_previo=hash_previo,
+        )
+        hash_previo = bloque.hash
+        yield bloque
+
+
+def construir_dicts(bloques):
+    return [bloque.to_dict(incluir_hash=True) for bloque in bloques]
+
+
+def construir_objetos(bloques):
+    return list(bloques)
+
+
+def construir_columnar(bloques):
+    cadena = CadenaColumnar(Bloque.desde_dict)
+    for bloque in bloques:
+        cadena.append(bloque)
+    return cadena
+
+
+def medir(construir, cantidad, transacciones):
+    """
+    Returns:
+        tuple: (bytes por bloque, segundos de construcción, la cadena)
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = perf_counter()
+    cadena = construir(generar_bloques(cantidad, transacciones))
+    segundos = perf_counter() - inicio
+    gc.collect()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return actual / cantidad, segundos, cadena
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de memoria de la cadena')
+    parser.add_argument('--bloques', type=int, default=100000,
+                        help='Bloques de la cadena')
+    parser.add_argument('--transacciones', type=int, default=1,
+                        help='Transacciones por bloque')
+    args = parser.parse_args()
+
+    representaciones = [
+        ('Lista de dicts', construir_dicts),
+        ('Lista de Bloque', construir_objetos),
+        ('CadenaColumnar', construir_columnar),
+    ]
+
+    print(f"\n{args.bloques} bloques, {args.transacciones} transacción(es) por bloque")
+    print(f"\n{'Representación':<18}{'Bytes/bloque':>14}{'Total (MiB)':>14}{'Relativo':>10}")
+    print("-" * 56)
+
+    base = None
+    for nombre, construir in representaciones:
+        por_bloque, _, cadena = medir(construir, args.bloques, args.transacciones)
+        base = base or por_bloque
+        print(f"{nombre:<18}{por_bloque:>14.0f}{por_bloque * args.bloques / 2 ** 20:>14.1f}"
+              f"{por_bloque / base:>9.2f}x")
+
+        # Comprobar que la cadena conserva los bloques
+        ultimo = cadena[-1]
+        assert (ultimo['indice'] if isinstance(ultimo, dict) else ultimo.indice) == args.bloques
+        del cadena, ultimo
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de Minería - Blockchain Educativo
+===========================================
+Compara los hashes por segundo del backend NumPy con el bucle escalar
+de hashlib para distintos tamaños de lote.
+
+Uso:
+    python -m benchmarks.bench_mineria [--nonces 200000]
+"""
+
+import hashlib
+from argparse import ArgumentParser
+from time import perf_counter
+
+from mineria import buscar_en_rango
+
+# Dificultad inalcanzable: obliga a recorrer todo el rango medido
+DIFICULTAD_BENCHMARK = 16
+
+ULTIMA_PRUEBA = 35293
+ULTIMO_HASH = 'd6b14a22163197e4c920f22270a1f1148cd3a4cbc5b1ba2fb50bfcf22c1b6f5e'
+
+
+def medir(funcion, nonces):
+    """Ejecuta funcion() y devuelve hashes por segundo"""
+    inicio = perf_counter()
+    funcion()
+    return nonces / (perf_counter() - inicio)
+
+
+def bucle_escalar(nonces):
+    """Bucle original: f-string + encode + hexdigest por nonce"""
+    objetivo = '0' * DIFICULTAD_BENCHMARK
+    for prueba in range(nonces):
+        intento = f'{ULTIMA_PRUEBA}{prueba}{ULTIMO_HASH}'.encode()
+        if hashlib.sha256(intento).hexdigest()[:DIFICULTAD_BENCHMARK] == objetivo:
+            break
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de backends de minería')
+    parser.add_argument('--nonces', default=200000, type=int,
+                        help='Nonces evaluados por medición')
+    args = parser.parse_args()
+    nonces = args.nonces
+
+    print(f"Nonces por medición: {nonces}\n")
+    print(f"{'Backend':<28}{'Hashes/s':>14}{'Relativo':>12}")
+    print("-" * 54)
+
+    referencia = medir(lambda: bucle_escalar(nonces), nonces)
+    print(f"{'escalar (prueba_valida)':<28}{referencia:>14,.0f}{1.0:>11.2f}x")
+
+    kernel = medir(lambda: buscar_en_rango(ULTIMA_PRUEBA, ULTIMO_HASH, 0, nonces,
+                                           DIFICULTAD_BENCHMARK), nonces)
+    print(f"{'hashlib (kernel por lotes)':<28}{kernel:>14,.0f}{kernel / referencia:>11.2f}x")
+
+    try:
+        import mineria_numpy
+    except ImportError:
+        print("\nNumPy no está instalado: se omite el backend 'numpy'")
+        return
+
+    for tamano_lote in (256, 1024, 4096, 16384, 65536):
+        velocidad = medir(lambda: mineria_numpy.buscar_en_rango(
+            ULTIMA_PRUEBA, ULTIMO_HASH, 0, nonces, DIFICULTAD_BENCHMARK,
+            tamano_lote=tamano_lote), nonces)
+        nombre = f'numpy (lote {tamano_lote})'
+        print(f"{nombre:<28}{velocidad:>14,.0f}{velocidad / referencia:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
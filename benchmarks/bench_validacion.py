@@ -0,0 +1,114 @@
+"""
+Benchmark de Validación - Blockchain Educativo
+==============================================
+Mide cuánto tarda en validarse una cadena larga según el número de
+procesos (validacion.py) y comprueba que el primer bloque inválido
+coincide siempre con el de la validación secuencial.
+
+Con dificultad 4, generar decenas de miles de bloques con Proof of Work
+real llevaría horas. Por eso la cadena se mina con dificultad 1 y se
+valida con comprobar_enlace, que hace las mismas operaciones que
+Blockchain.motivo_invalido (índice y hash del bloque anterior, SHA-256 de la
+prueba, raíz de Merkle y transacciones) con esa dificultad.
+
+Uso:
+    python -m benchmarks.bench_validacion [--bloques 20000] [--trabajadores 1 2 4 8]
+"""
+
+import hashlib
+import os
+import random
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blockchain import Bloque, motivo_transacciones
+from merkle import raiz_merkle
+from mineria import buscar_en_rango
+from validacion import TAMANO_TROZO, primer_invalido, primer_invalido_secuencial
+
+DIFICULTAD_BENCH = 1
+
+
+def comprobar_enlace(bloque_anterior, bloque):
+    """Blockchain.motivo_invalido con dificultad DIFICULTAD_BENCH"""
+    if type(bloque.indice) is not int or bloque.indice != bloque_anterior.indice + 1:
+        return 'Índice no consecutivo'
+    hash_anterior = bloque_anterior.hash
+    if bloque.hash_previo != hash_anterior:
+        return 'Hash previo no coincide'
+    intento = f'{bloque_anterior.prueba}{bloque.prueba}{hash_anterior}'.encode()
+    if hashlib.sha256(intento).hexdigest()[:DIFICULTAD_BENCH] != '0' * DIFICULTAD_BENCH:
+        return 'Proof of Work inválido'
+    if bloque.raiz_merkle != raiz_merkle(bloque.transacciones):
+        return 'Raíz de Merkle inválida'
+    return motivo_transacciones(bloque.transacciones)
+
+
+def generar_cadena(cantidad, transacciones=10):
+    """
+    Cadena válida para comprobar_enlace. Los bloques se reconstruyen desde
+    su diccionario para que, como en una cadena recibida, ni el hash ni la
+    raíz estén memorizados.
+    """
+    anterior = Bloque(1, 1700000000.5, [], 100, '1')
+    cadena = [anterior]
+    for indice in range(2, cantidad + 1):
+        prueba, _ = buscar_en_rango(anterior.prueba, anterior.hash, 0, 10 ** 6,
+                                    dificultad=DIFICULTAD_BENCH)
+        anterior = Bloque(indice, 1700000000.5 + indice,
+                          [{'emisor': f'usuario{indice}', 'receptor': f'usuario{i}', 'cantidad': i + 1}
+                           for i in range(transacciones)],
+                          prueba, anterior.hash)
+        cadena.append(anterior)
+    return [Bloque.desde_dict(bloque.to_dict()) for bloque in cadena]
+
+
+def corromper(cadena, posicion):
+    """Copia de la cadena con el bloque de la posición alterado"""
+    copia = list(cadena)
+    datos = copia[posicion].to_dict()
+    datos['transacciones'] = datos['transacciones'] + [{'emisor': 'x', 'receptor': 'y', 'cantidad': 1}]
+    copia[posicion] = Bloque.desde_dict(datos)
+    return copia
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de la validación paralela de la cadena')
+    parser.add_argument('--bloques', type=int, default=20000, help='Longitud de la cadena')
+    parser.add_argument('--trabajadores', nargs='+', type=int,
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help='Números de procesos a medir')
+    parser.add_argument('--trozo', type=int, default=TAMANO_TROZO, help='Bloques por tarea')
+    args = parser.parse_args()
+
+    print(f"Generando {args.bloques} bloques...")
+    cadena = generar_cadena(args.bloques)
+    print(f"Núcleos disponibles: {os.cpu_count()}")
+
+    print(f"\n{'Trabajadores':>13}{'Segundos':>10}{'Bloques/s':>12}{'Aceleración':>13}")
+    print("-" * 48)
+    base = None
+    for trabajadores in args.trabajadores:
+        # Copias sin memorizar: cada medición calcula todos los hashes
+        copia = [Bloque.desde_dict(bloque.to_dict()) for bloque in cadena]
+        inicio = perf_counter()
+        resultado = primer_invalido(copia, comprobar_enlace, trabajadores=trabajadores,
+                                    tamano_trozo=args.trozo)
+        segundos = perf_counter() - inicio
+        assert resultado is None, resultado
+        base = base or segundos
+        print(f"{trabajadores:>13}{segundos:>10.2f}{args.bloques / segundos:>12.0f}"
+              f"{base / segundos:>12.2f}x")
+
+    print("\nPrimer bloque inválido (secuencial frente a paralelo):")
+    for posicion in sorted(random.sample(range(1, args.bloques), 5)) + [args.bloques - 1]:
+        alterada = corromper(cadena, posicion)
+        esperado = primer_invalido_secuencial(alterada, comprobar_enlace)
+        obtenido = primer_invalido(alterada, comprobar_enlace, trabajadores=max(args.trabajadores),
+                                   tamano_trozo=args.trozo)
+        assert obtenido == esperado, (obtenido, esperado)
+        print(f"  Alterado el bloque {posicion}: {obtenido}")
+
+
+if __name__ == '__main__':
+    main()
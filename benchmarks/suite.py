@@ -0,0 +1,385 @@
+"""
+Suite de Benchmarks - Blockchain Educativo
+==========================================
+Mide el núcleo del blockchain sin servidor y guarda los resultados en JSON
+para compararlos entre commits.
+
+Casos:
+- hash:          Blockchain.hash de bloques con 0, 10, 100 y 1000 transacciones
+- prueba_valida: verificaciones de Proof of Work por segundo
+- pow:           proof_of_work (buscar_prueba, 1 proceso) con dificultad 2, 3 y 4
+- validacion:    validación de cadenas de 1k, 10k y 100k bloques
+- consenso:      resolver_conflictos contra nodos locales de prueba
+- cadena:        serialización de /cadena (JSON por fragmentos y binario)
+- importacion:   arranque en frío de `import blockchain` y `import servidor`
+
+Todos los datos de entrada son deterministas (timestamps y semillas fijos),
+de modo que cada ejecución hace exactamente el mismo trabajo. Cada medición
+se repite y se conserva la mejor.
+
+Uso:
+    python -m benchmarks.suite [--casos hash pow ...] [--salida resultados.json]
+    python -m benchmarks.suite --comparar benchmarks/base.json [--umbral 0.2]
+    python -m benchmarks.suite --guardar-base
+
+Con --comparar, la suite termina con código 1 si alguna métrica empeora
+respecto a la base más que el umbral (20 % por defecto).
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from time import perf_counter
+
+# Base con la que se comparan los resultados por defecto
+RUTA_BASE = os.path.join(os.path.dirname(__file__), 'base.json')
+
+# Empeoramiento relativo tolerado antes de considerar una regresión
+UMBRAL = 0.2
+
+REPETICIONES = 5
+
+CASOS = {}
+
+
+def caso(nombre):
+    """Registra una función de benchmark que devuelve {métrica: resultado}"""
+    def registrar(funcion):
+        CASOS[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def resultado(valor, unidad, mayor_es_mejor):
+    return {'valor': valor, 'unidad': unidad, 'mayor_es_mejor': mayor_es_mejor}
+
+
+def mejor_tiempo(funcion, repeticiones=REPETICIONES):
+    """Segundos de la ejecución más rápida de funcion()"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = perf_counter()
+        funcion()
+        duracion = perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def bloque_sintetico(transacciones, indice=2):
+    return {
+        'indice': indice,
+        'timestamp': 1700000000.5,
+        'transacciones': [{'emisor': f'usuario{i}', 'receptor': f'usuario{i + 1}', 'cantidad': i}
+                          for i in range(transacciones)],
+        'prueba': 35293,
+        'hash_previo': 'a' * 64,
+        'raiz_merkle': 'b' * 64,
+    }
+
+
+@caso('hash')
+def medir_hash():
+    from blockchain import Blockchain
+
+    metricas = {}
+    for transacciones in (0, 10, 100, 1000):
+        bloque = bloque_sintetico(transacciones)
+        repeticiones = max(20, 20000 // (transacciones + 1))
+
+        def calcular():
+            for _ in range(repeticiones):
+                Blockchain.hash(bloque)
+
+        segundos = mejor_tiempo(calcular)
+        metricas[f'hash_{transacciones}tx'] = resultado(round(repeticiones / segundos), 'hashes/s', True)
+    return metricas
+
+
+@caso('prueba_valida')
+def medir_prueba_valida():
+    from blockchain import Blockchain
+
+    ultimo_hash = 'c' * 64
+    cantidad = 200000
+
+    def verificar():
+        for prueba in range(cantidad):
+            Blockchain.prueba_valida(35293, prueba, ultimo_hash)
+
+    segundos = mejor_tiempo(verificar)
+    return {'prueba_valida': resultado(round(cantidad / segundos), 'verificaciones/s', True)}
+
+
+@caso('pow')
+def medir_pow():
+    from mineria import buscar_prueba
+
+    metricas = {}
+    # Más problemas con dificultad baja para que cada medición dure algo
+    for dificultad, problemas in ((2, 200), (3, 40), (4, 5)):
+        hashes = 0
+
+        def resolver():
+            nonlocal hashes
+            hashes = 0
+            for semilla in range(problemas):
+                _, estadisticas = buscar_prueba(semilla, f'{semilla:064x}', dificultad=dificultad,
+                                                trabajadores=1)
+                hashes += sum(estadistica['hashes'] for estadistica in estadisticas)
+
+        segundos = mejor_tiempo(resolver)
+        metricas[f'pow_d{dificultad}_segundos'] = resultado(round(segundos / problemas, 6),
+                                                            's/bloque', False)
+        metricas[f'pow_d{dificultad}_hashes_por_segundo'] = resultado(round(hashes / segundos),
+                                                                       'hashes/s', True)
+    return metricas
+
+
+@caso('validacion')
+def medir_validacion():
+    """
+    Cadenas con dificultad 1 validadas con comprobar_enlace (las mismas
+    operaciones que Blockchain.validar_cadena; ver bench_validacion.py),
+    ya que minar 100k bloques con dificultad 4 llevaría horas.
+    """
+    from benchmarks.bench_validacion import comprobar_enlace, generar_cadena
+    from blockchain import Bloque
+    from validacion import primer_invalido
+
+    metricas = {}
+    cadena = generar_cadena(100000, transacciones=3)
+    for cantidad in (1000, 10000, 100000):
+        datos = [bloque.to_dict() for bloque in cadena[:cantidad]]
+
+        def validar():
+            # Bloques sin hash memorizado, como una cadena recibida
+            bloques = [Bloque.desde_dict(bloque) for bloque in datos]
+            assert primer_invalido(bloques, comprobar_enlace, trabajadores=1) is None
+
+        segundos = mejor_tiempo(validar, repeticiones=REPETICIONES if cantidad < 100000 else 1)
+        metricas[f'validacion_{cantidad // 1000}k_segundos'] = resultado(round(segundos, 4), 's', False)
+        metricas[f'validacion_{cantidad // 1000}k_us_por_bloque'] = resultado(
+            round(segundos / cantidad * 1e6, 2), 'us/bloque', False)
+    return metricas
+
+
+class NodoPrueba:
+    """
+    Nodo local de prueba: sirve con werkzeug, en un puerto libre, las rutas
+    que usa el consenso (/cadena/punta, /cadena/desde y /cadena) a partir
+    de una Blockchain.
+    """
+
+    def __init__(self, blockchain):
+        import logging
+
+        from flask import Flask, Response, jsonify
+        from werkzeug.serving import make_server
+
+        from blockchain import generar_cadena_json
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        app = Flask(__name__)
+        app.add_url_rule('/cadena/punta', 'punta', lambda: jsonify(blockchain.punta()))
+        app.add_url_rule('/cadena/desde/<int:altura>', 'desde',
+                         lambda altura: jsonify(blockchain.bloques_desde(altura)))
+        # El nodo que adopta la cadena anuncia su nueva punta
+        app.add_url_rule('/bloques/anunciar', 'anunciar', lambda: jsonify({'estado': 'duplicado'}),
+                         methods=['POST'])
+        app.add_url_rule('/cadena', 'cadena', lambda: Response(generar_cadena_json(blockchain.cadena),
+                                                              mimetype='application/json'))
+        self.servidor = make_server('127.0.0.1', 0, app, threaded=True)
+        self.direccion = f'127.0.0.1:{self.servidor.server_port}'
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def cerrar(self):
+        self.servidor.shutdown()
+
+
+def cadena_minada(bloques):
+    """Blockchain con bloques minados (dificultad real) y datos deterministas"""
+    from blockchain import Bloque, Blockchain
+    from mineria import buscar_prueba
+
+    nodo = Blockchain(trabajadores=1)
+    nodo._truncar_cadena(0)
+    anterior = Bloque(1, 1700000000.5, [], 100, '1')
+    nodo._anexar_bloque(anterior)
+    for indice in range(2, bloques + 1):
+        prueba, _ = buscar_prueba(anterior.prueba, anterior.hash, trabajadores=1)
+        anterior = Bloque(indice, 1700000000.5 + indice,
+                          [{'emisor': f'usuario{indice}', 'receptor': 'minero', 'cantidad': 1}],
+                          prueba, anterior.hash)
+        nodo._anexar_bloque(anterior)
+    return nodo
+
+
+@caso('consenso')
+def medir_consenso():
+    """
+    Ronda de consenso de un nodo recién arrancado contra 4 nodos locales
+    que tienen la misma cadena de 40 bloques: descarga completa (el génesis
+    local es distinto) e incremental (el nodo ya tiene la mitad).
+    """
+    from blockchain import Blockchain
+
+    referencia = cadena_minada(40)
+    nodos = [NodoPrueba(referencia) for _ in range(4)]
+    try:
+        metricas = {}
+        for nombre, prefijo in (('completa', None), ('incremental', referencia.cadena[:20])):
+            segundos = None
+            for _ in range(REPETICIONES):
+                if prefijo is None:
+                    local = Blockchain(trabajadores=1)
+                else:
+                    local = Blockchain.desde_bloques(prefijo, trabajadores=1)
+                for nodo in nodos:
+                    local.nodos.add(nodo.direccion)
+
+                inicio = perf_counter()
+                assert local.resolver_conflictos()
+                duracion = perf_counter() - inicio
+                assert local.ultimo_bloque.hash == referencia.ultimo_bloque.hash
+                segundos = duracion if segundos is None else min(segundos, duracion)
+            metricas[f'consenso_{nombre}_segundos'] = resultado(round(segundos, 4), 's', False)
+        return metricas
+    finally:
+        for nodo in nodos:
+            nodo.cerrar()
+
+
+@caso('cadena')
+def medir_cadena():
+    from benchmarks.bench_cadena import generar_cadena
+    from blockchain import generar_cadena_json
+    from formato_binario import codificar_cadena
+
+    cadena = generar_cadena(10000)
+    metricas = {}
+
+    segundos = mejor_tiempo(lambda: sum(map(len, generar_cadena_json(cadena))))
+    metricas['cadena_json_10k_segundos'] = resultado(round(segundos, 4), 's', False)
+
+    segundos = mejor_tiempo(lambda: codificar_cadena(cadena))
+    metricas['cadena_binaria_10k_segundos'] = resultado(round(segundos, 4), 's', False)
+    return metricas
+
+
+@caso('importacion')
+def medir_importacion():
+    """
+    Tiempo de importar cada módulo en un intérprete nuevo (la mejor de
+    varias ejecuciones). blockchain no debe cargar Flask ni requests.
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    programa = ('import sys, time; inicio = time.perf_counter(); import {modulo}; '
+                'print(time.perf_counter() - inicio, "flask" in sys.modules, "requests" in sys.modules)')
+
+    metricas = {}
+    for modulo in ('blockchain', 'servidor'):
+        mejor = None
+        for _ in range(REPETICIONES * 2):
+            salida = subprocess.run([sys.executable, '-c', programa.format(modulo=modulo)], cwd=raiz,
+                                    capture_output=True, text=True, check=True).stdout.split()
+            segundos = float(salida[0])
+            mejor = segundos if mejor is None else min(mejor, segundos)
+        if modulo == 'blockchain':
+            assert salida[1:] == ['False', 'False'], 'import blockchain no debe cargar Flask ni requests'
+        metricas[f'importacion_{modulo}_ms'] = resultado(round(mejor * 1000, 1), 'ms', False)
+    return metricas
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(casos):
+    resultados = {}
+    for nombre in casos:
+        print(f"Ejecutando {nombre}...", flush=True)
+        resultados.update(CASOS[nombre]())
+    return {
+        'commit': commit_actual(),
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'nucleos': os.cpu_count(),
+        'resultados': resultados,
+    }
+
+
+def comparar(actual, base, umbral=UMBRAL):
+    """
+    Compara dos ejecuciones métrica a métrica.
+
+    Returns:
+        list: (métrica, valor base, valor actual, cambio relativo, regresión)
+        para cada métrica presente en ambas. El cambio es positivo cuando
+        la métrica mejora.
+    """
+    filas = []
+    for nombre, medida in actual['resultados'].items():
+        referencia = base['resultados'].get(nombre)
+        if referencia is None or not referencia['valor']:
+            continue
+        cambio = (medida['valor'] - referencia['valor']) / referencia['valor']
+        if not medida['mayor_es_mejor']:
+            cambio = -cambio
+        filas.append((nombre, referencia['valor'], medida['valor'], cambio, cambio < -umbral))
+    return filas
+
+
+def main():
+    parser = ArgumentParser(description='Suite de benchmarks del núcleo del blockchain')
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), default=list(CASOS),
+                        help='Casos a ejecutar (por defecto, todos)')
+    parser.add_argument('--salida', default=None, help='Fichero JSON donde guardar los resultados')
+    parser.add_argument('--comparar', nargs='?', const=RUTA_BASE, default=None,
+                        help=f'Base con la que comparar (por defecto {RUTA_BASE})')
+    parser.add_argument('--umbral', type=float, default=UMBRAL,
+                        help='Empeoramiento relativo tolerado (0.2 = 20 %%)')
+    parser.add_argument('--guardar-base', action='store_true',
+                        help=f'Guarda los resultados como nueva base en {RUTA_BASE}')
+    args = parser.parse_args()
+
+    actual = ejecutar(args.casos)
+
+    print(f"\n{'Métrica':<40}{'Valor':>16}  Unidad")
+    print("-" * 70)
+    for nombre, medida in actual['resultados'].items():
+        print(f"{nombre:<40}{medida['valor']:>16}  {medida['unidad']}")
+
+    for ruta in filter(None, (args.salida, RUTA_BASE if args.guardar_base else None)):
+        with open(ruta, 'w', encoding='utf-8') as fichero:
+            json.dump(actual, fichero, indent=2, sort_keys=True)
+            fichero.write('\n')
+        print(f"\nResultados guardados en {ruta}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as fichero:
+            base = json.load(fichero)
+        print(f"\nComparación con {args.comparar} (commit {base.get('commit')}, "
+              f"umbral {args.umbral:.0%}):")
+        regresiones = 0
+        for nombre, antes, despues, cambio, regresion in comparar(actual, base, args.umbral):
+            marca = 'REGRESIÓN' if regresion else 'ok'
+            print(f"  {nombre:<40}{antes:>14} -> {despues:<14}{cambio:>+8.1%}  {marca}")
+            regresiones += regresion
+        if regresiones:
+            print(f"\n{regresiones} métrica(s) empeoran más del {args.umbral:.0%}")
+            sys.exit(1)
+        print("\nSin regresiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,18 +5,142 @@ Sistema de blockchain distribuido con Python y Flask
 
 Componentes:
 - Bloques con hash SHA-256
+- Raíz de Merkle de las transacciones y pruebas de inclusión (ver merkle.py)
+- Saldos por dirección mantenidos de forma incremental (ver saldos.py)
+- Índices de transacciones y de historial por dirección (ver indices.py)
+- Formato binario compacto para la red y el disco (ver formato_binario.py)
+- Cadena en memoria guardada por columnas (ver cadena_columnar.py)
 - Proof of Work (PoW)
 - Consenso por cadena más larga
+- Propagación de bloques nuevos por anuncios entre nodos
 - Red distribuida con múltiples nodos
+- Minería paralela en varios núcleos (ver mineria.py)
+- Validación paralela de cadenas largas (ver validacion.py)
+- Trabajos de minado en segundo plano con estado y cancelación (ver minero.py)
+- Consultas concurrentes a los nodos vecinos (ver red.py)
+- Persistencia opcional en disco (ver almacenamiento.py)
+- Puntos de control para no revalidar el historial al arrancar (ver puntos_control.py)
+- Métricas en formato Prometheus en /metricas (ver metricas.py)
+- API REST con Flask y fábrica de aplicaciones create_app (ver servidor.py)
 """
 
 import hashlib
 import json
-from time import time
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from time import perf_counter, time
+from types import MappingProxyType
 from urllib.parse import urlparse
-from uuid import uuid4
-import requests
-from flask import Flask, jsonify, request
+
+from almacenamiento import AlmacenBloques, CadenaPersistente
+from cadena_columnar import CadenaColumnar
+from indices import IndiceCadena
+from mempool import (MAX_BYTES, MAX_TRANSACCIONES, MAX_TRANSACCIONES_BLOQUE, Mempool,
+                     hash_transaccion)
+from merkle import prueba_inclusion, raiz_merkle
+from metricas import MetricasNodo
+from mineria import DIFICULTAD, PoolMineria, buscar_prueba
+from puntos_control import (INTERVALO_PUNTOS, RETENCION_PUNTOS, GestorPuntosControl,
+                            crear_punto_control)
+from red import PLAZO_RONDA, TIMEOUT_NODO, ClienteNodos
+from saldos import EMISOR_RECOMPENSA, LibroSaldos
+from validacion import primer_invalido
+
+# Registro de diagnóstico del nodo (ver --nivel-log)
+logger = logging.getLogger('blockchain')
+
+_HEXADECIMAL = frozenset('0123456789abcdef')
+
+# Campos requeridos en toda transacción
+CAMPOS_TRANSACCION = ('emisor', 'receptor', 'cantidad')
+
+# Bloques por página en la sincronización incremental (/cadena/desde)
+LIMITE_BLOQUES = 500
+MAX_LIMITE_BLOQUES = 5000
+
+# Bloques serializados por fragmento en la respuesta de /cadena
+BLOQUES_POR_FRAGMENTO = 64
+
+# Hashes de bloques anunciados que se recuerdan para descartar duplicados
+MAX_ANUNCIOS_VISTOS = 10000
+
+# Transacciones por página en las consultas de los índices
+LIMITE_HISTORIAL = 100
+MAX_LIMITE_HISTORIAL = 1000
+
+
+def hash_canonico(bloque_dict):
+    """
+    Hash SHA-256 de la serialización canónica (JSON con claves ordenadas).
+
+    El campo derivado 'hash' que publica /cadena no forma parte del
+    contenido del bloque y se excluye antes de serializar.
+    """
+    if 'hash' in bloque_dict:
+        bloque_dict = {clave: valor for clave, valor in bloque_dict.items() if clave != 'hash'}
+    bloque_string = json.dumps(bloque_dict, sort_keys=True).encode()
+    return hashlib.sha256(bloque_string).hexdigest()
+
+
+def es_hash(valor):
+    """Indica si valor es un hash SHA-256 en hexadecimal (64 caracteres en minúscula)"""
+    return isinstance(valor, str) and len(valor) == 64 and _HEXADECIMAL.issuperset(valor)
+
+
+def texto_codificable(texto):
+    """
+    Indica si un texto se puede codificar en UTF-8.
+
+    JSON admite surrogates sueltos (p. ej. "\\ud800") que Python decodifica
+    sin error pero que no se pueden codificar; el formato binario y la
+    cadena columnar fallarían al guardar un bloque que los contenga.
+    """
+    if texto.isascii():
+        return True
+    try:
+        texto.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def validar_transaccion(valores):
+    """
+    Comprueba que una transacción recibida tiene los campos requeridos
+    con el tipo correcto: emisor y receptor textos, cantidad un número.
+
+    Returns:
+        str: Motivo del error, o None si la transacción es válida
+    """
+    if not isinstance(valores, Mapping):
+        return 'La transacción debe ser un objeto JSON'
+    if not all(campo in valores for campo in CAMPOS_TRANSACCION):
+        return 'Faltan valores requeridos'
+    emisor, receptor, cantidad = valores['emisor'], valores['receptor'], valores['cantidad']
+    if not isinstance(emisor, str) or not isinstance(receptor, str):
+        return 'El emisor y el receptor deben ser textos'
+    if isinstance(cantidad, bool) or not isinstance(cantidad, (int, float)):
+        return 'La cantidad debe ser un número'
+    if not all(texto_codificable(valor) for valor in valores.values() if isinstance(valor, str)):
+        return 'Texto no representable en UTF-8'
+    return None
+
+
+def motivo_transacciones(transacciones):
+    """
+    Comprueba las transacciones de un bloque recibido.
+
+    Returns:
+        str: Motivo por el que alguna transacción es inválida, o None
+    """
+    for transaccion in transacciones:
+        motivo = validar_transaccion(transaccion)
+        if motivo:
+            return f'Transacción inválida: {motivo}'
+    return None
 
 
 class Bloque:
@@ -29,24 +153,124 @@ class Bloque:
         transacciones: Lista de transacciones incluidas
         prueba: Proof of Work (número que satisface la condición)
         hash_previo: Hash SHA-256 del bloque anterior
+        raiz_merkle: Raíz de Merkle de las transacciones (ver merkle.py)
+        hash: Hash canónico del bloque (calculado una vez y memorizado)
+
+    Usa __slots__ en lugar de un __dict__ por instancia para ocupar menos
+    memoria.
     """
+
+    __slots__ = ('_hash', '_raiz_merkle', 'indice', 'timestamp', 'transacciones',
+                 'prueba', 'hash_previo')
+
+    # Campos que forman parte del hash del bloque
+    CAMPOS = ('indice', 'timestamp', 'transacciones', 'prueba', 'hash_previo', 'raiz_merkle')
     
-    def __init__(self, indice, timestamp, transacciones, prueba, hash_previo):
+    def __init__(self, indice, timestamp, transacciones, prueba, hash_previo, raiz_merkle=None):
+        self._hash = None
+        self._raiz_merkle = None
         self.indice = indice
         self.timestamp = timestamp
         self.transacciones = transacciones
         self.prueba = prueba
         self.hash_previo = hash_previo
+        # Una raíz recibida se conserva tal cual; validar_cadena la comprueba
+        if raiz_merkle is not None:
+            self.raiz_merkle = raiz_merkle
 
-    def to_dict(self):
-        """Convierte el bloque a diccionario para serialización"""
-        return {
+    def __setattr__(self, nombre, valor):
+        """
+        Protege el hash memorizado frente a modificaciones del bloque.
+
+        Las transacciones se guardan como tupla de vistas de solo lectura
+        (reasignarlas invalida la raíz de Merkle), y reasignar cualquier
+        campo invalida el hash memorizado.
+        """
+        if nombre == 'transacciones':
+            valor = tuple(MappingProxyType(dict(transaccion)) for transaccion in valor)
+            object.__setattr__(self, '_raiz_merkle', None)
+        object.__setattr__(self, nombre, valor)
+        if nombre in self.CAMPOS:
+            object.__setattr__(self, '_hash', None)
+
+    @property
+    def raiz_merkle(self):
+        """Raíz de Merkle de las transacciones, calculada solo si no se conoce"""
+        if self._raiz_merkle is None:
+            object.__setattr__(self, '_raiz_merkle', raiz_merkle(self.transacciones))
+        return self._raiz_merkle
+
+    @raiz_merkle.setter
+    def raiz_merkle(self, valor):
+        object.__setattr__(self, '_raiz_merkle', valor)
+
+    @property
+    def hash(self):
+        """Hash SHA-256 canónico del bloque, calculado solo la primera vez"""
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash_canonico(self.to_dict()))
+        return self._hash
+
+    @classmethod
+    def desde_dict(cls, datos, hash_conocido=None):
+        """
+        Construye un bloque a partir de su diccionario (p. ej. recibido de otro nodo)
+
+        Args:
+            datos: Diccionario del bloque; un campo 'hash' se ignora
+            hash_conocido: Hash ya verificado (p. ej. el del almacén local)
+                que se memoriza sin recalcularlo. Nunca debe usarse con
+                datos recibidos de otros nodos.
+        """
+        bloque = cls(
+            indice=datos['indice'],
+            timestamp=datos['timestamp'],
+            transacciones=datos['transacciones'],
+            prueba=datos['prueba'],
+            hash_previo=datos['hash_previo'],
+            raiz_merkle=datos.get('raiz_merkle'),
+        )
+        if hash_conocido is not None:
+            object.__setattr__(bloque, '_hash', hash_conocido)
+        return bloque
+
+    def __reduce__(self):
+        """
+        Serialización con pickle (p. ej. para validar en otros procesos).
+
+        Conserva la raíz y el hash memorizados tal como están, para que el
+        otro proceso vea exactamente el mismo bloque.
+        """
+        return (_reconstruir_bloque, (self.indice, self.timestamp,
+                                      [dict(transaccion) for transaccion in self.transacciones],
+                                      self.prueba, self.hash_previo, self._raiz_merkle, self._hash))
+
+    def to_dict(self, incluir_hash=False):
+        """
+        Convierte el bloque a diccionario para serialización
+
+        Args:
+            incluir_hash: Añade el hash memorizado como campo 'hash'
+        """
+        datos = {
             'indice': self.indice,
             'timestamp': self.timestamp,
-            'transacciones': self.transacciones,
+            'transacciones': [dict(transaccion) for transaccion in self.transacciones],
             'prueba': self.prueba,
             'hash_previo': self.hash_previo,
+            'raiz_merkle': self.raiz_merkle,
         }
+        if incluir_hash:
+            datos['hash'] = self.hash
+        return datos
+
+
+def _reconstruir_bloque(indice, timestamp, transacciones, prueba, hash_previo, raiz, hash_bloque):
+    """Inverso de Bloque.__reduce__"""
+    bloque = Bloque(indice, timestamp, transacciones, prueba, hash_previo, raiz)
+    if hash_bloque is not None:
+        object.__setattr__(bloque, '_hash', hash_bloque)
+    return bloque
 
 
 class Blockchain:
@@ -60,15 +284,146 @@ class Blockchain:
     - Validación de cadena
     """
     
-    def __init__(self):
-        self.cadena = []
-        self.transacciones_pendientes = []
+    def __init__(self, trabajadores=None, backend_mineria='hashlib', validacion_paranoica=False,
+                 plazo_consenso=PLAZO_RONDA, directorio_datos=None,
+                 intervalo_puntos_control=INTERVALO_PUNTOS, retencion_puntos_control=RETENCION_PUNTOS,
+                 validar_al_arrancar=True, max_mempool=MAX_TRANSACCIONES, max_bytes_mempool=MAX_BYTES,
+                 politica_mempool='antiguas', max_transacciones_bloque=MAX_TRANSACCIONES_BLOQUE,
+                 formato_almacen='json', direccion=None, cliente=None):
+        # Sin directorio de datos la cadena vive solo en memoria (por columnas)
+        if directorio_datos:
+            self.cadena = CadenaPersistente(AlmacenBloques(directorio_datos, formato=formato_almacen),
+                                            Bloque.desde_dict)
+            self.puntos_control = GestorPuntosControl(
+                os.path.join(directorio_datos, 'puntos_control'),
+                intervalo=intervalo_puntos_control,
+                retencion=retencion_puntos_control,
+            )
+        else:
+            self.cadena = CadenaColumnar(Bloque.desde_dict)
+            self.puntos_control = None
+        self.mempool = Mempool(max_transacciones=max_mempool, max_bytes=max_bytes_mempool,
+                               politica=politica_mempool)
+        self.max_transacciones_bloque = max_transacciones_bloque
+        self.saldos = LibroSaldos()
+        self.metricas = MetricasNodo(self)
+        # Índices secundarios: se construyen en la primera consulta
+        self._indices = None
         self.nodos = set()
+
+        # Protege la cadena y el mempool frente a los hilos del servidor y
+        # del minero en segundo plano (ver minero.py)
+        self.cerrojo = threading.RLock()
+
+        # Procesos usados por el Proof of Work (por defecto, uno por núcleo)
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.backend_mineria = backend_mineria
+        # Los procesos se crean en el primer minado y se reutilizan después
+        self.pool_mineria = PoolMineria(self.trabajadores)
+        self.estadisticas_mineria = []
+
+        # Cliente de red con sesiones persistentes por nodo (el simulador
+        # inyecta uno con transporte en memoria, ver simulador.py)
+        self.cliente = cliente or ClienteNodos()
+        self.plazo_consenso = plazo_consenso
+        self.ultima_ronda = []
+
+        # Dirección host:puerto con la que este nodo firma sus anuncios, para
+        # que los receptores sepan a quién pedir los bloques que les falten
+        self.direccion = direccion
+        # Hashes de bloques ya anunciados o recibidos, en orden de llegada
+        self.anuncios_vistos = OrderedDict()
+
+        # Si es True, el consenso revalida las cadenas ajenas desde el génesis
+        self.validacion_paranoica = validacion_paranoica
         
+        if len(self.cadena):
+            logger.info("Cadena cargada desde %s: %d bloque(s)", directorio_datos, len(self.cadena))
+            punto = self.puntos_control.mas_reciente(self.cadena)
+            # Se valida antes de cargar el estado: los saldos se calculan
+            # solo con los bloques que se conservan
+            if validar_al_arrancar:
+                self._validar_al_arrancar(punto)
+            self._cargar_estado(punto)
+            return
+
         # Crear bloque génesis (primer bloque)
-        print("Inicializando blockchain...")
+        logger.debug("Inicializando blockchain...")
         self.nuevo_bloque(hash_previo='1', prueba=100)
-        print(f"Bloque génesis creado. Cadena iniciada con {len(self.cadena)} bloque(s).")
+        logger.debug("Bloque génesis creado. Cadena iniciada con %d bloque(s)", len(self.cadena))
+
+    @classmethod
+    def desde_bloques(cls, bloques, **opciones):
+        """
+        Construye una blockchain en memoria a partir de bloques ya validados.
+
+        Útil para recalcular el estado derivado de una cadena (p. ej. al
+        verificar un punto de control).
+        """
+        blockchain = cls(**opciones)
+        blockchain._truncar_cadena(0)
+        for bloque in bloques:
+            blockchain._anexar_bloque(bloque)
+        return blockchain
+
+    def _cargar_estado(self, punto):
+        """
+        Reconstruye el estado derivado de la cadena cargada desde disco.
+
+        Parte del estado guardado en el punto de control (si lo hay) y
+        aplica solo los bloques posteriores a él.
+        """
+        estado = punto['estado'] if punto else {}
+        if 'saldos' in estado:
+            self.saldos = LibroSaldos(estado['saldos'])
+            altura = punto['altura']
+        else:
+            self.saldos = LibroSaldos()
+            altura = 0
+
+        for posicion in range(altura, len(self.cadena)):
+            self.saldos.aplicar(self.cadena[posicion])
+
+    def _validar_al_arrancar(self, punto):
+        """
+        Valida la cadena cargada desde disco.
+
+        Si existe un punto de control que coincide con la cadena, solo se
+        validan los bloques posteriores a él. Si un bloque no es válido, la
+        cadena se recorta justo antes de él (conservando todo el historial
+        válido) y el resto se recuperará de la red por consenso.
+
+        Es una reparación del almacén: se llama antes de cargar el estado
+        derivado, y las transacciones de los bloques descartados no vuelven
+        al mempool, porque proceden de datos corruptos.
+        """
+        altura = punto['altura'] if punto else 1
+        if punto:
+            logger.info("Punto de control en la altura %d: validando %d bloque(s) posteriores",
+                        altura, len(self.cadena) - altura)
+        else:
+            logger.info("Sin punto de control: validando la cadena completa")
+
+        invalido = self.primer_bloque_invalido(self.cadena, inicio=altura)
+        if invalido is None:
+            return
+
+        posicion, motivo = invalido
+        logger.warning("Cadena en disco inválida (%s en el bloque %d): se recorta a %d bloque(s)",
+                       motivo, posicion + 1, posicion)
+        del self.cadena[posicion:]
+        if self.puntos_control:
+            self.puntos_control.descartar_desde(posicion)
+
+    def estado_derivado(self):
+        """
+        Estado calculado a partir de los bloques que se guarda en los
+        puntos de control.
+
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {'saldos': self.saldos.a_dict()}
 
     def registrar_nodo(self, direccion):
         """
@@ -85,93 +440,685 @@ class Blockchain:
         else:
             raise ValueError('URL de nodo inválida')
         
-        print(f"Nodo registrado: {direccion}")
+        logger.info("Nodo registrado: %s", direccion)
+
+    @staticmethod
+    def motivo_invalido(bloque_anterior, bloque):
+        """
+        Comprueba el enlace entre dos bloques consecutivos.
+
+        Validaciones:
+        1. El índice es el siguiente al del bloque anterior
+        2. Hash del bloque anterior coincide
+        3. Proof of Work es válido
+        4. La raíz de Merkle corresponde a las transacciones
+        5. Las transacciones tienen los campos requeridos con su tipo y
+           textos que se pueden codificar en UTF-8 (ver validar_transaccion)
 
-    def validar_cadena(self, cadena):
+        Returns:
+            str: Motivo por el que el bloque es inválido, o None si es válido
+        """
+        # Los índices y las ubicaciones de las transacciones usan el
+        # índice como posición en la cadena
+        if type(bloque.indice) is not int or bloque.indice != bloque_anterior.indice + 1:
+            return 'Índice no consecutivo'
+        hash_anterior = bloque_anterior.hash
+        if bloque.hash_previo != hash_anterior:
+            return 'Hash previo no coincide'
+        if not Blockchain.prueba_valida(bloque_anterior.prueba, bloque.prueba, hash_anterior):
+            return 'Proof of Work inválido'
+        if bloque.raiz_merkle != raiz_merkle(bloque.transacciones):
+            return 'Raíz de Merkle inválida'
+        return motivo_transacciones(bloque.transacciones)
+
+    def primer_bloque_invalido(self, cadena, inicio=1):
+        """
+        Posición del primer bloque que no enlaza correctamente con el anterior.
+
+        Las cadenas largas se validan en paralelo con self.trabajadores
+        procesos (ver validacion.py); el resultado es el mismo que el de la
+        validación secuencial.
+
+        Args:
+            cadena: Lista de bloques a validar (objetos Bloque o diccionarios)
+            inicio: Primera posición a validar; los bloques anteriores se
+                consideran ya verificados (por defecto, todo desde el génesis)
+
+        Returns:
+            tuple: (posición, motivo) del primer bloque inválido, o None
+        """
+        if isinstance(cadena, list):
+            cadena = [bloque if isinstance(bloque, Bloque) else Bloque.desde_dict(bloque)
+                      for bloque in cadena]
+        return primer_invalido(cadena, Blockchain.motivo_invalido, inicio=inicio,
+                               trabajadores=self.trabajadores)
+
+    def validar_cadena(self, cadena, inicio=1):
         """
         Verifica la validez de una cadena blockchain.
         
-        Validaciones:
-        1. Hash del bloque anterior coincide
-        2. Proof of Work es válido
+        Ver motivo_invalido para las comprobaciones de cada bloque.
         
         Args:
-            cadena: Lista de bloques a validar
+            cadena: Lista de bloques a validar (objetos Bloque o diccionarios)
+            inicio: Primera posición a validar; los bloques anteriores se
+                consideran ya verificados (por defecto, todo desde el génesis)
             
         Returns:
             bool: True si la cadena es válida, False en caso contrario
         """
-        bloque_anterior = cadena[0]
-        indice_actual = 1
+        inicio = max(inicio, 1)
+        logger.debug("Validando %d bloque(s) desde la posición %d", len(cadena) - inicio, inicio)
 
-        while indice_actual < len(cadena):
-            bloque = cadena[indice_actual]
-            print(f"Validando bloque {indice_actual}...")
-            
-            # Verificar hash del bloque anterior
-            hash_anterior = self.hash(bloque_anterior)
-            if bloque['hash_previo'] != hash_anterior:
-                print(f"Error: Hash previo no coincide en bloque {indice_actual}")
+        comienzo = perf_counter()
+        resultado = self.primer_bloque_invalido(cadena, inicio=inicio)
+        validados = len(cadena) - inicio if resultado is None else resultado[0] - inicio + 1
+        if validados > 0:
+            self.metricas.bloques_validados.incrementar(validados)
+            self.metricas.validacion.observar((perf_counter() - comienzo) / validados)
+
+        if resultado is not None:
+            posicion, motivo = resultado
+            logger.warning("Cadena inválida: %s en bloque %d", motivo, posicion)
+            return False
+        return True
+
+    def punto_bifurcacion(self, cadena):
+        """
+        Busca la última posición que la cadena comparte con la cadena local.
+
+        Como cada bloque incluye el hash del anterior, si dos cadenas tienen
+        el mismo hash en la posición i también coinciden en todas las
+        anteriores. Eso permite una búsqueda binaria comparando contra los
+        hashes memorizados de la cadena local: solo se calculan O(log n)
+        hashes de la cadena ajena.
+
+        Args:
+            cadena: Lista de objetos Bloque
+
+        Returns:
+            int: Última posición común (-1 si ni el génesis coincide)
+        """
+        bajo, alto = -1, min(len(cadena), len(self.cadena)) - 1
+        while bajo < alto:
+            medio = (bajo + alto + 1) // 2
+            if cadena[medio].hash == self.cadena[medio].hash:
+                bajo = medio
+            else:
+                alto = medio - 1
+        return bajo
+
+    def validar_cadena_ajena(self, cadena):
+        """
+        Valida una cadena recibida de otro nodo.
+
+        Solo se valida el sufijo posterior al punto de bifurcación: el
+        prefijo común ya forma parte de la cadena local.
+
+        En modo paranoico (self.validacion_paranoica) se valida la cadena
+        completa desde el génesis.
+
+        Args:
+            cadena: Lista de objetos Bloque
+
+        Returns:
+            int: Punto de bifurcación (ver punto_bifurcacion) si la cadena
+            es válida, o None si no lo es
+        """
+        comun = self.punto_bifurcacion(cadena)
+        inicio = 1 if self.validacion_paranoica else comun + 1
+        logger.info("Punto de bifurcación en la posición %d: validando %d bloque(s)",
+                    comun, len(cadena) - inicio)
+
+        if not self.validar_cadena(cadena, inicio=inicio):
+            return None
+        return comun
+
+    def _anexar_bloque(self, bloque):
+        """
+        Añade al final de la cadena un bloque ya validado.
+
+        Los saldos y los índices se actualizan antes de anexar el bloque; si
+        algo falla, se deshace lo aplicado y la cadena no cambia.
+        """
+        with self.cerrojo:
+            aplicados = []
+            try:
+                self.saldos.aplicar(bloque)
+                aplicados.append(self.saldos.revertir)
+                if self._indices is not None:
+                    self._indices.anexar(bloque)
+                    aplicados.append(self._indices.descartar)
+                self.cadena.append(bloque)
+            except Exception:
+                for deshacer in reversed(aplicados):
+                    deshacer(bloque)
+                raise
+            self.mempool.eliminar(bloque.transacciones)
+
+            if self.puntos_control and self.puntos_control.corresponde(len(self.cadena)):
+                self.puntos_control.guardar(crear_punto_control(self))
+                logger.info("Punto de control creado en la altura %d", len(self.cadena))
+
+    def _truncar_cadena(self, longitud):
+        """Descarta los bloques a partir de la posición longitud"""
+        with self.cerrojo:
+            # Las transacciones de los bloques descartados vuelven al mempool
+            # (salvo las recompensas de minado, que solo valen en su bloque)
+            # y sus movimientos se deshacen en el libro de saldos
+            descartados = self.cadena[longitud:]
+            for bloque in reversed(descartados):
+                self.saldos.revertir(bloque)
+                if self._indices is not None:
+                    self._indices.descartar(bloque)
+            for bloque in descartados:
+                for transaccion in bloque.transacciones:
+                    if transaccion['emisor'] != EMISOR_RECOMPENSA:
+                        self.mempool.agregar(transaccion)
+
+            del self.cadena[longitud:]
+
+            if self.puntos_control:
+                self.puntos_control.descartar_desde(longitud)
+
+    def _adoptar_cadena(self, cadena, comun):
+        """
+        Sustituye la cadena local por una cadena ajena ya validada.
+
+        Conserva los bloques locales del prefijo común (con sus hashes
+        memorizados) y solo reemplaza el sufijo a partir de la bifurcación.
+        """
+        with self.cerrojo:
+            descartados = self.cadena[comun + 1:]
+            self._truncar_cadena(comun + 1)
+            try:
+                for bloque in cadena[comun + 1:]:
+                    self._anexar_bloque(bloque)
+            except Exception:
+                # Restaurar la rama local si un bloque ajeno no se puede anexar
+                self._truncar_cadena(comun + 1)
+                for bloque in descartados:
+                    self._anexar_bloque(bloque)
+                raise
+
+    def bloques_desde(self, altura, limite=LIMITE_BLOQUES):
+        """
+        Bloques posteriores a una altura dada (sincronización incremental).
+
+        Args:
+            altura: Número de bloques que el solicitante ya tiene
+            limite: Máximo de bloques a devolver (acotado a MAX_LIMITE_BLOQUES)
+
+        Returns:
+            dict: Bloques solicitados junto con la longitud y el hash de la
+            punta de la cadena local
+        """
+        limite = max(1, min(limite, MAX_LIMITE_BLOQUES))
+        altura = max(altura, 0)
+        return {
+            'desde': altura,
+            'bloques': [bloque.to_dict(incluir_hash=True)
+                        for bloque in self.cadena[altura:altura + limite]],
+            'longitud': len(self.cadena),
+            'hash_punta': self.ultimo_bloque.hash,
+        }
+
+    def saldo(self, direccion):
+        """
+        Saldo confirmado de una dirección, en O(1).
+
+        Returns:
+            dict: Dirección, saldo y altura de la cadena a la que corresponde
+        """
+        return {
+            'direccion': direccion,
+            'saldo': self.saldos.saldo(direccion),
+            'altura': len(self.cadena),
+            'hash_punta': self.ultimo_bloque.hash,
+        }
+
+    @property
+    def indices(self):
+        """
+        Índices secundarios de la cadena (ver indices.py).
+
+        No se construyen al arrancar para no leer todos los bloques del
+        disco: la primera consulta recorre la cadena una vez y a partir de
+        ahí se mantienen al anexar y descartar bloques.
+        """
+        if self._indices is None:
+            indices = IndiceCadena()
+            for bloque in self.cadena:
+                indices.anexar(bloque)
+            self._indices = indices
+        return self._indices
+
+    def ubicar_transaccion(self, hash_tx):
+        """
+        Bloques y posiciones donde aparece una transacción confirmada.
+
+        Returns:
+            list: Pares (bloque, posición), en orden de la cadena (vacía
+            también si hash_tx no es un hash válido)
+        """
+        if not es_hash(hash_tx):
+            return []
+        ubicaciones = []
+        # Con el cerrojo, la cadena no se trunca entre la consulta del
+        # índice y la lectura de los bloques
+        with self.cerrojo:
+            for indice, posicion in self.indices.candidatos(hash_tx):
+                bloque = self._transaccion_en(indice, posicion)
+                # El índice usa un prefijo del hash: se comprueba el hash completo
+                if bloque is not None and hash_transaccion(bloque.transacciones[posicion]) == hash_tx:
+                    ubicaciones.append((bloque, posicion))
+        return ubicaciones
+
+    def _transaccion_en(self, indice, posicion):
+        """
+        Bloque de una ubicación del índice, comprobando que sigue existiendo.
+
+        Returns:
+            Bloque: El bloque con ese índice si tiene una transacción en esa
+            posición, o None
+        """
+        if not 1 <= indice <= len(self.cadena):
+            return None
+        bloque = self.cadena[indice - 1]
+        if bloque.indice != indice or not 0 <= posicion < len(bloque.transacciones):
+            return None
+        return bloque
+
+    def historial_direccion(self, direccion, desde=0, limite=LIMITE_HISTORIAL):
+        """
+        Transacciones confirmadas en las que interviene una dirección.
+
+        Args:
+            direccion: Emisor o receptor a consultar
+            desde: Número de transacciones del historial que se omiten
+            limite: Máximo de transacciones a devolver (acotado a MAX_LIMITE_HISTORIAL)
+
+        Returns:
+            dict: Página del historial en orden de la cadena y el total
+        """
+        limite = max(1, min(limite, MAX_LIMITE_HISTORIAL))
+        desde = max(desde, 0)
+        with self.cerrojo:
+            total, ubicaciones = self.indices.historial(direccion, desde, limite)
+            bloques = [(self._transaccion_en(indice, posicion), posicion)
+                       for indice, posicion in ubicaciones]
+        return {
+            'direccion': direccion,
+            'total': total,
+            'desde': desde,
+            'transacciones': [
+                {'bloque': bloque.indice, 'posicion': posicion,
+                 'transaccion': dict(bloque.transacciones[posicion])}
+                for bloque, posicion in bloques if bloque is not None
+            ],
+        }
+
+    def prueba_inclusion(self, hash_tx, indice=None):
+        """
+        Prueba de Merkle de que una transacción está en la cadena.
+
+        Args:
+            hash_tx: Hash de la transacción (ver mempool.hash_transaccion)
+            indice: Índice del bloque donde buscarla; si se omite se usa su
+                aparición más reciente según el índice de transacciones
+
+        Returns:
+            dict: Bloque, posición, raíz de Merkle y pasos de la prueba,
+            o None si la transacción no está confirmada
+        """
+        ubicaciones = [(bloque, posicion) for bloque, posicion in self.ubicar_transaccion(hash_tx)
+                       if indice is None or bloque.indice == indice]
+        if not ubicaciones:
+            return None
+
+        bloque, posicion = ubicaciones[-1]
+        return {
+            'hash_transaccion': hash_tx,
+            'bloque': bloque.indice,
+            'hash_bloque': bloque.hash,
+            'raiz_merkle': bloque.raiz_merkle,
+            'posicion': posicion,
+            'prueba': prueba_inclusion(bloque.transacciones, posicion),
+        }
+
+    def sincronizar_con(self, nodo, limite=None):
+        """
+        Descarga de un nodo solo los bloques que faltan tras la punta local.
+
+        Pide /cadena/desde/<altura> por páginas y, si el primer bloque
+        recibido enlaza con la punta local, valida y añade los nuevos
+        bloques sin reemplazar la cadena.
+
+        La paginación termina al vencer el plazo de la ronda, aunque el nodo
+        siga respondiendo o anuncie una altura enorme; los bloques ya
+        descargados se validan y se añaden igualmente (cada bloque válido
+        sobre la punta mejora la cadena local) y el resto se pide en la
+        siguiente ronda.
+
+        Args:
+            nodo: Dirección host:puerto del nodo
+            limite: Instante (según self.cliente.reloj) en que vence el plazo
+                de la ronda; por defecto, self.plazo_consenso desde ahora
+
+        Returns:
+            str: 'anexada' si se añadieron bloques, 'sin_cambios' si el nodo
+            no tiene bloques nuevos, 'bifurcada' si los bloques no enlazan
+            con la punta local, 'sin_soporte' si el nodo no ofrece el
+            endpoint, 'plazo_agotado' si venció el plazo sin recibir
+            bloques, o 'invalida' si los bloques no superan la validación
+        """
+        import requests
+
+        if limite is None:
+            limite = self.cliente.reloj() + self.plazo_consenso
+        altura = len(self.cadena)
+        nuevos = []
+        agotado = False
+
+        while True:
+            restante = limite - self.cliente.reloj()
+            if restante <= 0:
+                agotado = True
+                break
+            try:
+                datos = self.cliente.obtener(nodo, f'/cadena/desde/{altura + len(nuevos)}',
+                                             timeout=min(TIMEOUT_NODO, restante),
+                                             params={'limite': LIMITE_BLOQUES})
+                pagina = [Bloque.desde_dict(bloque) for bloque in datos['bloques']]
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    return 'sin_soporte'
+                logger.warning("Error sincronizando con nodo %s: %s", nodo, e)
+                return 'invalida'
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+                if self.cliente.reloj() >= limite:
+                    agotado = True
+                    break
+                logger.warning("Error sincronizando con nodo %s: %s", nodo, e)
+                return 'invalida'
+
+            nuevos.extend(pagina)
+            if not pagina or altura + len(nuevos) >= datos['longitud']:
+                break
+
+        if agotado:
+            logger.warning("Plazo de la ronda agotado sincronizando con %s (%d bloque(s) recibidos)",
+                           nodo, len(nuevos))
+        if not nuevos:
+            return 'plazo_agotado' if agotado else 'sin_cambios'
+
+        # La punta no puede cambiar entre la comprobación y el anexado
+        with self.cerrojo:
+            if nuevos[0].hash_previo != self.ultimo_bloque.hash:
+                return 'bifurcada'
+
+            # Validar el enlace desde la punta local hasta el último bloque nuevo
+            if not self.validar_cadena([self.ultimo_bloque] + nuevos):
+                return 'invalida'
+
+            for bloque in nuevos:
+                self._anexar_bloque(bloque)
+        logger.info("Sincronización incremental con %s: %d bloque(s) añadidos", nodo, len(nuevos))
+        return 'anexada'
+
+    def _registrar_consulta(self, fase, resultado):
+        """Guarda en self.ultima_ronda (y en las métricas) la latencia y el error de una consulta"""
+        self.ultima_ronda.append({
+            'fase': fase,
+            'nodo': resultado['nodo'],
+            'latencia_ms': resultado['latencia_ms'],
+            'error': resultado['error'],
+        })
+        self.metricas.consulta_nodo.observar(resultado['latencia_ms'] / 1000, fase)
+        if resultado['error']:
+            self.metricas.errores_nodo.incrementar(1, fase)
+            logger.warning("Error conectando con nodo %s: %s", resultado['nodo'], resultado['error'])
+
+    def _candidatos_consenso(self, vecinos, limite):
+        """
+        Fase 1 del consenso: consulta la punta de todos los nodos.
+
+        Args:
+            vecinos: Direcciones de los nodos a consultar
+            limite: Instante en que vence el plazo de la ronda
+
+        Returns:
+            list: Nodos con más trabajo acumulado que la cadena local,
+            ordenados de mejor a peor. Los nodos antiguos sin /cadena/punta
+            se añaden al final para descargarles la cadena completa.
+        """
+        punta_local = self.punta()
+        ranking = []
+        sin_punta = []
+
+        restante = max(0.0, limite - self.cliente.reloj())
+        for resultado in self.cliente.consultar_todos(vecinos, '/cadena/punta', plazo=restante):
+            self._registrar_consulta('punta', resultado)
+            if resultado['estado'] == 404:
+                sin_punta.append(resultado['nodo'])
+                continue
+
+            punta = resultado['datos']
+            if punta is None:
+                continue
+            try:
+                clave = (punta['trabajo_acumulado'], punta['longitud'])
+                mejor = clave > (punta_local['trabajo_acumulado'], punta_local['longitud'])
+            except (KeyError, TypeError) as e:
+                logger.warning("Punta inválida del nodo %s: %s", resultado['nodo'], e)
+                continue
+            if mejor and punta['hash_punta'] != punta_local['hash_punta']:
+                ranking.append((clave, resultado['nodo']))
+
+        ranking.sort(key=lambda candidato: candidato[0], reverse=True)
+        return [nodo for _, nodo in ranking] + sin_punta
+
+    def _sincronizar_candidato(self, nodo, limite=None):
+        """
+        Se pone al día con un nodo que tiene una cadena mejor.
+
+        Primero intenta la sincronización incremental; si los bloques no
+        enlazan con la punta local (bifurcación) o el nodo es antiguo,
+        descarga su cadena completa y la adopta si es más larga y válida.
+
+        Args:
+            nodo: Dirección host:puerto del nodo
+            limite: Instante en que vence el plazo de la ronda (ver
+                sincronizar_con); ambas descargas comparten ese plazo
+
+        Returns:
+            bool: True si la cadena local cambió
+        """
+        if limite is None:
+            limite = self.cliente.reloj() + self.plazo_consenso
+        estado = self.sincronizar_con(nodo, limite)
+        if estado == 'anexada':
+            return True
+        if estado in ('invalida', 'sin_cambios', 'plazo_agotado'):
+            return False
+
+        # Bifurcación o nodo antiguo: descargar la cadena completa
+        # (en formato binario si el nodo lo ofrece)
+        restante = max(0.0, limite - self.cliente.reloj())
+        resultado = self.cliente.consultar_todos([nodo], '/cadena', plazo=restante, binario=True)[0]
+        self._registrar_consulta('cadena', resultado)
+        if resultado['datos'] is None:
+            return False
+
+        try:
+            longitud = resultado['datos']['longitud']
+            cadena = [Bloque.desde_dict(bloque) for bloque in resultado['datos']['cadena']]
+        except (KeyError, TypeError) as e:
+            logger.warning("Respuesta inválida del nodo %s: %s", nodo, e)
+            return False
+
+        with self.cerrojo:
+            if longitud <= len(self.cadena):
                 return False
 
-            # Verificar Proof of Work
-            if not self.prueba_valida(bloque_anterior['prueba'], 
-                                      bloque['prueba'], 
-                                      hash_anterior):
-                print(f"Error: Proof of Work inválido en bloque {indice_actual}")
+            # Verificar si es válida; si no, el llamador prueba otro nodo
+            comun = self.validar_cadena_ajena(cadena)
+            if comun is not None:
+                logger.info("Cadena más larga encontrada en nodo %s: %d bloques", nodo, longitud)
+                self._adoptar_cadena(cadena, comun)
+                return True
+
+        logger.warning("Cadena del nodo %s inválida, probando siguiente candidato", nodo)
+        return False
+
+    def _marcar_visto(self, hash_bloque):
+        """
+        Registra el hash de un bloque anunciado.
+
+        Returns:
+            bool: False si ya se había visto (anuncio duplicado)
+        """
+        with self.cerrojo:
+            if hash_bloque in self.anuncios_vistos:
                 return False
+            self.anuncios_vistos[hash_bloque] = None
+            if len(self.anuncios_vistos) > MAX_ANUNCIOS_VISTOS:
+                self.anuncios_vistos.popitem(last=False)
+            return True
 
-            bloque_anterior = bloque
-            indice_actual += 1
+    def anunciar_bloque(self, bloque, excluir=()):
+        """
+        Anuncia un bloque a los nodos vecinos (POST /bloques/anunciar).
 
-        return True
+        El envío es asíncrono (ver ClienteNodos.difundir): no espera a que
+        los vecinos respondan.
+
+        Args:
+            bloque: Bloque minado o aceptado por este nodo
+            excluir: Nodos a los que no hace falta anunciarlo (p. ej. el
+                que lo anunció primero)
+
+        Returns:
+            list: Futuros de los envíos (vacía si no hay vecinos)
+        """
+        self._marcar_visto(bloque.hash)
+        destinos = [nodo for nodo in self.nodos if nodo not in excluir]
+        if not destinos:
+            return []
+        anuncio = {'bloque': bloque.to_dict(incluir_hash=True), 'origen': self.direccion}
+        return self.cliente.difundir(destinos, '/bloques/anunciar', anuncio)
+
+    def recibir_anuncio(self, bloque_dict, origen=None):
+        """
+        Procesa el anuncio de un bloque enviado por otro nodo.
+
+        - Si el bloque ya se había visto, se descarta.
+        - Si enlaza con la punta local, se valida y se añade.
+        - Si está por delante de la punta local (faltan bloques intermedios
+          o el emisor está en otra rama), se piden al nodo de origen solo
+          los bloques que faltan (ver _sincronizar_candidato). Sin origen
+          conocido se ejecuta el consenso con todos los vecinos.
+
+        Los bloques aceptados se vuelven a anunciar al resto de vecinos.
+
+        Args:
+            bloque_dict: Bloque en el formato de Bloque.to_dict (con 'hash')
+            origen: Dirección host:puerto del nodo que lo anunció
+
+        Returns:
+            str: 'anexado', 'sincronizado', 'duplicado', 'obsoleto' (no
+            mejora la cadena local) o 'invalido'
+        """
+        bloque = Bloque.desde_dict(bloque_dict)
+        if 'hash' in bloque_dict and bloque_dict['hash'] != bloque.hash:
+            return 'invalido'
+
+        if not self._marcar_visto(bloque.hash):
+            return 'duplicado'
+
+        with self.cerrojo:
+            punta = self.ultimo_bloque
+            if bloque.hash_previo == punta.hash:
+                if not self.validar_cadena([punta, bloque]):
+                    return 'invalido'
+                try:
+                    self._anexar_bloque(bloque)
+                except Exception:
+                    # No se anexó: un nuevo anuncio del bloque debe procesarse
+                    self.anuncios_vistos.pop(bloque.hash, None)
+                    raise
+                estado = 'anexado'
+            elif bloque.indice <= len(self.cadena):
+                return 'obsoleto'
+            else:
+                estado = None
+
+        if estado is None:
+            # Faltan bloques: pedirlos fuera del cerrojo (red lenta)
+            if origen:
+                self.ultima_ronda = []
+                cambiada = self._sincronizar_candidato(origen)
+            else:
+                cambiada = self.resolver_conflictos()
+            incluido = (cambiada and len(self.cadena) >= bloque.indice
+                        and self.cadena[bloque.indice - 1].hash == bloque.hash)
+            if not incluido:
+                # Otro vecino puede volver a anunciarlo con éxito
+                with self.cerrojo:
+                    self.anuncios_vistos.pop(bloque.hash, None)
+                return 'obsoleto'
+            estado = 'sincronizado'
+
+        logger.info("Bloque %d recibido por anuncio (%s)", bloque.indice, estado)
+        self.anunciar_bloque(bloque, excluir={origen})
+        return estado
 
     def resolver_conflictos(self):
         """
         Algoritmo de consenso: Regla de la cadena más larga.
         
         Reemplaza la cadena actual si existe una más larga y válida
-        en la red distribuida.
+        en la red distribuida. Funciona en dos fases:
+
+        1. Se consulta /cadena/punta (longitud, hash de la punta y trabajo
+           acumulado) de todos los nodos a la vez y se ordenan.
+        2. Solo se descarga la cadena del mejor candidato; si no es válida
+           se pasa al siguiente.
+
+        La latencia y el error de cada consulta quedan en self.ultima_ronda.
         
         Returns:
             bool: True si la cadena fue reemplazada, False en caso contrario
         """
-        vecinos = self.nodos
-        nueva_cadena = None
-        longitud_maxima = len(self.cadena)
+        vecinos = list(self.nodos)
+        self.ultima_ronda = []
+        comienzo = perf_counter()
+        # Un único plazo para toda la ronda: puntas, sincronización y descargas
+        limite = self.cliente.reloj() + self.plazo_consenso
 
-        print(f"Verificando consenso con {len(vecinos)} nodos...")
+        logger.info("Verificando consenso con %d nodos...", len(vecinos))
 
-        # Consultar todos los nodos de la red
-        for nodo in vecinos:
-            try:
-                respuesta = requests.get(f'http://{nodo}/cadena', timeout=5)
-
-                if respuesta.status_code == 200:
-                    longitud = respuesta.json()['longitud']
-                    cadena = respuesta.json()['cadena']
-
-                    # Verificar si es más larga y válida
-                    if longitud > longitud_maxima and self.validar_cadena(cadena):
-                        longitud_maxima = longitud
-                        nueva_cadena = cadena
-                        print(f"Cadena más larga encontrada en nodo {nodo}: {longitud} bloques")
-            except requests.exceptions.RequestException as e:
-                print(f"Error conectando con nodo {nodo}: {e}")
-                continue
+        try:
+            for nodo in self._candidatos_consenso(vecinos, limite):
+                if self.cliente.reloj() >= limite:
+                    logger.warning("Plazo de la ronda de consenso agotado")
+                    break
+                if self._sincronizar_candidato(nodo, limite):
+                    logger.info("Cadena actualizada por consenso")
+                    self.anunciar_bloque(self.ultimo_bloque)
+                    return True
 
-        # Actualizar cadena si se encontró una mejor
-        if nueva_cadena:
-            self.cadena = nueva_cadena
-            print("Cadena actualizada por consenso")
-            return True
-
-        print("Cadena actual es autoritativa")
-        return False
+            logger.info("Cadena actual es autoritativa")
+            return False
+        finally:
+            self.metricas.ronda_consenso.observar(perf_counter() - comienzo)
 
     def nuevo_bloque(self, prueba, hash_previo=None):
         """
         Crea un nuevo bloque y lo añade a la cadena.
+
+        El bloque incluye como máximo self.max_transacciones_bloque
+        transacciones del mempool, por orden de llegada.
         
         Args:
             prueba: Número que satisface el Proof of Work
@@ -180,19 +1127,19 @@ class Blockchain:
         Returns:
             Bloque: El nuevo bloque creado
         """
-        bloque = Bloque(
-            indice=len(self.cadena) + 1,
-            timestamp=time(),
-            transacciones=self.transacciones_pendientes,
-            prueba=prueba,
-            hash_previo=hash_previo or self.hash(self.cadena[-1].to_dict()),
-        )
+        with self.cerrojo:
+            bloque = Bloque(
+                indice=len(self.cadena) + 1,
+                timestamp=time(),
+                transacciones=self.mempool.seleccionar(self.max_transacciones_bloque),
+                prueba=prueba,
+                hash_previo=hash_previo or self.cadena[-1].hash,
+            )
 
-        # Resetear transacciones pendientes
-        self.transacciones_pendientes = []
-        self.cadena.append(bloque)
+            # Las transacciones incluidas salen del mempool; el resto espera
+            self._anexar_bloque(bloque)
         
-        print(f"Bloque {bloque.indice} añadido a la cadena")
+        logger.info("Bloque %d añadido a la cadena", bloque.indice)
         return bloque
 
     def nueva_transaccion(self, emisor, receptor, cantidad):
@@ -206,14 +1153,73 @@ class Blockchain:
             
         Returns:
             int: Índice del bloque que contendrá esta transacción
+
+        Raises:
+            ValueError: Si la transacción no es válida o el mempool la
+                rechaza (duplicada, demasiado grande o mempool llena)
         """
-        self.transacciones_pendientes.append({
+        transaccion = {
             'emisor': emisor,
             'receptor': receptor,
             'cantidad': cantidad,
-        })
+        }
+        error = validar_transaccion(transaccion)
+        if error:
+            raise ValueError(f'Transacción rechazada: {error}')
+
+        # La recompensa del minero debe entrar siempre en el próximo bloque
+        with self.cerrojo:
+            aceptada, motivo = self.mempool.agregar(transaccion,
+                                                    prioritaria=emisor == EMISOR_RECOMPENSA)
+            if not aceptada:
+                raise ValueError(f'Transacción rechazada: {motivo}')
+
+            return self.ultimo_bloque.indice + 1
 
-        return self.ultimo_bloque.indice + 1
+    def nuevas_transacciones(self, transacciones):
+        """
+        Añade un lote de transacciones al mempool en una sola operación.
+
+        Args:
+            transacciones: Diccionarios con emisor, receptor y cantidad
+                (ya validados con validar_transaccion)
+
+        Returns:
+            list: Un (aceptada, hash o motivo) por transacción, en orden
+        """
+        lote = [{'emisor': transaccion['emisor'],
+                 'receptor': transaccion['receptor'],
+                 'cantidad': transaccion['cantidad']} for transaccion in transacciones]
+        with self.cerrojo:
+            return self.mempool.agregar_lote(lote)
+
+    @property
+    def transacciones_pendientes(self):
+        """Transacciones del mempool, en orden de llegada"""
+        return list(self.mempool)
+
+    @property
+    def trabajo_acumulado(self):
+        """
+        Trabajo esperado para construir la cadena, en hashes.
+
+        Cada bloque posterior al génesis requiere en promedio 16^DIFICULTAD
+        intentos; con dificultad fija el trabajo es proporcional a la longitud.
+        """
+        return (len(self.cadena) - 1) * 16 ** DIFICULTAD
+
+    def punta(self):
+        """
+        Metadatos de la punta de la cadena, sin descargar los bloques.
+
+        Returns:
+            dict: longitud, hash del último bloque y trabajo acumulado
+        """
+        return {
+            'longitud': len(self.cadena),
+            'hash_punta': self.ultimo_bloque.hash,
+            'trabajo_acumulado': self.trabajo_acumulado,
+        }
 
     @property
     def ultimo_bloque(self):
@@ -226,41 +1232,104 @@ class Blockchain:
         Genera hash SHA-256 de un bloque.
         
         Args:
-            bloque: Diccionario representando el bloque
+            bloque: Objeto Bloque (usa su hash memorizado) o diccionario
             
         Returns:
             str: Hash hexadecimal del bloque
         """
-        bloque_string = json.dumps(bloque, sort_keys=True).encode()
-        return hashlib.sha256(bloque_string).hexdigest()
+        if isinstance(bloque, Bloque):
+            return bloque.hash
+        return hash_canonico(bloque)
 
-    def proof_of_work(self, ultimo_bloque):
+    def proof_of_work(self, ultimo_bloque, cancelar=None, progreso=None):
         """
         Algoritmo Proof of Work (PoW).
         
         Encuentra un número p' tal que hash(pp'h) contenga 4 ceros iniciales,
         donde p es la prueba anterior, p' es la nueva prueba, y h es el hash anterior.
+        La búsqueda se reparte entre self.trabajadores procesos y devuelve
+        la menor prueba válida, igual que la búsqueda secuencial.
         
         Args:
             ultimo_bloque: Último bloque de la cadena
+            cancelar: Función opcional; si devuelve True la búsqueda se abandona
+            progreso: Función opcional (hashes, segundos) llamada durante la búsqueda
             
         Returns:
-            int: Prueba válida encontrada
+            int: Prueba válida encontrada, o None si se canceló
         """
         ultima_prueba = ultimo_bloque.prueba
-        ultimo_hash = self.hash(ultimo_bloque.to_dict())
+        ultimo_hash = ultimo_bloque.hash
 
-        prueba = 0
-        print("Ejecutando Proof of Work...", end="")
-        
-        while self.prueba_valida(ultima_prueba, prueba, ultimo_hash) is False:
-            prueba += 1
-            if prueba % 100000 == 0:
-                print(".", end="", flush=True)
+        logger.info("Ejecutando Proof of Work con %d trabajador(es) [backend %s]...",
+                    self.trabajadores, self.backend_mineria)
+
+        comienzo = perf_counter()
+        prueba, self.estadisticas_mineria = buscar_prueba(
+            ultima_prueba, ultimo_hash, backend=self.backend_mineria,
+            cancelar=cancelar, progreso=progreso, pool=self.pool_mineria)
+        duracion = perf_counter() - comienzo
+
+        hashes = sum(estadistica['hashes'] for estadistica in self.estadisticas_mineria)
+        self.metricas.hashes.incrementar(hashes)
+        if duracion > 0:
+            self.metricas.hashes_por_segundo.fijar(round(hashes / duracion))
+        self.metricas.pow.observar(duracion, 'cancelado' if prueba is None else 'encontrada')
 
-        print(f"\nProof of Work completado. Prueba encontrada: {prueba}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for estadistica in self.estadisticas_mineria:
+                logger.debug("Trabajador %d (pid %d): %d hashes/s", estadistica['trabajador'],
+                             estadistica['pid'], estadistica['hashes_por_segundo'])
+
+        if prueba is None:
+            logger.info("Proof of Work cancelado")
+            return None
+
+        # El verificador de referencia confirma el resultado del kernel
+        if not self.prueba_valida(ultima_prueba, prueba, ultimo_hash):
+            raise RuntimeError(f"El kernel de minería devolvió una prueba inválida: {prueba}")
+
+        logger.info("Proof of Work completado. Prueba encontrada: %d", prueba)
         return prueba
 
+    def minar_bloque(self, receptor, cancelar=None, progreso=None):
+        """
+        Mina un bloque sobre la punta actual, lo añade a la cadena y lo
+        anuncia a los nodos vecinos.
+
+        La búsqueda se abandona en cuanto la punta cambia (p. ej. porque el
+        consenso reemplazó la cadena o llegó un bloque nuevo), para no
+        seguir minando sobre un padre obsoleto.
+
+        Args:
+            receptor: Dirección que recibe la recompensa de minado
+            cancelar: Función opcional; si devuelve True se abandona el minado
+            progreso: Función opcional (hashes, segundos) llamada durante la búsqueda
+
+        Returns:
+            Bloque: El bloque minado, o None si la búsqueda se abandonó
+        """
+        ultimo_bloque = self.ultimo_bloque
+        hash_previo = ultimo_bloque.hash
+
+        def abandonar():
+            return (cancelar is not None and cancelar()) or self.ultimo_bloque.hash != hash_previo
+
+        prueba = self.proof_of_work(ultimo_bloque, cancelar=abandonar, progreso=progreso)
+        if prueba is None:
+            return None
+
+        with self.cerrojo:
+            if self.ultimo_bloque.hash != hash_previo:
+                return None
+
+            # Recompensa por minar
+            self.nueva_transaccion(emisor=EMISOR_RECOMPENSA, receptor=receptor, cantidad=1)
+            bloque = self.nuevo_bloque(prueba, hash_previo)
+
+        self.anunciar_bloque(bloque)
+        return bloque
+
     @staticmethod
     def prueba_valida(ultima_prueba, prueba, ultimo_hash):
         """
@@ -276,214 +1345,66 @@ class Blockchain:
         """
         intento = f'{ultima_prueba}{prueba}{ultimo_hash}'.encode()
         hash_intento = hashlib.sha256(intento).hexdigest()
-        return hash_intento[:4] == "0000"
+        return hash_intento[:DIFICULTAD] == "0" * DIFICULTAD
 
 
-# Inicializar aplicación Flask
-app = Flask(__name__)
-
-# Generar identificador único para este nodo
-identificador_nodo = str(uuid4()).replace('-', '')
-
-# Instanciar blockchain
-blockchain = Blockchain()
-
-
-@app.route('/minar', methods=['GET'])
-def minar():
-    """
-    Endpoint para minar un nuevo bloque.
-    
-    Proceso:
-    1. Ejecutar Proof of Work
-    2. Recompensar al minero
-    3. Crear nuevo bloque
-    
-    Returns:
-        JSON con información del bloque minado
+def generar_cadena_json(cadena):
     """
-    print("\n--- INICIANDO MINADO ---")
-    
-    # Ejecutar PoW
-    ultimo_bloque = blockchain.ultimo_bloque
-    prueba = blockchain.proof_of_work(ultimo_bloque)
-
-    # Recompensa por minar
-    blockchain.nueva_transaccion(
-        emisor="0",
-        receptor=identificador_nodo,
-        cantidad=1,
-    )
-
-    # Crear nuevo bloque
-    hash_previo = blockchain.hash(ultimo_bloque.to_dict())
-    bloque = blockchain.nuevo_bloque(prueba, hash_previo)
-
-    respuesta = {
-        'mensaje': "Nuevo bloque minado",
-        'indice': bloque.indice,
-        'transacciones': bloque.transacciones,
-        'prueba': bloque.prueba,
-        'hash_previo': bloque.hash_previo,
-    }
-    
-    print("--- MINADO COMPLETADO ---\n")
-    return jsonify(respuesta), 200
+    Genera el JSON de /cadena por fragmentos, bloque a bloque.
 
+    El documento tiene la misma forma que {'cadena': [...], 'longitud': N},
+    pero nunca se materializa completo: la memoria por petición no depende
+    de la longitud de la cadena y el primer byte sale de inmediato.
 
-@app.route('/transacciones/nueva', methods=['POST'])
-def nueva_transaccion():
-    """
-    Endpoint para crear una nueva transacción.
-    
-    Body esperado:
-        {
-            "emisor": "direccion_emisor",
-            "receptor": "direccion_receptor",
-            "cantidad": 100
-        }
-    
-    Returns:
-        JSON confirmando la transacción
-    """
-    valores = request.get_json()
-
-    # Validar campos requeridos
-    campos_requeridos = ['emisor', 'receptor', 'cantidad']
-    if not all(campo in valores for campo in campos_requeridos):
-        return 'Faltan valores requeridos', 400
-
-    # Crear transacción
-    indice = blockchain.nueva_transaccion(
-        valores['emisor'],
-        valores['receptor'],
-        valores['cantidad']
-    )
-
-    respuesta = {
-        'mensaje': f'Transacción será añadida al bloque {indice}'
-    }
-    return jsonify(respuesta), 201
-
-
-@app.route('/cadena', methods=['GET'])
-def cadena_completa():
-    """
-    Endpoint que retorna la blockchain completa.
-    
-    Returns:
-        JSON con la cadena completa y su longitud
-    """
-    respuesta = {
-        'cadena': [bloque.to_dict() for bloque in blockchain.cadena],
-        'longitud': len(blockchain.cadena),
-    }
-    return jsonify(respuesta), 200
+    Si la cadena cambia mientras se envía (p. ej. una reorganización), el
+    envío se corta en el último bloque que sigue enlazado con los
+    anteriores y 'longitud' refleja los bloques realmente enviados, de
+    modo que el documento siempre es una cadena coherente.
 
+    Args:
+        cadena: Secuencia de bloques; se envían los que tenga al empezar
 
-@app.route('/nodos/registrar', methods=['POST'])
-def registrar_nodos():
-    """
-    Endpoint para registrar nuevos nodos en la red.
-    
-    Body esperado:
-        {
-            "nodos": ["http://localhost:5001", "http://localhost:5002"]
-        }
-    
-    Returns:
-        JSON con lista de nodos registrados
+    Yields:
+        str: Fragmentos del documento JSON
     """
-    valores = request.get_json()
-    nodos = valores.get('nodos')
-    
-    if nodos is None:
-        return "Error: Lista de nodos inválida", 400
+    yield '{"cadena":['
+    longitud = len(cadena)
+    enviados = 0
+    hash_previo = None
+    fragmento = []
+    while enviados < longitud:
+        try:
+            bloque = cadena[enviados]
+        except IndexError:
+            break
+        if enviados and bloque.hash_previo != hash_previo:
+            break
 
-    for nodo in nodos:
-        blockchain.registrar_nodo(nodo)
+        bloque_dict = bloque.to_dict(incluir_hash=True)
+        fragmento.append(json.dumps(bloque_dict, sort_keys=True, separators=(',', ':')))
+        hash_previo = bloque_dict['hash']
+        enviados += 1
+        if len(fragmento) == BLOQUES_POR_FRAGMENTO:
+            yield (',' if enviados > len(fragmento) else '') + ','.join(fragmento)
+            fragmento = []
 
-    respuesta = {
-        'mensaje': 'Nuevos nodos registrados',
-        'nodos_totales': list(blockchain.nodos),
-    }
-    return jsonify(respuesta), 201
+    if fragmento:
+        yield (',' if enviados > len(fragmento) else '') + ','.join(fragmento)
+    yield f'],"longitud":{enviados}}}'
 
 
-@app.route('/nodos/resolver', methods=['GET'])
-def consenso():
-    """
-    Endpoint para ejecutar algoritmo de consenso.
-    
-    Aplica la regla de la cadena más larga para resolver
-    conflictos entre nodos.
-    
-    Returns:
-        JSON indicando si la cadena fue reemplazada
-    """
-    print("\n--- EJECUTANDO CONSENSO ---")
-    reemplazada = blockchain.resolver_conflictos()
+# La API REST vive en servidor.py y solo se importa (con Flask) al pedirla
+_API = ('Nodo', 'create_app')
 
-    if reemplazada:
-        respuesta = {
-            'mensaje': 'Cadena reemplazada',
-            'nueva_cadena': [bloque.to_dict() for bloque in blockchain.cadena]
-        }
-    else:
-        respuesta = {
-            'mensaje': 'Cadena autoritativa',
-            'cadena': [bloque.to_dict() for bloque in blockchain.cadena]
-        }
 
-    print("--- CONSENSO COMPLETADO ---\n")
-    return jsonify(respuesta), 200
-
-
-@app.route('/', methods=['GET'])
-def info():
-    """
-    Endpoint de información del nodo.
-    
-    Returns:
-        JSON con información básica del nodo
-    """
-    respuesta = {
-        'mensaje': 'Blockchain Educativo - Nodo Activo',
-        'nodo_id': identificador_nodo,
-        'bloques': len(blockchain.cadena),
-        'endpoints': {
-            'minar': '/minar',
-            'nueva_transaccion': '/transacciones/nueva',
-            'cadena': '/cadena',
-            'registrar_nodos': '/nodos/registrar',
-            'consenso': '/nodos/resolver'
-        }
-    }
-    return jsonify(respuesta), 200
+def __getattr__(nombre):
+    if nombre in _API:
+        import servidor
+        return getattr(servidor, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
 if __name__ == '__main__':
-    from argparse import ArgumentParser
-
-    parser = ArgumentParser()
-    parser.add_argument('-p', '--puerto', default=5000, type=int, 
-                       help='Puerto para el servidor')
-    args = parser.parse_args()
-    puerto = args.puerto
-
-    print("\n" + "="*60)
-    print("BLOCKCHAIN EDUCATIVO - SISTEMA DISTRIBUIDO")
-    print("="*60)
-    print(f"\nNodo ID: {identificador_nodo}")
-    print(f"Puerto: {puerto}")
-    print(f"\nServidor iniciado en: http://localhost:{puerto}")
-    print("\nEndpoints disponibles:")
-    print("  GET  /           - Información del nodo")
-    print("  GET  /cadena     - Ver blockchain completa")
-    print("  GET  /minar      - Minar nuevo bloque")
-    print("  POST /transacciones/nueva - Crear transacción")
-    print("  POST /nodos/registrar     - Registrar nodos")
-    print("  GET  /nodos/resolver      - Ejecutar consenso")
-    print("\n" + "="*60 + "\n")
-
-    app.run(host='0.0.0.0', port=puerto, debug=True, use_reloader=False)
+    from servidor import main
+
+    main()
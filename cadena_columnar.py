@@ -0,0 +1,173 @@
+"""
+Cadena Columnar - Blockchain Educativo
+======================================
+Almacenamiento en memoria de la cadena por columnas
+
+Componentes:
+- Columnas compactas (array y bytearray) para los campos escalares de
+  cada bloque: índice, timestamp, prueba, hash previo, raíz de Merkle y hash
+- Transacciones codificadas en binario en un único búfer con offsets
+- Reconstrucción bajo demanda de los objetos Bloque, con una caché
+  pequeña de los más recientes (almacenamiento.CacheBloques)
+
+En lugar de una lista con un objeto Bloque (y sus diccionarios de
+transacciones) por bloque, cada campo ocupa unos pocos bytes en su
+columna. Los bloques que no encajan en las columnas (p. ej. el génesis,
+cuyo hash previo es '1', o un timestamp entero) se guardan tal cual, para
+que la reconstrucción sea exacta y el hash canónico no cambie.
+"""
+
+from array import array
+
+from almacenamiento import CacheBloques
+from formato_binario import codificar_transacciones, decodificar_transacciones
+
+# Bloques reconstruidos que se conservan en memoria
+TAMANO_CACHE = 128
+
+# Bytes de un hash SHA-256
+TAMANO_HASH = 32
+
+_LIMITE_ENTERO = 2 ** 63
+_HEXADECIMAL = frozenset('0123456789abcdef')
+
+
+def _es_hash(valor):
+    return type(valor) is str and len(valor) == 2 * TAMANO_HASH and _HEXADECIMAL.issuperset(valor)
+
+
+def _es_entero(valor):
+    return type(valor) is int and -_LIMITE_ENTERO <= valor < _LIMITE_ENTERO
+
+
+def _encaja(bloque):
+    """Indica si los campos del bloque se pueden guardar en las columnas sin pérdida"""
+    return (_es_entero(bloque.indice) and type(bloque.timestamp) is float
+            and _es_entero(bloque.prueba) and _es_hash(bloque.hash_previo)
+            and _es_hash(bloque.raiz_merkle))
+
+
+class CadenaColumnar:
+    """
+    Secuencia de bloques guardada por columnas.
+
+    Se comporta como la lista self.cadena de Blockchain (longitud, acceso
+    por posición y por slice, iteración, append y del cadena[n:]), igual
+    que almacenamiento.CadenaPersistente.
+    """
+
+    def __init__(self, fabrica, tamano_cache=TAMANO_CACHE):
+        """
+        Args:
+            fabrica: Función (diccionario, hash) -> Bloque
+            tamano_cache: Bloques reconstruidos que se conservan en memoria
+        """
+        self.fabrica = fabrica
+        self._cache = CacheBloques(tamano_cache)
+
+        self._indices = array('q')
+        self._timestamps = array('d')
+        self._pruebas = array('q')
+        self._hashes_previos = bytearray()
+        self._raices = bytearray()
+        self._hashes = bytearray()
+
+        # Transacciones codificadas: las del bloque i ocupan
+        # _transacciones[_fin_transacciones[i - 1]:_fin_transacciones[i]]
+        self._transacciones = bytearray()
+        self._fin_transacciones = array('Q')
+
+        # Bloques que no encajan en las columnas, por posición
+        self._especiales = {}
+
+    def __len__(self):
+        return len(self._indices)
+
+    def _hash_en(self, columna, posicion):
+        return columna[posicion * TAMANO_HASH:(posicion + 1) * TAMANO_HASH].hex()
+
+    def _reconstruir(self, posicion):
+        especial = self._especiales.get(posicion)
+        if especial is not None:
+            return especial
+
+        inicio = self._fin_transacciones[posicion - 1] if posicion else 0
+        datos = {
+            'indice': self._indices[posicion],
+            'timestamp': self._timestamps[posicion],
+            'transacciones': decodificar_transacciones(
+                bytes(self._transacciones[inicio:self._fin_transacciones[posicion]])),
+            'prueba': self._pruebas[posicion],
+            'hash_previo': self._hash_en(self._hashes_previos, posicion),
+            'raiz_merkle': self._hash_en(self._raices, posicion),
+        }
+        return self.fabrica(datos, self._hash_en(self._hashes, posicion))
+
+    def _bloque(self, posicion):
+        bloque = self._cache.obtener(posicion)
+        if bloque is None:
+            bloque = self._reconstruir(posicion)
+            self._cache.guardar(posicion, bloque)
+        return bloque
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self._bloque(i) for i in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError('Posición fuera de la cadena')
+        return self._bloque(posicion)
+
+    def __iter__(self):
+        for posicion in range(len(self)):
+            yield self._bloque(posicion)
+
+    def append(self, bloque):
+        posicion = len(self)
+        if _encaja(bloque):
+            # Todo lo que puede fallar se calcula antes de tocar las columnas,
+            # para que un error no las deje con longitudes distintas
+            transacciones = codificar_transacciones(bloque.transacciones)
+            hash_previo = bytes.fromhex(bloque.hash_previo)
+            raiz_merkle = bytes.fromhex(bloque.raiz_merkle)
+            hash_bloque = bytes.fromhex(bloque.hash)
+
+            self._indices.append(bloque.indice)
+            self._timestamps.append(bloque.timestamp)
+            self._pruebas.append(bloque.prueba)
+            self._hashes_previos += hash_previo
+            self._raices += raiz_merkle
+            self._hashes += hash_bloque
+            self._transacciones += transacciones
+        else:
+            # Las columnas mantienen una entrada por bloque aunque no se usen
+            self._indices.append(0)
+            self._timestamps.append(0.0)
+            self._pruebas.append(0)
+            self._hashes_previos += bytes(TAMANO_HASH)
+            self._raices += bytes(TAMANO_HASH)
+            self._hashes += bytes(TAMANO_HASH)
+            self._especiales[posicion] = bloque
+        self._fin_transacciones.append(len(self._transacciones))
+        self._cache.guardar(posicion, bloque)
+
+    def __delitem__(self, posicion):
+        if not isinstance(posicion, slice) or posicion.stop is not None or posicion.step is not None:
+            raise TypeError('Solo se pueden eliminar sufijos: del cadena[n:]')
+        longitud = posicion.indices(len(self))[0]
+        if longitud >= len(self):
+            return
+
+        del self._indices[longitud:]
+        del self._timestamps[longitud:]
+        del self._pruebas[longitud:]
+        del self._hashes_previos[longitud * TAMANO_HASH:]
+        del self._raices[longitud * TAMANO_HASH:]
+        del self._hashes[longitud * TAMANO_HASH:]
+        del self._transacciones[self._fin_transacciones[longitud - 1] if longitud else 0:]
+        del self._fin_transacciones[longitud:]
+
+        for clave in [clave for clave in self._especiales if clave >= longitud]:
+            del self._especiales[clave]
+        self._cache.descartar_desde(longitud)
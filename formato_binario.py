@@ -0,0 +1,309 @@
+"""
+Formato Binario - Blockchain Educativo
+======================================
+Codificación binaria compacta de bloques para la red y el almacén en disco
+
+Componentes:
+- Codificación canónica, con prefijos de longitud, construida sobre struct
+- Cabecera con número mágico y versión en cada bloque y en cada cadena
+- Transacciones compactas sin nombres de campo repetidos
+- Decodificación sin pérdida al mismo diccionario que Bloque.to_dict
+
+El formato solo cambia cómo viajan y se guardan los bloques: el hash de
+un bloque sigue siendo el SHA-256 de su JSON canónico (regla de consenso).
+Por eso la decodificación conserva exactamente los tipos de cada valor
+(un timestamp entero sigue siendo entero) y cualquier valor que no tenga
+representación compacta se guarda como JSON.
+
+Estructura de un bloque:
+    'BQ' versión(u8)
+    indice, timestamp, prueba, hash_previo, raiz_merkle   (valores)
+    n_transacciones(u32) + transacciones
+
+Estructura de una cadena:
+    'BC' versión(u8) n_bloques(u32) + (longitud(u32) + bloque) por bloque
+"""
+
+import json
+import struct
+
+# Tipo MIME usado en la negociación de contenido de /cadena
+TIPO_BINARIO = 'application/x-blockchain-educativo'
+
+# Cabeceras y versión del formato
+MAGIA_BLOQUE = b'BQ'
+MAGIA_CADENA = b'BC'
+VERSION = 1
+
+# Etiquetas de los valores
+_ENTERO, _DECIMAL, _TEXTO, _HEX32, _JSON = range(5)
+
+# Etiquetas de las transacciones: textos cortos y cantidad entera (el caso
+# habitual), valores etiquetados, o JSON
+_TX_SIMPLE, _TX_COMPACTA, _TX_JSON = range(3)
+
+_U8 = struct.Struct('>B')
+_U16 = struct.Struct('>H')
+_U32 = struct.Struct('>I')
+_TX_CABECERA = struct.Struct('>BH')
+_CANTIDAD = struct.Struct('>q')
+_ENTERO_64 = struct.Struct('>Bq')
+_DECIMAL_64 = struct.Struct('>Bd')
+_CABECERA = struct.Struct('>2sB')
+_CABECERA_CADENA = struct.Struct('>2sBI')
+
+CAMPOS_BLOQUE = ('indice', 'timestamp', 'prueba', 'hash_previo', 'raiz_merkle')
+CAMPOS_TRANSACCION = ('emisor', 'receptor', 'cantidad')
+
+_HEXADECIMAL = frozenset('0123456789abcdef')
+
+
+def _con_longitud(etiqueta, datos):
+    return _U8.pack(etiqueta) + _U32.pack(len(datos)) + datos
+
+
+def _codificar_valor(valor, partes):
+    """Añade a partes la codificación etiquetada de un valor escalar"""
+    tipo = type(valor)
+    if tipo is int and -2 ** 63 <= valor < 2 ** 63:
+        partes.append(_ENTERO_64.pack(_ENTERO, valor))
+    elif tipo is float:
+        partes.append(_DECIMAL_64.pack(_DECIMAL, valor))
+    elif tipo is str:
+        if len(valor) == 64 and _HEXADECIMAL.issuperset(valor):
+            partes.append(_U8.pack(_HEX32) + bytes.fromhex(valor))
+        else:
+            partes.append(_con_longitud(_TEXTO, valor.encode()))
+    else:
+        # Booleanos, enteros enormes, None, listas...: JSON sin pérdida
+        partes.append(_con_longitud(_JSON, json.dumps(valor, sort_keys=True).encode()))
+
+
+def _decodificar_valor(datos, posicion):
+    """
+    Lee un valor etiquetado.
+
+    Returns:
+        tuple: (valor, posición siguiente)
+    """
+    etiqueta = datos[posicion]
+    if etiqueta == _ENTERO:
+        return _ENTERO_64.unpack_from(datos, posicion)[1], posicion + _ENTERO_64.size
+    if etiqueta == _DECIMAL:
+        return _DECIMAL_64.unpack_from(datos, posicion)[1], posicion + _DECIMAL_64.size
+    if etiqueta == _HEX32:
+        fin = posicion + 33
+        if fin > len(datos):
+            raise ValueError('Valor truncado')
+        return datos[posicion + 1:fin].hex(), fin
+    if etiqueta in (_TEXTO, _JSON):
+        longitud, = _U32.unpack_from(datos, posicion + 1)
+        inicio = posicion + 1 + _U32.size
+        fin = inicio + longitud
+        if fin > len(datos):
+            raise ValueError('Valor truncado')
+        texto = datos[inicio:fin].decode()
+        return (texto if etiqueta == _TEXTO else json.loads(texto)), fin
+    raise ValueError(f'Etiqueta de valor desconocida: {etiqueta}')
+
+
+def _codificar_transaccion(transaccion, partes):
+    if len(transaccion) != len(CAMPOS_TRANSACCION) or not all(
+            campo in transaccion for campo in CAMPOS_TRANSACCION):
+        # Transacción con otros campos: se conserva tal cual en JSON
+        partes.append(_con_longitud(_TX_JSON, json.dumps(dict(transaccion), sort_keys=True).encode()))
+        return
+
+    emisor, receptor, cantidad = (transaccion['emisor'], transaccion['receptor'],
+                                  transaccion['cantidad'])
+    if type(emisor) is str and type(receptor) is str and type(cantidad) is int \
+            and -2 ** 63 <= cantidad < 2 ** 63:
+        emisor, receptor = emisor.encode(), receptor.encode()
+        if len(emisor) < 2 ** 16 and len(receptor) < 2 ** 16:
+            partes.append(_TX_CABECERA.pack(_TX_SIMPLE, len(emisor)) + emisor
+                          + _U16.pack(len(receptor)) + receptor + _CANTIDAD.pack(cantidad))
+            return
+
+    partes.append(_U8.pack(_TX_COMPACTA))
+    for campo in CAMPOS_TRANSACCION:
+        _codificar_valor(transaccion[campo], partes)
+
+
+def _decodificar_transaccion(datos, posicion):
+    etiqueta = datos[posicion]
+    posicion += 1
+    if etiqueta == _TX_SIMPLE:
+        longitud, = _U16.unpack_from(datos, posicion)
+        posicion += 2
+        emisor = datos[posicion:posicion + longitud].decode()
+        posicion += longitud
+        longitud, = _U16.unpack_from(datos, posicion)
+        posicion += 2
+        receptor = datos[posicion:posicion + longitud].decode()
+        posicion += longitud
+        cantidad, = _CANTIDAD.unpack_from(datos, posicion)
+        return {'emisor': emisor, 'receptor': receptor, 'cantidad': cantidad}, posicion + 8
+    if etiqueta == _TX_COMPACTA:
+        transaccion = {}
+        for campo in CAMPOS_TRANSACCION:
+            transaccion[campo], posicion = _decodificar_valor(datos, posicion)
+        return transaccion, posicion
+    if etiqueta == _TX_JSON:
+        longitud, = _U32.unpack_from(datos, posicion)
+        inicio = posicion + _U32.size
+        transaccion = json.loads(datos[inicio:inicio + longitud])
+        if not isinstance(transaccion, dict):
+            raise ValueError('La transacción debe ser un objeto')
+        return transaccion, inicio + longitud
+    raise ValueError(f'Etiqueta de transacción desconocida: {etiqueta}')
+
+
+def _codificar_transacciones(transacciones, partes):
+    partes.append(_U32.pack(len(transacciones)))
+    for transaccion in transacciones:
+        _codificar_transaccion(transaccion, partes)
+
+
+def _decodificar_transacciones(datos, posicion):
+    cantidad, = _U32.unpack_from(datos, posicion)
+    posicion += _U32.size
+    transacciones = []
+    for _ in range(cantidad):
+        transaccion, posicion = _decodificar_transaccion(datos, posicion)
+        transacciones.append(transaccion)
+    return transacciones, posicion
+
+
+def codificar_transacciones(transacciones):
+    """
+    Codifica solo la lista de transacciones de un bloque (sin cabecera).
+
+    Returns:
+        bytes: Transacciones codificadas
+    """
+    partes = []
+    _codificar_transacciones(transacciones, partes)
+    return b''.join(partes)
+
+
+def decodificar_transacciones(datos):
+    """
+    Decodifica una lista codificada con codificar_transacciones.
+
+    Returns:
+        list: Diccionarios de las transacciones
+
+    Raises:
+        ValueError: Datos truncados o corruptos
+    """
+    try:
+        transacciones, fin = _decodificar_transacciones(datos, 0)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f'Transacciones binarias inválidas: {e}') from e
+    if fin != len(datos):
+        raise ValueError('Datos sobrantes tras las transacciones')
+    return transacciones
+
+
+def codificar_bloque(bloque_dict):
+    """
+    Codifica un bloque (formato de Bloque.to_dict; 'hash' se ignora).
+
+    Returns:
+        bytes: Bloque codificado
+    """
+    partes = [_CABECERA.pack(MAGIA_BLOQUE, VERSION)]
+    for campo in CAMPOS_BLOQUE:
+        _codificar_valor(bloque_dict[campo], partes)
+    _codificar_transacciones(bloque_dict['transacciones'], partes)
+    return b''.join(partes)
+
+
+def _decodificar_bloque(datos, posicion=0):
+    magia, version = _CABECERA.unpack_from(datos, posicion)
+    if magia != MAGIA_BLOQUE:
+        raise ValueError('No es un bloque en formato binario')
+    if version != VERSION:
+        raise ValueError(f'Versión de formato no soportada: {version}')
+    posicion += _CABECERA.size
+
+    bloque = {}
+    for campo in CAMPOS_BLOQUE:
+        bloque[campo], posicion = _decodificar_valor(datos, posicion)
+
+    bloque['transacciones'], posicion = _decodificar_transacciones(datos, posicion)
+    return bloque, posicion
+
+
+def decodificar_bloque(datos):
+    """
+    Decodifica un bloque codificado con codificar_bloque.
+
+    Returns:
+        dict: Diccionario del bloque (formato de Bloque.to_dict)
+
+    Raises:
+        ValueError: Datos truncados, corruptos o de otra versión
+    """
+    try:
+        bloque, fin = _decodificar_bloque(datos)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f'Bloque binario inválido: {e}') from e
+    if fin != len(datos):
+        raise ValueError('Datos sobrantes tras el bloque')
+    return bloque
+
+
+def es_binario(datos):
+    """Indica si unos datos almacenados son un bloque en formato binario"""
+    return datos[:len(MAGIA_BLOQUE)] == MAGIA_BLOQUE
+
+
+def codificar_cadena(bloques):
+    """
+    Codifica una secuencia de bloques (objetos con to_dict o diccionarios).
+
+    Returns:
+        bytes: Cadena codificada
+    """
+    partes = [_CABECERA_CADENA.pack(MAGIA_CADENA, VERSION, len(bloques))]
+    for bloque in bloques:
+        codificado = codificar_bloque(bloque if isinstance(bloque, dict) else bloque.to_dict())
+        partes.append(_U32.pack(len(codificado)))
+        partes.append(codificado)
+    return b''.join(partes)
+
+
+def decodificar_cadena(datos):
+    """
+    Decodifica una cadena codificada con codificar_cadena.
+
+    Returns:
+        list: Diccionarios de los bloques, en orden
+
+    Raises:
+        ValueError: Datos truncados, corruptos o de otra versión
+    """
+    vista = bytes(datos)
+    try:
+        magia, version, cantidad = _CABECERA_CADENA.unpack_from(vista, 0)
+        if magia != MAGIA_CADENA:
+            raise ValueError('No es una cadena en formato binario')
+        if version != VERSION:
+            raise ValueError(f'Versión de formato no soportada: {version}')
+
+        posicion = _CABECERA_CADENA.size
+        bloques = []
+        for _ in range(cantidad):
+            longitud, = _U32.unpack_from(vista, posicion)
+            posicion += _U32.size
+            bloque, fin = _decodificar_bloque(vista, posicion)
+            if fin != posicion + longitud:
+                raise ValueError('Longitud de bloque incorrecta')
+            bloques.append(bloque)
+            posicion = fin
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f'Cadena binaria inválida: {e}') from e
+    if posicion != len(vista):
+        raise ValueError('Datos sobrantes tras la cadena')
+    return bloques
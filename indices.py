@@ -0,0 +1,150 @@
+"""
+Índices Secundarios - Blockchain Educativo
+==========================================
+Localización de transacciones e historial de direcciones sin recorrer la cadena
+
+Componentes:
+- Ubicación empaquetada en un entero de 64 bits (índice de bloque, posición)
+- Índice hash de transacción -> ubicaciones
+- Índice dirección -> ubicaciones de sus transacciones, en orden de la cadena
+- Mantenimiento incremental al anexar y descartar bloques
+
+Para acotar la memoria no se guardan diccionarios por transacción: el
+índice de transacciones usa como clave los primeros 64 bits del hash (un
+entero) y las ubicaciones se guardan en arrays compactos array('Q'). Una
+colisión de prefijos solo añade candidatos, que Blockchain descarta al
+comprobar el hash completo contra el bloque.
+"""
+
+from array import array
+
+from mempool import hash_transaccion
+from saldos import EMISOR_RECOMPENSA
+
+# Bits reservados para la posición de la transacción dentro del bloque
+BITS_POSICION = 24
+MASCARA_POSICION = (1 << BITS_POSICION) - 1
+
+
+# Mayor índice de bloque que cabe en una ubicación de 64 bits
+MAX_INDICE_BLOQUE = (1 << (64 - BITS_POSICION)) - 1
+
+
+def empaquetar(indice_bloque, posicion):
+    """
+    Codifica (índice de bloque, posición) en un único entero.
+
+    Raises:
+        ValueError: Si el índice o la posición no caben en la ubicación
+    """
+    if type(indice_bloque) is not int or not 1 <= indice_bloque <= MAX_INDICE_BLOQUE:
+        raise ValueError(f'Índice de bloque fuera de rango: {indice_bloque!r}')
+    if not 0 <= posicion <= MASCARA_POSICION:
+        raise ValueError(f'Posición de transacción fuera de rango: {posicion}')
+    return (indice_bloque << BITS_POSICION) | posicion
+
+
+def desempaquetar(ubicacion):
+    """Decodifica una ubicación en (índice de bloque, posición)"""
+    return ubicacion >> BITS_POSICION, ubicacion & MASCARA_POSICION
+
+
+def clave_transaccion(hash_tx):
+    """Clave del índice: los primeros 64 bits del hash de la transacción"""
+    return int(hash_tx[:16], 16)
+
+
+def direcciones(transaccion):
+    """Direcciones que intervienen en una transacción (sin repetir)"""
+    emisor, receptor = transaccion['emisor'], transaccion['receptor']
+    if emisor == EMISOR_RECOMPENSA or emisor == receptor:
+        return (receptor,)
+    return (emisor, receptor)
+
+
+class IndiceCadena:
+    """
+    Índices de transacciones y direcciones de una cadena.
+
+    Blockchain lo mantiene desde _anexar_bloque y _truncar_cadena. Los
+    bloques se descartan siempre desde la punta, por lo que las ubicaciones
+    que se eliminan están al final de cada array.
+    """
+
+    def __init__(self):
+        # Prefijo del hash -> ubicación (int) o varias ubicaciones (array)
+        self._por_transaccion = {}
+        # Dirección -> ubicaciones en orden de la cadena
+        self._por_direccion = {}
+        self.transacciones = 0
+
+    def anexar(self, bloque):
+        """Indexa las transacciones de un bloque añadido a la punta"""
+        # Se empaqueta todo antes de modificar el índice: si el bloque no
+        # cabe, el índice queda como estaba
+        ubicaciones = [empaquetar(bloque.indice, posicion)
+                       for posicion in range(len(bloque.transacciones))]
+        for ubicacion, transaccion in zip(ubicaciones, bloque.transacciones):
+            clave = clave_transaccion(hash_transaccion(transaccion))
+
+            actual = self._por_transaccion.get(clave)
+            if actual is None:
+                self._por_transaccion[clave] = ubicacion
+            elif isinstance(actual, array):
+                actual.append(ubicacion)
+            else:
+                self._por_transaccion[clave] = array('Q', (actual, ubicacion))
+
+            for direccion in direcciones(transaccion):
+                historial = self._por_direccion.get(direccion)
+                if historial is None:
+                    historial = self._por_direccion[direccion] = array('Q')
+                historial.append(ubicacion)
+            self.transacciones += 1
+
+    def descartar(self, bloque):
+        """Elimina del índice las transacciones del bloque de la punta"""
+        for posicion in range(len(bloque.transacciones) - 1, -1, -1):
+            transaccion = bloque.transacciones[posicion]
+            ubicacion = empaquetar(bloque.indice, posicion)
+            clave = clave_transaccion(hash_transaccion(transaccion))
+
+            actual = self._por_transaccion.get(clave)
+            if isinstance(actual, array):
+                actual.remove(ubicacion)
+                if len(actual) == 1:
+                    self._por_transaccion[clave] = actual[0]
+            elif actual == ubicacion:
+                del self._por_transaccion[clave]
+
+            for direccion in direcciones(transaccion):
+                historial = self._por_direccion[direccion]
+                historial.pop()
+                if not historial:
+                    del self._por_direccion[direccion]
+            self.transacciones -= 1
+
+    def candidatos(self, hash_tx):
+        """
+        Ubicaciones cuyo hash comparte prefijo con hash_tx.
+
+        Returns:
+            list: Pares (índice de bloque, posición) en orden de la cadena
+        """
+        actual = self._por_transaccion.get(clave_transaccion(hash_tx))
+        if actual is None:
+            return []
+        ubicaciones = actual if isinstance(actual, array) else (actual,)
+        return [desempaquetar(ubicacion) for ubicacion in ubicaciones]
+
+    def historial(self, direccion, desde=0, limite=None):
+        """
+        Página del historial de una dirección.
+
+        Returns:
+            tuple: (total de transacciones de la dirección, lista de pares
+            (índice de bloque, posición) de la página)
+        """
+        ubicaciones = self._por_direccion.get(direccion, ())
+        fin = len(ubicaciones) if limite is None else desde + limite
+        return len(ubicaciones), [desempaquetar(ubicacion) for ubicacion in ubicaciones[desde:fin]]
@@ -0,0 +1,161 @@
+"""
+Mempool - Blockchain Educativo
+==============================
+Pool indexado y acotado de transacciones pendientes
+
+Componentes:
+- Índice por hash de transacción (detección de duplicados en O(1))
+- Límites configurables de cantidad y de bytes con política de expulsión
+- Selección acotada por bloque: lo que no cabe espera al siguiente
+- Estadísticas de tamaño y antigüedad
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from time import time
+
+# Límites por defecto del pool
+MAX_TRANSACCIONES = 50000
+MAX_BYTES = 16 * 1024 * 1024
+
+# Transacciones máximas que se incluyen en un bloque
+MAX_TRANSACCIONES_BLOQUE = 1000
+
+# Políticas cuando el pool está lleno
+POLITICAS = ('antiguas', 'rechazar')
+
+
+def serializar_transaccion(transaccion):
+    """Serialización canónica de una transacción (JSON con claves ordenadas)"""
+    return json.dumps(dict(transaccion), sort_keys=True).encode()
+
+
+def hash_transaccion(transaccion):
+    """Identificador de una transacción: SHA-256 de su serialización canónica"""
+    return hashlib.sha256(serializar_transaccion(transaccion)).hexdigest()
+
+
+class Mempool:
+    """
+    Pool de transacciones pendientes de confirmar.
+
+    Las transacciones se guardan en orden de llegada en un diccionario
+    indexado por su hash. Cuando se supera el límite de cantidad o de
+    bytes se aplica la política configurada:
+
+    - 'antiguas': se expulsan las transacciones más antiguas
+    - 'rechazar': se rechaza la transacción nueva
+    """
+
+    def __init__(self, max_transacciones=MAX_TRANSACCIONES, max_bytes=MAX_BYTES,
+                 politica='antiguas'):
+        if politica not in POLITICAS:
+            raise ValueError(f'Política de mempool desconocida: {politica}')
+        self.max_transacciones = max_transacciones
+        self.max_bytes = max_bytes
+        self.politica = politica
+
+        # hash -> (transacción, bytes, momento de llegada)
+        self._transacciones = OrderedDict()
+        self.bytes = 0
+        self.expulsadas = 0
+        self.duplicadas = 0
+
+    def __len__(self):
+        return len(self._transacciones)
+
+    def __contains__(self, hash_tx):
+        return hash_tx in self._transacciones
+
+    def __iter__(self):
+        for transaccion, _, _ in self._transacciones.values():
+            yield transaccion
+
+    def _expulsar_mas_antigua(self):
+        _, (_, tamano, _) = self._transacciones.popitem(last=False)
+        self.bytes -= tamano
+        self.expulsadas += 1
+
+    def agregar(self, transaccion, prioritaria=False):
+        """
+        Añade una transacción al pool.
+
+        Args:
+            transaccion: Diccionario de la transacción
+            prioritaria: Si es True se coloca al principio, de modo que entra
+                en el próximo bloque (p. ej. la recompensa del minero)
+
+        Returns:
+            tuple: (aceptada, hash de la transacción o motivo del rechazo)
+        """
+        serializada = serializar_transaccion(transaccion)
+        hash_tx = hashlib.sha256(serializada).hexdigest()
+        tamano = len(serializada)
+
+        if hash_tx in self._transacciones:
+            self.duplicadas += 1
+            return False, 'duplicada'
+        if tamano > self.max_bytes:
+            return False, 'demasiado grande'
+
+        lleno = (len(self._transacciones) >= self.max_transacciones
+                 or self.bytes + tamano > self.max_bytes)
+        if lleno and self.politica == 'rechazar' and not prioritaria:
+            return False, 'mempool llena'
+
+        while self._transacciones and (len(self._transacciones) >= self.max_transacciones
+                                       or self.bytes + tamano > self.max_bytes):
+            self._expulsar_mas_antigua()
+
+        self._transacciones[hash_tx] = (dict(transaccion), tamano, time())
+        self.bytes += tamano
+        if prioritaria:
+            self._transacciones.move_to_end(hash_tx, last=False)
+        return True, hash_tx
+
+    def agregar_lote(self, transacciones):
+        """
+        Añade varias transacciones en una sola operación.
+
+        Returns:
+            list: Un (aceptada, hash o motivo) por transacción, en orden
+        """
+        return [self.agregar(transaccion) for transaccion in transacciones]
+
+    def seleccionar(self, limite=MAX_TRANSACCIONES_BLOQUE):
+        """Primeras transacciones del pool (en orden de llegada) sin retirarlas"""
+        seleccion = []
+        for transaccion in self:
+            if len(seleccion) >= limite:
+                break
+            seleccion.append(transaccion)
+        return seleccion
+
+    def eliminar(self, transacciones):
+        """Retira del pool las transacciones indicadas (p. ej. ya confirmadas)"""
+        for transaccion in transacciones:
+            entrada = self._transacciones.pop(hash_transaccion(transaccion), None)
+            if entrada is not None:
+                self.bytes -= entrada[1]
+
+    def estadisticas(self):
+        """
+        Tamaño y antigüedad del pool.
+
+        Returns:
+            dict: Cantidad, bytes, límites, antigüedad y contadores
+        """
+        ahora = time()
+        edades = [ahora - llegada for _, _, llegada in self._transacciones.values()]
+        return {
+            'transacciones': len(self._transacciones),
+            'bytes': self.bytes,
+            'max_transacciones': self.max_transacciones,
+            'max_bytes': self.max_bytes,
+            'politica': self.politica,
+            'edad_maxima_s': round(max(edades), 3) if edades else 0,
+            'edad_media_s': round(sum(edades) / len(edades), 3) if edades else 0,
+            'expulsadas': self.expulsadas,
+            'duplicadas': self.duplicadas,
+        }
@@ -0,0 +1,114 @@
+"""
+Árbol de Merkle - Blockchain Educativo
+======================================
+Resumen de las transacciones de un bloque con pruebas de inclusión
+
+Componentes:
+- Raíz de Merkle sobre los hashes de las transacciones de un bloque
+- Prueba de inclusión: los hashes hermanos desde la hoja hasta la raíz
+- Verificación de una prueba con O(log n) hashes, sin el bloque completo
+
+Construcción del árbol:
+- Cada hoja es el hash de la transacción (ver mempool.hash_transaccion)
+- Cada nodo interno es SHA-256(0x01 || izquierdo || derecho); el prefijo
+  separa los nodos internos de las hojas
+- Si un nivel tiene un número impar de nodos, el último sube sin cambios
+  (no se duplica, para que dos listas distintas no tengan la misma raíz)
+- La raíz de un bloque sin transacciones es SHA-256 de la cadena vacía
+"""
+
+import hashlib
+
+from mempool import hash_transaccion
+
+# Prefijo de los nodos internos del árbol
+PREFIJO_NODO = b'\x01'
+
+# Raíz de un bloque sin transacciones
+RAIZ_VACIA = hashlib.sha256(b'').hexdigest()
+
+
+def _nodo(izquierdo, derecho):
+    """Hash de un nodo interno a partir de sus dos hijos (bytes)"""
+    return hashlib.sha256(PREFIJO_NODO + izquierdo + derecho).digest()
+
+
+def _subir_nivel(nivel):
+    """Calcula el nivel superior del árbol"""
+    superior = [_nodo(nivel[i], nivel[i + 1]) for i in range(0, len(nivel) - 1, 2)]
+    if len(nivel) % 2:
+        superior.append(nivel[-1])
+    return superior
+
+
+def _hojas(transacciones):
+    return [bytes.fromhex(hash_transaccion(transaccion)) for transaccion in transacciones]
+
+
+def raiz_merkle(transacciones):
+    """
+    Raíz de Merkle de una lista de transacciones.
+
+    Returns:
+        str: Raíz en hexadecimal
+    """
+    nivel = _hojas(transacciones)
+    if not nivel:
+        return RAIZ_VACIA
+    while len(nivel) > 1:
+        nivel = _subir_nivel(nivel)
+    return nivel[0].hex()
+
+
+def prueba_inclusion(transacciones, posicion):
+    """
+    Prueba de que la transacción en la posición dada pertenece al árbol.
+
+    Args:
+        transacciones: Transacciones del bloque, en orden
+        posicion: Posición de la transacción en el bloque
+
+    Returns:
+        list: Pasos {'hash', 'lado'} desde la hoja hasta la raíz, donde
+        'lado' indica si el hermano va a la 'izquierda' o a la 'derecha'
+    """
+    nivel = _hojas(transacciones)
+    if not 0 <= posicion < len(nivel):
+        raise IndexError('Posición fuera del bloque')
+
+    pasos = []
+    while len(nivel) > 1:
+        hermano = posicion ^ 1
+        if hermano < len(nivel):
+            lado = 'izquierda' if hermano < posicion else 'derecha'
+            pasos.append({'hash': nivel[hermano].hex(), 'lado': lado})
+        nivel = _subir_nivel(nivel)
+        posicion //= 2
+    return pasos
+
+
+def verificar_inclusion(hash_tx, prueba, raiz):
+    """
+    Verifica una prueba de inclusión.
+
+    Args:
+        hash_tx: Hash de la transacción (hexadecimal)
+        prueba: Pasos devueltos por prueba_inclusion
+        raiz: Raíz de Merkle del bloque (hexadecimal)
+
+    Returns:
+        bool: True si la transacción pertenece al bloque con esa raíz
+    """
+    try:
+        actual = bytes.fromhex(hash_tx)
+        for paso in prueba:
+            hermano = bytes.fromhex(paso['hash'])
+            if paso['lado'] == 'izquierda':
+                actual = _nodo(hermano, actual)
+            elif paso['lado'] == 'derecha':
+                actual = _nodo(actual, hermano)
+            else:
+                return False
+    except (KeyError, TypeError, ValueError):
+        return False
+    return actual.hex() == raiz
@@ -0,0 +1,242 @@
+"""
+Métricas - Blockchain Educativo
+===============================
+Métricas del nodo en el formato de texto de Prometheus
+
+Componentes:
+- Contadores, indicadores e histogramas con etiquetas, sin dependencias
+  externas y seguros entre hilos
+- Indicadores calculados en el momento de la consulta (altura, mempool)
+- MetricasNodo: las métricas de un nodo (minería, validación, consenso,
+  mempool, cadena y latencia de las rutas HTTP)
+- Exposición en texto (versión 0.0.4) para GET /metricas
+
+Registrar una observación cuesta un diccionario y un bisect bajo un
+cerrojo: se hace una vez por operación (Proof of Work, validación,
+consulta, petición), nunca dentro de los bucles internos.
+"""
+
+import threading
+from bisect import bisect_left
+
+# Tipo MIME del formato de texto de Prometheus
+TIPO_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Límites superiores (segundos) de los histogramas de duración
+CUBETAS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Límites de la duración del Proof of Work, que va de milisegundos a minutos
+CUBETAS_POW = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+# Límites del tiempo de validación por bloque
+CUBETAS_POR_BLOQUE = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    """Base común: nombre, ayuda, etiquetas y valores por combinación de etiquetas"""
+
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._cerrojo = threading.Lock()
+
+    def _clave(self, etiquetas):
+        if len(etiquetas) != len(self.etiquetas):
+            raise ValueError(f'{self.nombre} espera las etiquetas {self.etiquetas}')
+        return tuple(str(valor) for valor in etiquetas)
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._cerrojo:
+            valores = sorted(self._valores.items())
+        for clave, valor in valores:
+            lineas.extend(self._muestras(clave, valor))
+        return lineas
+
+    def _muestras(self, clave, valor):
+        return [f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}']
+
+
+class Contador(_Metrica):
+    """Valor que solo aumenta (p. ej. hashes calculados)"""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        super().__init__(nombre, ayuda, etiquetas)
+        # Sin etiquetas, la serie existe (a cero) desde el principio
+        if not self.etiquetas:
+            self._valores[()] = 0
+
+    def incrementar(self, cantidad=1, *etiquetas):
+        clave = self._clave(etiquetas)
+        with self._cerrojo:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def valor(self, *etiquetas):
+        return self._valores.get(self._clave(etiquetas), 0)
+
+
+class Indicador(_Metrica):
+    """
+    Valor que sube y baja. Si se da una función, el valor se calcula en
+    cada consulta y no hace falta actualizarlo.
+    """
+
+    tipo = 'gauge'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), funcion=None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.funcion = funcion
+        if not self.etiquetas:
+            self._valores[()] = 0
+
+    def fijar(self, valor, *etiquetas):
+        clave = self._clave(etiquetas)
+        with self._cerrojo:
+            self._valores[clave] = valor
+
+    def valor(self, *etiquetas):
+        if self.funcion is not None:
+            return self.funcion()
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def exponer(self):
+        if self.funcion is not None:
+            with self._cerrojo:
+                self._valores[()] = self.funcion()
+        return super().exponer()
+
+
+class Histograma(_Metrica):
+    """Distribución de observaciones en cubetas acumuladas, con suma y cuenta"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+        if not self.etiquetas:
+            self._valores[()] = self._vacio()
+
+    def _vacio(self):
+        # Conteos por cubeta (la última es +Inf), suma y cuenta
+        return [[0] * (len(self.cubetas) + 1), 0.0, 0]
+
+    def observar(self, valor, *etiquetas):
+        clave = self._clave(etiquetas)
+        posicion = bisect_left(self.cubetas, valor)
+        with self._cerrojo:
+            datos = self._valores.get(clave)
+            if datos is None:
+                datos = self._valores[clave] = self._vacio()
+            datos[0][posicion] += 1
+            datos[1] += valor
+            datos[2] += 1
+
+    def cuenta(self, *etiquetas):
+        datos = self._valores.get(self._clave(etiquetas))
+        return datos[2] if datos else 0
+
+    def _muestras(self, clave, datos):
+        conteos, suma, cuenta = datos
+        lineas = []
+        acumulado = 0
+        for limite, conteo in zip(self.cubetas + (float('inf'),), conteos):
+            acumulado += conteo
+            le = f'le="{_numero(limite)}"'
+            lineas.append(f'{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}')
+        lineas.append(f'{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}')
+        lineas.append(f'{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {cuenta}')
+        return lineas
+
+
+class Registro:
+    """Conjunto de métricas que se exponen juntas"""
+
+    def __init__(self):
+        self.metricas = []
+
+    def _registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def indicador(self, nombre, ayuda, etiquetas=(), funcion=None):
+        return self._registrar(Indicador(nombre, ayuda, etiquetas, funcion))
+
+    def histograma(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_SEGUNDOS):
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, cubetas))
+
+    def exponer(self):
+        """Texto de todas las métricas en el formato de Prometheus"""
+        lineas = []
+        for metrica in self.metricas:
+            lineas.extend(metrica.exponer())
+        return '\n'.join(lineas) + '\n'
+
+
+class MetricasNodo(Registro):
+    """
+    Métricas de un nodo. Blockchain registra las observaciones; los
+    indicadores de la cadena y del mempool se leen en cada consulta.
+    """
+
+    def __init__(self, blockchain):
+        super().__init__()
+        self.hashes = self.contador(
+            'blockchain_mineria_hashes_total', 'Hashes calculados por el Proof of Work')
+        self.hashes_por_segundo = self.indicador(
+            'blockchain_mineria_hashes_por_segundo', 'Hashes por segundo del último Proof of Work')
+        self.pow = self.histograma(
+            'blockchain_pow_segundos', 'Duración del Proof of Work', ('resultado',), CUBETAS_POW)
+        self.bloques_validados = self.contador(
+            'blockchain_validacion_bloques_total', 'Bloques validados')
+        self.validacion = self.histograma(
+            'blockchain_validacion_segundos_por_bloque',
+            'Tiempo medio de validación por bloque en cada validación de cadena',
+            cubetas=CUBETAS_POR_BLOQUE)
+        self.ronda_consenso = self.histograma(
+            'blockchain_consenso_ronda_segundos', 'Duración de una ronda de consenso')
+        # Sin etiqueta por nodo: los vecinos cambian sin límite y cada uno
+        # crearía series nuevas. El detalle por nodo está en el campo
+        # 'ronda' de /nodos/resolver
+        self.consulta_nodo = self.histograma(
+            'blockchain_consenso_consulta_segundos',
+            'Duración de cada consulta a un nodo durante el consenso', ('fase',))
+        self.errores_nodo = self.contador(
+            'blockchain_consenso_errores_total', 'Consultas a nodos fallidas', ('fase',))
+        self.anuncios = self.contador(
+            'blockchain_anuncios_recibidos_total', 'Anuncios de bloques recibidos', ('estado',))
+        self.peticiones = self.histograma(
+            'blockchain_http_peticion_segundos', 'Latencia de las peticiones HTTP por ruta',
+            ('ruta', 'metodo', 'codigo'))
+        self.indicador('blockchain_altura', 'Bloques en la cadena',
+                       funcion=lambda: len(blockchain.cadena))
+        self.indicador('blockchain_mempool_transacciones', 'Transacciones pendientes en el mempool',
+                       funcion=lambda: len(blockchain.mempool))
+        self.indicador('blockchain_mempool_bytes', 'Bytes ocupados por el mempool',
+                       funcion=lambda: blockchain.mempool.bytes)
@@ -0,0 +1,358 @@
+"""
+Motor de Minería Paralelo - Blockchain Educativo
+================================================
+Búsqueda de Proof of Work repartida entre varios procesos
+
+Componentes:
+- División del espacio de nonces en rangos consecutivos
+- PoolMineria: pool de procesos de larga duración que explora los rangos
+  en paralelo (uno por Blockchain, reutilizado entre búsquedas)
+- Parada cooperativa en cuanto se conoce una prueba válida
+- Cancelación externa (p. ej. cuando cambia la punta de la cadena)
+- Estadísticas de hashes por segundo por trabajador
+- Kernel de búsqueda por lotes sobre los bytes crudos del digest
+- Backends seleccionables: 'hashlib' (por defecto) y 'numpy' (mineria_numpy.py)
+"""
+
+import hashlib
+import os
+import threading
+from time import perf_counter
+
+# Número de ceros hexadecimales iniciales exigidos por el Proof of Work
+DIFICULTAD = 4
+
+# Cantidad de nonces que explora un trabajador en cada tarea. Los rangos
+# pequeños acotan el trabajo que queda por terminar cuando se encuentra
+# una prueba o se cancela la búsqueda
+TAMANO_RANGO = 10000
+
+# Métodos de arranque de los procesos del pool, por orden de preferencia:
+# ninguno hereda los hilos ni los cerrojos del servidor (fork sí)
+METODOS_ARRANQUE = ('forkserver', 'spawn')
+
+# El kernel fija los dígitos altos del nonce y recorre los bajos en lotes
+DIGITOS_LOTE = 3
+TAMANO_LOTE = 10 ** DIGITOS_LOTE
+
+# Dígitos bajos ya codificados: con relleno (lotes > 0) y sin él (lote 0)
+_DIGITOS_CON_RELLENO = tuple(b'%0*d' % (DIGITOS_LOTE, bajo) for bajo in range(TAMANO_LOTE))
+_DIGITOS_SIN_RELLENO = tuple(b'%d' % bajo for bajo in range(TAMANO_LOTE))
+
+# Backends de búsqueda disponibles
+BACKENDS = ('hashlib', 'numpy')
+
+# Valor del límite compartido mientras nadie ha encontrado prueba
+SIN_LIMITE = 2 ** 63 - 1
+
+# Límite compartido entre procesos (menor prueba encontrada hasta ahora)
+_limite = None
+
+
+def _inicializar_trabajador(limite):
+    """Guarda en cada proceso del pool la referencia al límite compartido"""
+    global _limite
+    _limite = limite
+
+
+def umbral_dificultad(dificultad):
+    """
+    Traduce la dificultad en ceros hexadecimales a un umbral sobre el digest.
+
+    Exigir d ceros hexadecimales equivale a exigir 4*d bits iniciales a cero,
+    es decir, que el digest (big-endian) sea menor que 2^(256 - 4d). Al ser
+    ambos bytes de la misma longitud, basta una comparación de bytes.
+
+    Returns:
+        bytes: Umbral a comparar con hashlib.sha256(...).digest()
+    """
+    bits = 4 * dificultad
+    if bits == 0:
+        # Cualquier digest de 32 bytes es menor que 33 bytes 0xff
+        return b'\xff' * 33
+    return (1 << (256 - bits)).to_bytes(32, 'big')
+
+
+def buscar_en_rango(ultima_prueba, ultimo_hash, inicio, fin,
+                    dificultad=DIFICULTAD, detener=None):
+    """
+    Kernel de búsqueda: primer nonce válido del rango [inicio, fin).
+
+    Evita el f-string, el encode y el hexdigest por nonce del verificador
+    de referencia (Blockchain.prueba_valida):
+
+    - El estado SHA-256 tras str(ultima_prueba) se calcula una vez y se
+      reutiliza con .copy(); dentro de cada lote también se reutiliza el
+      estado tras los dígitos altos del nonce.
+    - Los dígitos bajos salen de tablas de bytes preasignadas.
+    - La condición se comprueba con una comparación del digest crudo
+      contra un umbral de bits.
+
+    Args:
+        ultima_prueba: Prueba del bloque anterior
+        ultimo_hash: Hash del bloque anterior
+        inicio: Primer nonce a probar
+        fin: Nonce final (excluido)
+        dificultad: Ceros hexadecimales iniciales exigidos
+        detener: Función opcional consultada entre lotes; si devuelve
+            True la búsqueda se abandona
+
+    Returns:
+        tuple: (prueba encontrada o None, nonces probados)
+    """
+    base = hashlib.sha256(str(ultima_prueba).encode())
+    sufijo = ultimo_hash.encode()
+    umbral = umbral_dificultad(dificultad)
+    probados = 0
+
+    lote = inicio // TAMANO_LOTE
+    while lote * TAMANO_LOTE < fin:
+        if detener is not None and detener():
+            break
+
+        primero = lote * TAMANO_LOTE
+        desde = max(inicio, primero) - primero
+        hasta = min(fin, primero + TAMANO_LOTE) - primero
+
+        if lote:
+            estado = base.copy()
+            estado.update(b'%d' % lote)
+            tabla = _DIGITOS_CON_RELLENO
+        else:
+            estado = base
+            tabla = _DIGITOS_SIN_RELLENO
+
+        copiar = estado.copy
+        for bajo in range(desde, hasta):
+            intento = copiar()
+            intento.update(tabla[bajo])
+            intento.update(sufijo)
+            if intento.digest() < umbral:
+                return primero + bajo, probados + bajo - desde + 1
+
+        probados += hasta - desde
+        lote += 1
+
+    return None, probados
+
+
+def obtener_kernel(backend='hashlib'):
+    """
+    Devuelve la función de búsqueda del backend indicado.
+
+    El backend 'numpy' se importa bajo demanda para que NumPy siga
+    siendo una dependencia opcional.
+
+    Raises:
+        ValueError: Si el backend no existe o NumPy no está instalado
+    """
+    if backend == 'hashlib':
+        return buscar_en_rango
+    if backend == 'numpy':
+        try:
+            import mineria_numpy
+        except ImportError as error:
+            raise ValueError(f"El backend 'numpy' requiere NumPy instalado: {error}")
+        return mineria_numpy.buscar_en_rango
+    raise ValueError(f"Backend de minería desconocido: {backend}")
+
+
+def _buscar_en_rango(ultima_prueba, ultimo_hash, inicio, fin, dificultad, backend):
+    """
+    Tarea de un trabajador: aplica el kernel del backend al rango [inicio, fin).
+
+    El trabajador abandona el rango si otro proceso ya encontró una
+    prueba menor que su inicio, ya que ninguna de las suyas podría ganar.
+
+    Returns:
+        tuple: (pid, prueba encontrada o None, hashes calculados, segundos)
+    """
+    detener = None
+    if _limite is not None:
+        detener = lambda: _limite.value <= inicio
+
+    kernel = obtener_kernel(backend)
+    comienzo = perf_counter()
+    encontrada, hashes = kernel(ultima_prueba, ultimo_hash, inicio, fin, dificultad, detener)
+    return os.getpid(), encontrada, hashes, perf_counter() - comienzo
+
+
+def _resumir_estadisticas(acumulado):
+    """Convierte los acumulados por proceso en hashes por segundo"""
+    estadisticas = []
+    for numero, (pid, (hashes, segundos)) in enumerate(sorted(acumulado.items()), 1):
+        estadisticas.append({
+            'trabajador': numero,
+            'pid': pid,
+            'hashes': hashes,
+            'segundos': round(segundos, 4),
+            'hashes_por_segundo': round(hashes / segundos) if segundos else 0,
+        })
+    return estadisticas
+
+
+def buscar_prueba(ultima_prueba, ultimo_hash, dificultad=DIFICULTAD,
+                  trabajadores=None, tamano_rango=TAMANO_RANGO, backend='hashlib',
+                  cancelar=None, progreso=None, pool=None):
+    """
+    Busca la menor prueba válida repartiendo rangos de nonces entre procesos.
+
+    Los rangos se asignan en orden creciente. Cuando un trabajador encuentra
+    una prueba, el límite compartido se reduce y los rangos posteriores se
+    abandonan; los rangos anteriores todavía en curso se terminan, por lo que
+    el resultado es siempre la menor prueba válida (igual que la búsqueda
+    secuencial).
+
+    Args:
+        ultima_prueba: Prueba del bloque anterior
+        ultimo_hash: Hash del bloque anterior
+        dificultad: Ceros hexadecimales iniciales exigidos
+        trabajadores: Procesos a utilizar (por defecto os.cpu_count())
+        tamano_rango: Nonces por tarea
+        backend: Kernel de búsqueda ('hashlib' o 'numpy')
+        cancelar: Función opcional consultada tras cada rango; si devuelve
+            True la búsqueda se abandona y no se devuelve prueba
+        progreso: Función opcional llamada tras cada rango con los hashes
+            calculados en total y los segundos transcurridos
+        pool: PoolMineria que se reutiliza entre búsquedas; sin él se crea
+            uno temporal (solo si trabajadores > 1)
+
+    Returns:
+        tuple: (prueba o None si se canceló, lista de estadísticas por trabajador)
+    """
+    trabajadores = pool.trabajadores if pool is not None else trabajadores or os.cpu_count() or 1
+    obtener_kernel(backend)  # Falla pronto si el backend no está disponible
+    acumulado = {}
+    comienzo = perf_counter()
+
+    def registrar(pid, hashes, segundos):
+        previo_hashes, previo_segundos = acumulado.get(pid, (0, 0.0))
+        acumulado[pid] = (previo_hashes + hashes, previo_segundos + segundos)
+        if progreso is not None:
+            progreso(sum(total for total, _ in acumulado.values()), perf_counter() - comienzo)
+
+    if trabajadores == 1:
+        # Sin pool: evita el coste de crear procesos en máquinas de un núcleo
+        inicio = 0
+        while True:
+            if cancelar is not None and cancelar():
+                return None, _resumir_estadisticas(acumulado)
+            pid, encontrada, hashes, segundos = _buscar_en_rango(
+                ultima_prueba, ultimo_hash, inicio, inicio + tamano_rango, dificultad, backend)
+            registrar(pid, hashes, segundos)
+            if encontrada is not None:
+                return encontrada, _resumir_estadisticas(acumulado)
+            inicio += tamano_rango
+
+    if pool is not None:
+        return pool.buscar(ultima_prueba, ultimo_hash, dificultad, tamano_rango, backend,
+                           cancelar, registrar, acumulado)
+
+    # Sin pool propio: se crea uno solo para esta búsqueda
+    pool = PoolMineria(trabajadores)
+    try:
+        return pool.buscar(ultima_prueba, ultimo_hash, dificultad, tamano_rango, backend,
+                           cancelar, registrar, acumulado)
+    finally:
+        pool.cerrar()
+
+
+class PoolMineria:
+    """
+    Pool de procesos de minería de larga duración.
+
+    Crear un ProcessPoolExecutor en cada búsqueda cuesta arrancar todos los
+    procesos por bloque minado. Blockchain mantiene un PoolMineria durante
+    toda su vida: los procesos se crean en la primera búsqueda paralela y
+    se reutilizan en las siguientes.
+
+    Los procesos se arrancan con forkserver (o spawn donde no existe),
+    nunca con fork: el servidor tiene hilos y cerrojos que un proceso
+    hijo heredaría en un estado arbitrario.
+
+    Las búsquedas se serializan con un cerrojo porque comparten el límite.
+    Cada búsqueda espera a que terminen sus rangos en curso antes de
+    devolver, así que el pool queda libre y el límite se puede reiniciar
+    para la siguiente.
+    """
+
+    def __init__(self, trabajadores=None):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self._pool = None
+        self._limite = None
+        self._cerrojo = threading.Lock()
+
+    def _arrancar(self):
+        """Crea el pool y el límite compartido en la primera búsqueda"""
+        # multiprocessing solo se importa si hace falta el pool
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        metodos = multiprocessing.get_all_start_methods()
+        metodo = next(metodo for metodo in METODOS_ARRANQUE if metodo in metodos)
+        contexto = multiprocessing.get_context(metodo)
+        self._limite = contexto.Value('q', SIN_LIMITE)
+        self._pool = ProcessPoolExecutor(max_workers=self.trabajadores, mp_context=contexto,
+                                         initializer=_inicializar_trabajador,
+                                         initargs=(self._limite,))
+
+    def _fijar_limite(self, valor):
+        with self._limite.get_lock():
+            self._limite.value = valor
+
+    def buscar(self, ultima_prueba, ultimo_hash, dificultad, tamano_rango, backend,
+               cancelar, registrar, acumulado):
+        """
+        Reparte los rangos de una búsqueda entre los procesos del pool.
+
+        Returns:
+            tuple: (prueba o None si se canceló, lista de estadísticas por trabajador)
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        with self._cerrojo:
+            if self._pool is None:
+                self._arrancar()
+            self._fijar_limite(SIN_LIMITE)
+
+            mejor = None
+            siguiente = 0
+            pendientes = set()
+            while True:
+                # Mantener el pool ocupado con rangos que aún pueden ganar
+                while len(pendientes) < self.trabajadores * 2 and (mejor is None or siguiente < mejor):
+                    pendientes.add(self._pool.submit(_buscar_en_rango, ultima_prueba, ultimo_hash,
+                                                     siguiente, siguiente + tamano_rango,
+                                                     dificultad, backend))
+                    siguiente += tamano_rango
+
+                if not pendientes:
+                    break
+
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                if cancelar is not None and cancelar():
+                    # Un límite negativo hace que todos los rangos en curso se
+                    # abandonen en el siguiente lote; se espera a que lo hagan
+                    # para que no sigan en el pool durante la próxima búsqueda
+                    self._fijar_limite(-1)
+                    for futuro in pendientes:
+                        futuro.cancel()
+                    wait(pendientes)
+                    return None, _resumir_estadisticas(acumulado)
+
+                for futuro in terminados:
+                    pid, encontrada, hashes, segundos = futuro.result()
+                    registrar(pid, hashes, segundos)
+                    if encontrada is not None and (mejor is None or encontrada < mejor):
+                        mejor = encontrada
+                        self._fijar_limite(mejor)
+
+            return mejor, _resumir_estadisticas(acumulado)
+
+    def cerrar(self):
+        """Detiene los procesos del pool (se vuelven a crear si se busca de nuevo)"""
+        with self._cerrojo:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+                self._limite = None
@@ -0,0 +1,167 @@
+"""
+Backend de Minería NumPy - Blockchain Educativo
+===============================================
+SHA-256 vectorizado sobre arrays uint32 de NumPy
+
+Componentes:
+- Compresión SHA-256 aplicada a miles de mensajes a la vez
+- Construcción por lotes de los candidatos f'{ultima_prueba}{prueba}{ultimo_hash}'
+- Comprobación de la dificultad sobre todo el lote en una operación
+
+NumPy es una dependencia opcional: solo se importa este módulo cuando
+se selecciona el backend 'numpy' (ver mineria.py).
+"""
+
+import numpy as np
+
+from mineria import DIFICULTAD
+
+# Candidatos evaluados en cada llamada al hasher vectorizado
+TAMANO_LOTE_NUMPY = 16384
+
+# Constantes de ronda de SHA-256 (FIPS 180-4)
+_K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.uint32)
+
+# Valores iniciales del estado de SHA-256
+_H0 = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.uint32)
+
+
+def _rotr(x, n):
+    """Rotación a la derecha de 32 bits, elemento a elemento"""
+    return (x >> np.uint32(n)) | (x << np.uint32(32 - n))
+
+
+def _comprimir(estado, bloque):
+    """
+    Aplica la función de compresión a un bloque de 64 bytes por mensaje.
+
+    Args:
+        estado: Array (8, N) uint32 con el estado de cada mensaje
+        bloque: Array (16, N) uint32 con las palabras del bloque
+
+    Returns:
+        np.ndarray: Nuevo estado (8, N)
+    """
+    w = np.empty((64, bloque.shape[1]), dtype=np.uint32)
+    w[:16] = bloque
+    for t in range(16, 64):
+        s0 = _rotr(w[t - 15], 7) ^ _rotr(w[t - 15], 18) ^ (w[t - 15] >> np.uint32(3))
+        s1 = _rotr(w[t - 2], 17) ^ _rotr(w[t - 2], 19) ^ (w[t - 2] >> np.uint32(10))
+        w[t] = w[t - 16] + s0 + w[t - 7] + s1
+
+    a, b, c, d, e, f, g, h = estado
+    for t in range(64):
+        t1 = h + (_rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)) + ((e & f) ^ (~e & g)) + _K[t] + w[t]
+        t2 = (_rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c))
+        h, g, f, e, d, c, b, a = g, f, e, d + t1, c, b, a, t1 + t2
+
+    return estado + np.stack([a, b, c, d, e, f, g, h])
+
+
+def sha256_lote(mensajes):
+    """
+    Calcula SHA-256 de N mensajes de la misma longitud.
+
+    Args:
+        mensajes: Array (N, L) uint8 con un mensaje por fila
+
+    Returns:
+        np.ndarray: Array (8, N) uint32 con las palabras del digest
+    """
+    cantidad, longitud = mensajes.shape
+    relleno = -(longitud + 9) % 64
+    total = longitud + 9 + relleno
+
+    datos = np.zeros((cantidad, total), dtype=np.uint8)
+    datos[:, :longitud] = mensajes
+    datos[:, longitud] = 0x80
+    datos[:, -8:] = np.frombuffer((longitud * 8).to_bytes(8, 'big'), dtype=np.uint8)
+
+    # Palabras big-endian, una columna por mensaje
+    palabras = datos.view('>u4').astype(np.uint32).T
+
+    estado = np.repeat(_H0[:, None], cantidad, axis=1)
+    for inicio in range(0, total // 4, 16):
+        estado = _comprimir(estado, palabras[inicio:inicio + 16])
+    return estado
+
+
+def _cumplen_dificultad(digests, dificultad):
+    """Máscara booleana de los digests con 4*dificultad bits iniciales a cero"""
+    bits = 4 * dificultad
+    mascara = np.ones(digests.shape[1], dtype=bool)
+    for palabra in digests:
+        if bits <= 0:
+            break
+        if bits >= 32:
+            mascara &= palabra == 0
+        else:
+            mascara &= (palabra >> np.uint32(32 - bits)) == 0
+        bits -= 32
+    return mascara
+
+
+def _candidatos(prefijo, sufijo, nonces, digitos):
+    """Construye la matriz (N, L) de mensajes para nonces de igual número de dígitos"""
+    longitud = len(prefijo) + digitos + len(sufijo)
+    mensajes = np.empty((len(nonces), longitud), dtype=np.uint8)
+    mensajes[:, :len(prefijo)] = np.frombuffer(prefijo, dtype=np.uint8)
+    mensajes[:, len(prefijo) + digitos:] = np.frombuffer(sufijo, dtype=np.uint8)
+
+    potencias = 10 ** np.arange(digitos - 1, -1, -1, dtype=np.int64)
+    mensajes[:, len(prefijo):len(prefijo) + digitos] = (nonces[:, None] // potencias) % 10 + ord('0')
+    return mensajes
+
+
+def buscar_en_rango(ultima_prueba, ultimo_hash, inicio, fin,
+                    dificultad=DIFICULTAD, detener=None, tamano_lote=TAMANO_LOTE_NUMPY):
+    """
+    Backend NumPy: primer nonce válido del rango [inicio, fin).
+
+    Mismo contrato que mineria.buscar_en_rango. Los nonces se evalúan en
+    lotes de tamano_lote; dentro de un lote se agrupan por número de
+    dígitos para que todos los mensajes tengan la misma longitud.
+
+    Returns:
+        tuple: (prueba encontrada o None, nonces probados)
+    """
+    prefijo = str(ultima_prueba).encode()
+    sufijo = ultimo_hash.encode()
+    probados = 0
+
+    desde = inicio
+    while desde < fin:
+        if detener is not None and detener():
+            break
+
+        hasta = min(fin, desde + tamano_lote)
+        grupo = desde
+        while grupo < hasta:
+            digitos = len(str(grupo))
+            limite_grupo = min(hasta, 10 ** digitos)
+            nonces = np.arange(grupo, limite_grupo, dtype=np.int64)
+
+            digests = sha256_lote(_candidatos(prefijo, sufijo, nonces, digitos))
+            validos = np.flatnonzero(_cumplen_dificultad(digests, dificultad))
+            if validos.size:
+                # Todo el grupo se calculó, aunque gane el primer válido
+                return grupo + int(validos[0]), probados + len(nonces)
+
+            probados += len(nonces)
+            grupo = limite_grupo
+
+        desde = hasta
+
+    return None, probados
@@ -0,0 +1,179 @@
+"""
+Minero en Segundo Plano - Blockchain Educativo
+==============================================
+Minado fuera de los hilos del servidor HTTP
+
+Componentes:
+- Trabajos de minado con identificador, estado, progreso y resultado
+- Un hilo en segundo plano por trabajo (como máximo uno activo a la vez)
+- Modo continuo: mina un bloque tras otro hasta que se cancela
+- Cancelación inmediata, y reinicio sobre la nueva punta cuando la
+  cadena cambia durante la búsqueda
+
+Estados de un trabajo:
+    'pendiente' -> 'minando' -> 'completado' | 'cancelado' | 'error'
+"""
+
+import threading
+from collections import OrderedDict
+from time import time
+from uuid import uuid4
+
+# Trabajos terminados que se conservan para consultar su estado
+MAX_TRABAJOS = 100
+
+ESTADOS_FINALES = ('completado', 'cancelado', 'error')
+
+
+class TrabajoMineria:
+    """Un trabajo de minado y su progreso"""
+
+    def __init__(self, continuo=False):
+        self.id = uuid4().hex
+        self.continuo = continuo
+        self.estado = 'pendiente'
+        self.bloques = []
+        self.ultimo_bloque = None
+        self.abortados = 0
+        self.hashes = 0
+        self.hashes_por_segundo = 0
+        self.error = None
+        self.creado = time()
+        self.terminado = None
+        self._cancelado = threading.Event()
+        self._fin = threading.Event()
+
+    @property
+    def activo(self):
+        return self.estado not in ESTADOS_FINALES
+
+    def cancelar(self):
+        """Pide al trabajo que se detenga en cuanto sea posible"""
+        self._cancelado.set()
+
+    def esperar(self, timeout=None):
+        """Bloquea hasta que el trabajo termina; devuelve False si vence el plazo"""
+        return self._fin.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'estado': self.estado,
+            'continuo': self.continuo,
+            'bloques': self.bloques,
+            'intentos_abortados': self.abortados,
+            'hashes': self.hashes,
+            'hashes_por_segundo': self.hashes_por_segundo,
+            'error': self.error,
+            'creado': self.creado,
+            'terminado': self.terminado,
+        }
+
+
+class Minero:
+    """
+    Ejecuta trabajos de minado de una Blockchain en segundo plano.
+
+    Cada intento mina sobre la punta del momento; si la punta cambia antes
+    de encontrar la prueba (consenso o bloque recibido), el intento se
+    abandona y se repite sobre la nueva punta.
+    """
+
+    def __init__(self, blockchain, receptor):
+        """
+        Args:
+            blockchain: Blockchain sobre la que se mina
+            receptor: Dirección que recibe las recompensas de minado
+        """
+        self.blockchain = blockchain
+        self.receptor = receptor
+        self._trabajos = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    def activo(self):
+        """Trabajo en curso, o None"""
+        with self._cerrojo:
+            for trabajo in self._trabajos.values():
+                if trabajo.activo:
+                    return trabajo
+        return None
+
+    def iniciar(self, continuo=False):
+        """
+        Crea y arranca un trabajo de minado.
+
+        Returns:
+            tuple: (trabajo, creado). Si ya hay un trabajo en curso no se
+            crea otro y se devuelve ese con creado=False.
+        """
+        with self._cerrojo:
+            for trabajo in self._trabajos.values():
+                if trabajo.activo:
+                    return trabajo, False
+
+            trabajo = TrabajoMineria(continuo=continuo)
+            self._trabajos[trabajo.id] = trabajo
+            while len(self._trabajos) > MAX_TRABAJOS:
+                self._trabajos.popitem(last=False)
+
+        hilo = threading.Thread(target=self._ejecutar, args=(trabajo,),
+                                name=f'minero-{trabajo.id[:8]}', daemon=True)
+        hilo.start()
+        return trabajo, True
+
+    def obtener(self, id_trabajo):
+        """Trabajo con ese identificador, o None"""
+        with self._cerrojo:
+            return self._trabajos.get(id_trabajo)
+
+    def cancelar(self, id_trabajo):
+        """
+        Cancela un trabajo.
+
+        Returns:
+            TrabajoMineria: El trabajo, o None si no existe
+        """
+        trabajo = self.obtener(id_trabajo)
+        if trabajo is not None:
+            trabajo.cancelar()
+        return trabajo
+
+    def _progreso(self, trabajo):
+        """Callback de progreso de un intento; acumula los hashes de intentos previos"""
+        base = trabajo.hashes
+
+        def actualizar(hashes, segundos):
+            trabajo.hashes = base + hashes
+            trabajo.hashes_por_segundo = round(hashes / segundos) if segundos else 0
+        return actualizar
+
+    def _ejecutar(self, trabajo):
+        trabajo.estado = 'minando'
+        cancelado = trabajo._cancelado.is_set
+        try:
+            while not cancelado():
+                bloque = self.blockchain.minar_bloque(self.receptor, cancelar=cancelado,
+                                                      progreso=self._progreso(trabajo))
+                if bloque is None:
+                    if not cancelado():
+                        # La punta cambió: repetir sobre la nueva punta
+                        trabajo.abortados += 1
+                    continue
+
+                trabajo.ultimo_bloque = bloque
+                trabajo.bloques.append({'indice': bloque.indice, 'hash': bloque.hash,
+                                        'prueba': bloque.prueba,
+                                        'transacciones': len(bloque.transacciones)})
+                if not trabajo.continuo:
+                    break
+
+            # Un trabajo simple que ya minó su bloque está completado aunque
+            # la cancelación llegue después
+            terminado = trabajo.bloques and not trabajo.continuo
+            trabajo.estado = 'cancelado' if cancelado() and not terminado else 'completado'
+        except Exception as error:
+            trabajo.estado = 'error'
+            trabajo.error = str(error)
+        finally:
+            trabajo.terminado = time()
+            trabajo._fin.set()
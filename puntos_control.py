@@ -0,0 +1,195 @@
+"""
+Puntos de Control - Blockchain Educativo
+========================================
+Instantáneas periódicas del estado derivado de la cadena
+
+Componentes:
+- Punto de control: altura, hash de la punta, trabajo acumulado y estado
+  derivado, sellado con el hash SHA-256 de su contenido
+- Creación cada N bloques y retención de los últimos K puntos
+- Herramienta de verificación offline contra la cadena completa
+
+Al arrancar, un nodo con almacén persistente carga el punto de control
+más reciente que coincide con su cadena y solo valida los bloques
+posteriores a él.
+
+Uso de la herramienta de verificación:
+    python puntos_control.py datos
+    python puntos_control.py datos --punto datos/puntos_control/punto_0000001000.json
+"""
+
+import glob
+import hashlib
+import json
+import os
+from time import time
+
+# Cada cuántos bloques se crea un punto de control
+INTERVALO_PUNTOS = 1000
+
+# Puntos de control que se conservan en disco
+RETENCION_PUNTOS = 3
+
+
+def sellar(contenido):
+    """Hash SHA-256 de la serialización canónica del contenido del punto"""
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True).encode()).hexdigest()
+
+
+def crear_punto_control(blockchain):
+    """
+    Construye un punto de control de la cadena actual.
+
+    Returns:
+        dict: Contenido del punto más el campo 'sello' con su hash
+    """
+    contenido = {
+        'altura': len(blockchain.cadena),
+        'hash_punta': blockchain.ultimo_bloque.hash,
+        'trabajo_acumulado': blockchain.trabajo_acumulado,
+        'estado': blockchain.estado_derivado(),
+        'creado': time(),
+    }
+    return dict(contenido, sello=sellar(contenido))
+
+
+def sello_valido(punto):
+    """Comprueba que el contenido del punto no fue alterado"""
+    contenido = {clave: valor for clave, valor in punto.items() if clave != 'sello'}
+    return punto.get('sello') == sellar(contenido)
+
+
+class GestorPuntosControl:
+    """
+    Guarda y recupera puntos de control en un directorio.
+
+    Cada punto se escribe en punto_<altura>.json (primero en un archivo
+    temporal y luego renombrado, para no dejar puntos a medias).
+    """
+
+    def __init__(self, directorio, intervalo=INTERVALO_PUNTOS, retencion=RETENCION_PUNTOS):
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self.retencion = retencion
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, altura):
+        return os.path.join(self.directorio, f'punto_{altura:010d}.json')
+
+    def rutas(self):
+        """Rutas de los puntos de control, del más reciente al más antiguo"""
+        return sorted(glob.glob(os.path.join(self.directorio, 'punto_*.json')), reverse=True)
+
+    def corresponde(self, altura):
+        """Indica si a esta altura toca crear un punto de control"""
+        return self.intervalo > 0 and altura % self.intervalo == 0
+
+    def guardar(self, punto):
+        """Escribe el punto de control y aplica la política de retención"""
+        ruta = self._ruta(punto['altura'])
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump(punto, archivo, sort_keys=True)
+        os.replace(temporal, ruta)
+
+        for antigua in self.rutas()[self.retencion:]:
+            os.remove(antigua)
+
+    def descartar_desde(self, altura):
+        """Elimina los puntos por encima de una altura (tras una reorganización)"""
+        for ruta in self.rutas():
+            if cargar(ruta)['altura'] > altura:
+                os.remove(ruta)
+
+    def mas_reciente(self, cadena):
+        """
+        Punto de control más reciente válido para la cadena dada.
+
+        Se descartan los puntos con el sello alterado y los que no
+        coinciden con el hash del bloque a su altura (p. ej. tras una
+        reorganización).
+
+        Returns:
+            dict: Punto de control, o None si no hay ninguno utilizable
+        """
+        for ruta in self.rutas():
+            try:
+                punto = cargar(ruta)
+            except (OSError, ValueError):
+                continue
+            altura = punto.get('altura', 0)
+            if not sello_valido(punto) or not 0 < altura <= len(cadena):
+                continue
+            if cadena[altura - 1].hash == punto['hash_punta']:
+                return punto
+        return None
+
+
+def cargar(ruta):
+    """Lee un punto de control desde disco"""
+    with open(ruta) as archivo:
+        return json.load(archivo)
+
+
+def verificar(blockchain, punto):
+    """
+    Verifica un punto de control contra la cadena completa.
+
+    Revalida la cadena desde el génesis hasta la altura del punto y
+    recalcula el trabajo acumulado y el estado derivado.
+
+    Returns:
+        list: Errores encontrados (vacía si el punto es correcto)
+    """
+    errores = []
+    if not sello_valido(punto):
+        errores.append('El sello no coincide con el contenido')
+
+    altura = punto['altura']
+    if not 0 < altura <= len(blockchain.cadena):
+        return errores + [f'La cadena solo tiene {len(blockchain.cadena)} bloques']
+
+    prefijo = blockchain.cadena[:altura]
+    if prefijo[-1].hash != punto['hash_punta']:
+        errores.append('El hash de la punta no coincide con el bloque de la cadena')
+    if not blockchain.validar_cadena(prefijo):
+        errores.append('La cadena hasta el punto de control no es válida')
+
+    referencia = type(blockchain).desde_bloques(prefijo)
+    if referencia.trabajo_acumulado != punto['trabajo_acumulado']:
+        errores.append('El trabajo acumulado no coincide')
+    if referencia.estado_derivado() != punto['estado']:
+        errores.append('El estado derivado no coincide')
+    return errores
+
+
+def main():
+    from argparse import ArgumentParser
+
+    from blockchain import Blockchain
+
+    parser = ArgumentParser(description='Verifica puntos de control contra la cadena completa')
+    parser.add_argument('datos', help='Directorio de datos del nodo')
+    parser.add_argument('--punto', default=None,
+                        help='Punto de control a verificar (por defecto: todos)')
+    args = parser.parse_args()
+
+    blockchain = Blockchain(trabajadores=1, directorio_datos=args.datos, validar_al_arrancar=False)
+    rutas = [args.punto] if args.punto else blockchain.puntos_control.rutas()
+    if not rutas:
+        print("No hay puntos de control que verificar")
+        return 1
+
+    fallos = 0
+    for ruta in rutas:
+        errores = verificar(blockchain, cargar(ruta))
+        estado = 'OK' if not errores else 'ERROR'
+        print(f"[{estado}] {ruta}")
+        for error in errores:
+            print(f"    - {error}")
+        fallos += bool(errores)
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,210 @@
+"""
+Cliente de Red - Blockchain Educativo
+=====================================
+Comunicación HTTP con los nodos vecinos
+
+Componentes:
+- Una sesión HTTP persistente (con pool de conexiones) por nodo
+- Consultas concurrentes a todos los nodos con un pool de hilos
+- Plazo global por ronda y latencia/errores por nodo
+- Negociación del formato binario de bloques (ver formato_binario.py)
+- Difusión asíncrona de anuncios (POST) a varios nodos
+- Transporte intercambiable: HTTP real por defecto, o una red simulada
+  en el mismo proceso (ver simulador.py)
+
+requests se importa con la primera petición: crear un cliente (cada
+Blockchain tiene uno) no la carga.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter
+
+from formato_binario import TIPO_BINARIO, decodificar_cadena
+
+# Tiempo máximo de espera de una petición individual (segundos)
+TIMEOUT_NODO = 5
+
+# Plazo por defecto para una ronda completa de consultas (segundos)
+PLAZO_RONDA = 10
+
+# Hilos máximos usados para consultar nodos en paralelo
+MAX_HILOS = 32
+
+# Cabecera Accept que prefiere el formato binario pero admite JSON
+ACEPTAR_BINARIO = f'{TIPO_BINARIO}, application/json;q=0.9'
+
+
+class TransporteHTTP:
+    """
+    Transporte por defecto: HTTP real.
+
+    Mantiene una requests.Session por nodo, de modo que las conexiones TCP
+    se reutilizan entre rondas de consenso en lugar de abrirse en cada
+    petición.
+
+    Un transporte es cualquier objeto con el método solicitar; el de
+    simulador.py entrega las peticiones a nodos del mismo proceso.
+    """
+
+    def __init__(self):
+        self.sesiones = {}
+
+    def sesion(self, nodo):
+        """Devuelve (creándola si hace falta) la sesión persistente del nodo"""
+        if nodo not in self.sesiones:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            sesion.mount('http://', adaptador)
+            self.sesiones[nodo] = sesion
+        return self.sesiones[nodo]
+
+    def olvidar(self, nodo):
+        """Cierra y descarta la sesión de un nodo"""
+        sesion = self.sesiones.pop(nodo, None)
+        if sesion is not None:
+            sesion.close()
+
+    def solicitar(self, nodo, metodo, ruta, timeout=TIMEOUT_NODO, params=None, json=None,
+                  cabeceras=None):
+        """
+        Envía una petición a un nodo.
+
+        Returns:
+            requests.Response: Respuesta del nodo, sin comprobar el código
+
+        Raises:
+            requests.exceptions.RequestException: Error de red
+        """
+        return self.sesion(nodo).request(metodo, f'http://{nodo}{ruta}', timeout=timeout,
+                                         params=params, json=json, headers=cabeceras)
+
+
+class ClienteNodos:
+    """
+    Cliente compartido para hablar con los nodos de la red.
+
+    Las peticiones pasan por el transporte (TransporteHTTP por defecto);
+    el cliente añade la decodificación de las respuestas, la concurrencia
+    y los plazos.
+    """
+
+    def __init__(self, max_hilos=MAX_HILOS, transporte=None):
+        self.transporte = transporte or TransporteHTTP()
+        self.pool = ThreadPoolExecutor(max_workers=max_hilos,
+                                       thread_name_prefix='cliente-nodos')
+
+    def reloj(self):
+        """Segundos de un reloj monótono con el que se miden los plazos de las rondas"""
+        return perf_counter()
+
+    def obtener(self, nodo, ruta, timeout=TIMEOUT_NODO, params=None, binario=False):
+        """
+        Realiza un GET a un nodo y devuelve el JSON de la respuesta.
+
+        Args:
+            binario: Pide la cadena en formato binario. Si el nodo lo
+                ofrece, la respuesta se decodifica con la misma forma que
+                el JSON de /cadena; si no, se usa su respuesta JSON.
+
+        Raises:
+            requests.exceptions.RequestException: Error de red o HTTP
+            ValueError: Respuesta que no se puede decodificar
+        """
+        cabeceras = {'Accept': ACEPTAR_BINARIO} if binario else None
+        respuesta = self.transporte.solicitar(nodo, 'GET', ruta, timeout=timeout, params=params,
+                                              cabeceras=cabeceras)
+        respuesta.raise_for_status()
+        if binario and respuesta.headers.get('Content-Type', '').startswith(TIPO_BINARIO):
+            bloques = decodificar_cadena(respuesta.content)
+            return {'cadena': bloques, 'longitud': len(bloques)}
+        return respuesta.json()
+
+    def publicar(self, nodo, ruta, datos, timeout=TIMEOUT_NODO):
+        """
+        Realiza un POST con cuerpo JSON a un nodo y devuelve el JSON de la respuesta.
+
+        Raises:
+            requests.exceptions.RequestException: Error de red o HTTP
+            ValueError: Respuesta que no es JSON
+        """
+        respuesta = self.transporte.solicitar(nodo, 'POST', ruta, timeout=timeout, json=datos)
+        respuesta.raise_for_status()
+        return respuesta.json()
+
+    def _publicar(self, nodo, ruta, datos):
+        """Envía un anuncio a un nodo; los errores se devuelven, no se lanzan"""
+        import requests
+
+        inicio = perf_counter()
+        try:
+            return {'nodo': nodo, 'datos': self.publicar(nodo, ruta, datos), 'error': None,
+                    'latencia_ms': round((perf_counter() - inicio) * 1000, 2)}
+        except (requests.exceptions.RequestException, ValueError) as error:
+            return {'nodo': nodo, 'datos': None, 'error': str(error),
+                    'latencia_ms': round((perf_counter() - inicio) * 1000, 2)}
+
+    def difundir(self, nodos, ruta, datos):
+        """
+        Envía los mismos datos por POST a varios nodos sin esperar respuesta.
+
+        Las peticiones se ejecutan en el pool de hilos del cliente, de modo
+        que quien anuncia (p. ej. el servidor tras aceptar un bloque) no se
+        bloquea por nodos lentos o caídos.
+
+        Returns:
+            list: Futuros con un resultado por nodo ('nodo', 'datos',
+            'error' y 'latencia_ms')
+        """
+        return [self.pool.submit(self._publicar, nodo, ruta, datos) for nodo in nodos]
+
+    def _consultar(self, nodo, ruta, limite, binario=False):
+        """Consulta un nodo respetando el plazo global de la ronda"""
+        import requests
+
+        inicio = perf_counter()
+        restante = limite - inicio
+        try:
+            if restante <= 0:
+                raise requests.exceptions.Timeout('Plazo de la ronda agotado')
+            datos = self.obtener(nodo, ruta, timeout=min(TIMEOUT_NODO, restante), binario=binario)
+            return {'nodo': nodo, 'datos': datos, 'error': None, 'estado': 200,
+                    'latencia_ms': round((perf_counter() - inicio) * 1000, 2)}
+        except (requests.exceptions.RequestException, ValueError) as error:
+            respuesta = getattr(error, 'response', None)
+            return {'nodo': nodo, 'datos': None, 'error': str(error),
+                    'estado': respuesta.status_code if respuesta is not None else None,
+                    'latencia_ms': round((perf_counter() - inicio) * 1000, 2)}
+
+    def consultar_todos(self, nodos, ruta, plazo=PLAZO_RONDA, binario=False):
+        """
+        Consulta la misma ruta en todos los nodos de forma concurrente.
+
+        Args:
+            nodos: Direcciones (host:puerto) a consultar
+            ruta: Ruta HTTP (ej: '/cadena')
+            plazo: Segundos máximos para toda la ronda
+            binario: Pide la cadena en formato binario (ver obtener)
+
+        Returns:
+            list: Un resultado por nodo con 'nodo', 'datos', 'error',
+            'estado' (código HTTP) y 'latencia_ms'. Los nodos que no
+            responden dentro del plazo aparecen con error.
+        """
+        limite = perf_counter() + plazo
+        futuros = {self.pool.submit(self._consultar, nodo, ruta, limite, binario): nodo
+                   for nodo in nodos}
+        terminados, _ = wait(futuros, timeout=plazo)
+
+        resultados = []
+        for futuro, nodo in futuros.items():
+            if futuro in terminados:
+                resultados.append(futuro.result())
+            else:
+                futuro.cancel()
+                resultados.append({'nodo': nodo, 'datos': None, 'estado': None,
+                                   'error': 'Plazo de la ronda agotado',
+                                   'latencia_ms': round(plazo * 1000, 2)})
+        return resultados
@@ -0,0 +1,79 @@
+"""
+Libro de Saldos - Blockchain Educativo
+======================================
+Saldo de cada dirección mantenido de forma incremental
+
+Componentes:
+- Diccionario dirección -> saldo con consultas en O(1)
+- Aplicación de un bloque al anexarlo y reversión al descartarlo
+  (reorganizaciones del consenso), en O(transacciones del bloque)
+- Exportación e importación para los puntos de control
+
+Las recompensas de minado (emisor "0") crean monedas: solo suman al
+receptor. Las cantidades no numéricas se ignoran, y las decimales se
+redondean a 8 decimales para que aplicar y revertir un bloque deje
+exactamente el mismo saldo.
+"""
+
+# Emisor de las transacciones de recompensa de minado
+EMISOR_RECOMPENSA = "0"
+
+# Decimales con los que se guardan los saldos
+DECIMALES = 8
+
+
+def _cantidad(transaccion):
+    """Cantidad numérica de una transacción, o None si no lo es"""
+    cantidad = transaccion.get('cantidad')
+    if isinstance(cantidad, bool) or not isinstance(cantidad, (int, float)):
+        return None
+    return cantidad
+
+
+class LibroSaldos:
+    """
+    Saldos de todas las direcciones que aparecen en la cadena.
+
+    Blockchain lo actualiza en cada anexado y truncado de la cadena, de
+    modo que siempre refleja los bloques actuales sin recorrerlos.
+    """
+
+    def __init__(self, saldos=None):
+        self._saldos = dict(saldos or {})
+
+    def __len__(self):
+        return len(self._saldos)
+
+    def saldo(self, direccion):
+        """Saldo actual de una dirección (0 si nunca apareció)"""
+        return self._saldos.get(direccion, 0)
+
+    def _mover(self, direccion, cantidad):
+        saldo = self._saldos.get(direccion, 0) + cantidad
+        if isinstance(saldo, float):
+            saldo = round(saldo, DECIMALES)
+        if saldo:
+            self._saldos[direccion] = saldo
+        else:
+            self._saldos.pop(direccion, None)
+
+    def _aplicar(self, transacciones, signo):
+        for transaccion in transacciones:
+            cantidad = _cantidad(transaccion)
+            if cantidad is None:
+                continue
+            if transaccion['emisor'] != EMISOR_RECOMPENSA:
+                self._mover(transaccion['emisor'], -signo * cantidad)
+            self._mover(transaccion['receptor'], signo * cantidad)
+
+    def aplicar(self, bloque):
+        """Suma al libro las transacciones de un bloque anexado"""
+        self._aplicar(bloque.transacciones, 1)
+
+    def revertir(self, bloque):
+        """Deshace las transacciones de un bloque descartado"""
+        self._aplicar(reversed(bloque.transacciones), -1)
+
+    def a_dict(self):
+        """Saldos serializables en JSON (para los puntos de control)"""
+        return dict(sorted(self._saldos.items()))
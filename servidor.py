@@ -0,0 +1,772 @@
+"""
+Servidor del Nodo - Blockchain Educativo
+========================================
+API REST de un nodo con Flask
+
+Componentes:
+- Nodo: blockchain, minero en segundo plano y aplicación Flask
+- create_app(config): fábrica de aplicaciones; cada aplicación tiene su
+  propia Blockchain, así que varios nodos pueden convivir en un proceso
+  (ver simulador.py)
+- Rutas de la API y latencia por ruta para /metricas
+- Línea de comandos del servidor (python blockchain.py)
+
+blockchain.py solo importa este módulo (y con él Flask) cuando se usa la
+API, de modo que los scripts que solo trabajan con bloques y cadenas
+arrancan rápido.
+"""
+
+import io
+import json
+import logging
+from time import perf_counter
+from uuid import uuid4
+
+from flask import Blueprint, Flask, Response, current_app, g, jsonify, request
+from werkzeug.local import LocalProxy
+
+from blockchain import (LIMITE_BLOQUES, LIMITE_HISTORIAL, MAX_LIMITE_HISTORIAL, Blockchain,
+                        es_hash, generar_cadena_json, validar_transaccion)
+from formato_binario import TIPO_BINARIO, codificar_cadena
+from metricas import TIPO_PROMETHEUS
+from minero import Minero
+
+logger = logging.getLogger('blockchain')
+
+
+class Nodo:
+    """
+    Un nodo completo: blockchain, minero en segundo plano y aplicación
+    Flask con la API REST.
+
+    Cada nodo tiene su propia aplicación, así que varios nodos pueden
+    convivir en el mismo proceso (ver simulador.py).
+    """
+
+    def __init__(self, blockchain=None, identificador=None):
+        """
+        Args:
+            blockchain: Blockchain del nodo (por defecto, una nueva en memoria)
+            identificador: Dirección que recibe las recompensas de minado
+        """
+        self.identificador = identificador or str(uuid4()).replace('-', '')
+        self.blockchain = blockchain if blockchain is not None else Blockchain()
+        # Minero en segundo plano; las recompensas van a este nodo
+        self.minero = Minero(self.blockchain, self.identificador)
+        self.app = _aplicacion(self)
+
+
+# Rutas de la API; se registran en la aplicación de cada nodo
+rutas = Blueprint('nodo', __name__)
+
+
+def nodo_actual():
+    """Nodo dueño de la aplicación que atiende la petición en curso"""
+    return current_app.extensions['nodo']
+
+
+# Blockchain y minero del nodo que atiende la petición en curso
+blockchain = LocalProxy(lambda: nodo_actual().blockchain)
+minero = LocalProxy(lambda: nodo_actual().minero)
+
+
+def _aplicacion(nodo):
+    """Aplicación Flask con todas las rutas de la API para un nodo"""
+    app = Flask(__name__)
+    app.extensions['nodo'] = nodo
+    app.register_blueprint(rutas)
+    return app
+
+
+def create_app(config=None):
+    """
+    Fábrica de aplicaciones: crea un nodo nuevo con su propia Blockchain.
+
+    También permite arrancar el servidor con `flask --app servidor run`.
+
+    Args:
+        config: Diccionario con las opciones de Blockchain (trabajadores,
+            directorio_datos, direccion...) y, opcionalmente,
+            'identificador' (dirección que recibe las recompensas)
+
+    Returns:
+        Flask: Aplicación del nodo; el nodo está en app.extensions['nodo']
+    """
+    opciones = dict(config or {})
+    identificador = opciones.pop('identificador', None)
+    return Nodo(Blockchain(**opciones), identificador).app
+
+
+@rutas.before_app_request
+def iniciar_cronometro():
+    """Marca el comienzo de la petición para medir su latencia"""
+    g.inicio_peticion = perf_counter()
+
+
+@rutas.after_app_request
+def registrar_latencia(respuesta):
+    """
+    Registra la latencia de la petición por ruta, método y código.
+
+    Se usa la regla de la ruta (p. ej. /saldo/<direccion>) y no la URL,
+    para no crear una serie por cada dirección consultada. En las
+    respuestas por fragmentos (/cadena) se mide hasta el primer byte.
+    """
+    inicio = g.pop('inicio_peticion', None)
+    if inicio is not None:
+        ruta = request.url_rule.rule if request.url_rule is not None else 'desconocida'
+        blockchain.metricas.peticiones.observar(perf_counter() - inicio, ruta, request.method,
+                                                respuesta.status_code)
+    return respuesta
+
+
+@rutas.route('/metricas', methods=['GET'])
+def metricas():
+    """
+    Endpoint de métricas del nodo en el formato de texto de Prometheus.
+
+    Returns:
+        Texto con minería, validación, consenso, mempool, altura de la
+        cadena y latencia de las peticiones por ruta
+    """
+    return Response(blockchain.metricas.exponer(), content_type=TIPO_PROMETHEUS)
+
+
+@rutas.route('/minar', methods=['GET'])
+def minar():
+    """
+    Endpoint para minar un nuevo bloque.
+    
+    Proceso:
+    1. Ejecutar Proof of Work
+    2. Recompensar al minero
+    3. Crear nuevo bloque
+
+    El minado se ejecuta como un trabajo del minero en segundo plano y la
+    petición espera a que termine; para no bloquear, usar /minar/iniciar.
+    
+    Returns:
+        JSON con información del bloque minado
+    """
+    logger.info("Iniciando minado")
+
+    trabajo, creado = minero.iniciar()
+    if not creado:
+        return jsonify({
+            'mensaje': 'Ya hay un trabajo de minado en curso',
+            'trabajo': trabajo.to_dict(),
+        }), 409
+
+    trabajo.esperar()
+    bloque = trabajo.ultimo_bloque
+    if bloque is None:
+        return jsonify({
+            'mensaje': 'El minado no produjo ningún bloque',
+            'trabajo': trabajo.to_dict(),
+        }), 500 if trabajo.estado == 'error' else 409
+
+    respuesta = {
+        'mensaje': "Nuevo bloque minado",
+        'indice': bloque.indice,
+        'transacciones': bloque.to_dict()['transacciones'],
+        'prueba': bloque.prueba,
+        'hash_previo': bloque.hash_previo,
+        'raiz_merkle': bloque.raiz_merkle,
+        'estadisticas_mineria': blockchain.estadisticas_mineria,
+    }
+    
+    logger.info("Minado completado")
+    return jsonify(respuesta), 200
+
+
+@rutas.route('/minar/iniciar', methods=['POST'])
+def iniciar_minado():
+    """
+    Endpoint para iniciar un trabajo de minado en segundo plano.
+
+    Cuerpo JSON opcional:
+    {
+        "continuo": true    (minar bloques hasta que se cancele)
+    }
+
+    Returns:
+        JSON con el trabajo creado (202), o el trabajo en curso (409)
+    """
+    valores = request.get_json(silent=True) or {}
+    continuo = valores.get('continuo', False)
+    if not isinstance(continuo, bool):
+        return jsonify({'mensaje': "'continuo' debe ser true o false"}), 400
+
+    trabajo, creado = minero.iniciar(continuo=continuo)
+    if not creado:
+        return jsonify({
+            'mensaje': 'Ya hay un trabajo de minado en curso',
+            'trabajo': trabajo.to_dict(),
+        }), 409
+
+    return jsonify({
+        'mensaje': 'Trabajo de minado iniciado',
+        'trabajo': trabajo.to_dict(),
+        'estado': f'/minar/estado/{trabajo.id}',
+    }), 202
+
+
+@rutas.route('/minar/estado/<id_trabajo>', methods=['GET'])
+def estado_minado(id_trabajo):
+    """
+    Endpoint para consultar el estado y el progreso de un trabajo de minado.
+
+    Returns:
+        JSON con el trabajo, o 404 si no existe
+    """
+    trabajo = minero.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'mensaje': 'Trabajo de minado no encontrado'}), 404
+    return jsonify(trabajo.to_dict()), 200
+
+
+@rutas.route('/minar/cancelar/<id_trabajo>', methods=['POST'])
+def cancelar_minado(id_trabajo):
+    """
+    Endpoint para cancelar un trabajo de minado.
+
+    La búsqueda en curso se detiene en cuanto los trabajadores terminan su
+    rango actual; el estado pasa a 'cancelado' poco después.
+
+    Returns:
+        JSON con el trabajo, o 404 si no existe
+    """
+    trabajo = minero.cancelar(id_trabajo)
+    if trabajo is None:
+        return jsonify({'mensaje': 'Trabajo de minado no encontrado'}), 404
+    return jsonify({
+        'mensaje': 'Cancelación solicitada' if trabajo.activo else 'El trabajo ya había terminado',
+        'trabajo': trabajo.to_dict(),
+    }), 200
+
+
+@rutas.route('/transacciones/nueva', methods=['POST'])
+def nueva_transaccion():
+    """
+    Endpoint para crear una nueva transacción.
+    
+    Body esperado:
+        {
+            "emisor": "direccion_emisor",
+            "receptor": "direccion_receptor",
+            "cantidad": 100
+        }
+    
+    Returns:
+        JSON confirmando la transacción
+    """
+    valores = request.get_json()
+
+    # Validar campos requeridos
+    error = validar_transaccion(valores)
+    if error:
+        return error, 400
+
+    # Crear transacción
+    try:
+        indice = blockchain.nueva_transaccion(
+            valores['emisor'],
+            valores['receptor'],
+            valores['cantidad']
+        )
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 409
+
+    respuesta = {
+        'mensaje': f'Transacción será añadida al bloque {indice}'
+    }
+    return jsonify(respuesta), 201
+
+
+def _leer_lote():
+    """
+    Lee las transacciones del cuerpo de /transacciones/lote.
+
+    Admite un array JSON o JSON delimitado por líneas (application/x-ndjson),
+    que se procesa línea a línea a medida que llega el cuerpo.
+
+    Returns:
+        list: Pares (transacción o None, motivo del error o None)
+    """
+    if request.mimetype == 'application/x-ndjson':
+        entradas = []
+        # Lectura con búfer: el stream crudo leería las líneas byte a byte
+        for linea in io.BufferedReader(request.stream):
+            if not linea.strip():
+                continue
+            try:
+                entradas.append((json.loads(linea), None))
+            except ValueError:
+                entradas.append((None, 'JSON inválido'))
+        return entradas
+
+    valores = request.get_json(silent=True)
+    if not isinstance(valores, list):
+        raise ValueError('Se esperaba un array JSON de transacciones')
+    return [(valor, None) for valor in valores]
+
+
+@rutas.route('/transacciones/lote', methods=['POST'])
+def nuevas_transacciones():
+    """
+    Endpoint para crear muchas transacciones en una sola petición.
+    
+    Body esperado (application/json):
+        [
+            {"emisor": "Alice", "receptor": "Bob", "cantidad": 5},
+            {"emisor": "Bob", "receptor": "Charlie", "cantidad": 2}
+        ]
+    
+    o una transacción por línea (application/x-ndjson).
+    
+    Returns:
+        JSON con el resultado de cada transacción, en el mismo orden
+    """
+    try:
+        entradas = _leer_lote()
+    except ValueError as e:
+        return str(e), 400
+
+    resultados = [None] * len(entradas)
+    validas = []
+    for posicion, (valores, error) in enumerate(entradas):
+        error = error or validar_transaccion(valores)
+        if error:
+            resultados[posicion] = {'posicion': posicion, 'estado': 'rechazada', 'motivo': error}
+        else:
+            validas.append((posicion, valores))
+
+    # Insertar todas las transacciones válidas en una sola operación
+    insertadas = blockchain.nuevas_transacciones([valores for _, valores in validas])
+    for (posicion, _), (aceptada, detalle) in zip(validas, insertadas):
+        if aceptada:
+            resultados[posicion] = {'posicion': posicion, 'estado': 'aceptada', 'hash': detalle}
+        else:
+            resultados[posicion] = {'posicion': posicion, 'estado': 'rechazada', 'motivo': detalle}
+
+    aceptadas = sum(resultado['estado'] == 'aceptada' for resultado in resultados)
+    respuesta = {
+        'mensaje': f'{aceptadas} transacción(es) serán añadidas a partir del bloque '
+                   f'{blockchain.ultimo_bloque.indice + 1}',
+        'aceptadas': aceptadas,
+        'rechazadas': len(resultados) - aceptadas,
+        'resultados': resultados,
+    }
+    return jsonify(respuesta), 201
+
+
+@rutas.route('/mempool', methods=['GET'])
+def estado_mempool():
+    """
+    Endpoint con las estadísticas del mempool.
+    
+    Returns:
+        JSON con tamaño, límites y antigüedad de las transacciones pendientes
+    """
+    respuesta = dict(blockchain.mempool.estadisticas(),
+                     max_transacciones_bloque=blockchain.max_transacciones_bloque)
+    return jsonify(respuesta), 200
+
+
+@rutas.route('/cadena', methods=['GET'])
+def cadena_completa():
+    """
+    Endpoint que retorna la blockchain completa.
+    
+    Con la cabecera Accept: application/x-blockchain-educativo la cadena
+    se envía en formato binario (ver formato_binario.py); por defecto, JSON
+    enviado por fragmentos (ver generar_cadena_json).
+    
+    Returns:
+        JSON con la cadena completa y su longitud
+    """
+    if request.accept_mimetypes.best_match(['application/json', TIPO_BINARIO]) == TIPO_BINARIO:
+        # La cabecera lleva el número de bloques: se codifica una copia
+        # tomada con el cerrojo para que no cambie durante la codificación
+        with blockchain.cerrojo:
+            bloques = blockchain.cadena[:]
+        return Response(codificar_cadena(bloques), mimetype=TIPO_BINARIO)
+
+    return Response(generar_cadena_json(blockchain.cadena), mimetype='application/json')
+
+
+@rutas.route('/cadena/punta', methods=['GET'])
+def punta_cadena():
+    """
+    Endpoint ligero con los metadatos de la punta de la cadena.
+    
+    Usado por el consenso para elegir de qué nodo descargar la cadena.
+    
+    Returns:
+        JSON con longitud, hash de la punta y trabajo acumulado
+    """
+    return jsonify(blockchain.punta()), 200
+
+
+@rutas.route('/cadena/desde/<int:altura>', methods=['GET'])
+def cadena_desde(altura):
+    """
+    Endpoint de sincronización incremental.
+    
+    Devuelve solo los bloques posteriores a la altura indicada (el número
+    de bloques que el solicitante ya tiene).
+    
+    Parámetros de consulta:
+        limite: Máximo de bloques a devolver (por defecto 500)
+    
+    Returns:
+        JSON con los bloques, la longitud y el hash de la punta
+    """
+    limite = request.args.get('limite', default=LIMITE_BLOQUES, type=int)
+    return jsonify(blockchain.bloques_desde(altura, limite)), 200
+
+
+@rutas.route('/saldo/<direccion>', methods=['GET'])
+def saldo(direccion):
+    """
+    Endpoint con el saldo confirmado de una dirección.
+    
+    Se lee del libro de saldos que el nodo mantiene al anexar y descartar
+    bloques, sin recorrer la cadena.
+    
+    Returns:
+        JSON con la dirección, su saldo y la altura de la cadena
+    """
+    return jsonify(blockchain.saldo(direccion)), 200
+
+
+@rutas.route('/transacciones/<string(length=64):hash_tx>', methods=['GET'])
+def buscar_transaccion(hash_tx):
+    """
+    Endpoint que localiza una transacción confirmada por su hash.
+    
+    Una misma transacción puede aparecer en varios bloques (p. ej. las
+    recompensas de minado idénticas).
+    
+    Parámetros de consulta:
+        desde: Ubicaciones que se omiten (por defecto 0)
+        limite: Máximo de ubicaciones a devolver (por defecto 100)
+    
+    Returns:
+        JSON con la transacción y los bloques y posiciones donde aparece
+    """
+    desde = max(request.args.get('desde', default=0, type=int), 0)
+    limite = request.args.get('limite', default=LIMITE_HISTORIAL, type=int)
+    limite = max(1, min(limite, MAX_LIMITE_HISTORIAL))
+
+    hash_tx = hash_tx.lower()
+    if not es_hash(hash_tx):
+        return jsonify({'mensaje': 'El hash debe tener 64 caracteres hexadecimales'}), 400
+
+    ubicaciones = blockchain.ubicar_transaccion(hash_tx)
+    if not ubicaciones:
+        return jsonify({'mensaje': 'Transacción no encontrada en la cadena'}), 404
+
+    bloque, posicion = ubicaciones[0]
+    respuesta = {
+        'hash_transaccion': hash_tx,
+        'transaccion': dict(bloque.transacciones[posicion]),
+        'total': len(ubicaciones),
+        'desde': desde,
+        'ubicaciones': [{'bloque': bloque.indice, 'posicion': posicion, 'hash_bloque': bloque.hash}
+                        for bloque, posicion in ubicaciones[desde:desde + limite]],
+    }
+    return jsonify(respuesta), 200
+
+
+@rutas.route('/direcciones/<direccion>/transacciones', methods=['GET'])
+def historial_direccion(direccion):
+    """
+    Endpoint con el historial paginado de una dirección.
+    
+    Parámetros de consulta:
+        desde: Transacciones que se omiten (por defecto 0)
+        limite: Máximo de transacciones a devolver (por defecto 100)
+    
+    Returns:
+        JSON con el total y una página de transacciones en orden de la cadena
+    """
+    desde = request.args.get('desde', default=0, type=int)
+    limite = request.args.get('limite', default=LIMITE_HISTORIAL, type=int)
+    return jsonify(blockchain.historial_direccion(direccion, desde, limite)), 200
+
+
+@rutas.route('/transacciones/<string(length=64):hash_tx>/prueba', methods=['GET'])
+def prueba_transaccion(hash_tx):
+    """
+    Endpoint con la prueba de inclusión de Merkle de una transacción.
+    
+    Con la prueba y la raíz de Merkle del bloque basta para comprobar la
+    inclusión (merkle.verificar_inclusion) sin descargar el bloque.
+    
+    Parámetros de consulta:
+        bloque: Índice del bloque donde buscar (opcional)
+    
+    Returns:
+        JSON con el bloque, la raíz de Merkle y los pasos de la prueba
+    """
+    hash_tx = hash_tx.lower()
+    if not es_hash(hash_tx):
+        return jsonify({'mensaje': 'El hash debe tener 64 caracteres hexadecimales'}), 400
+
+    indice = request.args.get('bloque', default=None, type=int)
+    prueba = blockchain.prueba_inclusion(hash_tx, indice)
+    if prueba is None:
+        return jsonify({'mensaje': 'Transacción no encontrada en la cadena'}), 404
+    return jsonify(prueba), 200
+
+
+@rutas.route('/bloques/anunciar', methods=['POST'])
+def anunciar_bloque():
+    """
+    Endpoint que recibe el anuncio de un bloque nuevo de otro nodo.
+
+    Body esperado:
+        {
+            "bloque": {...},              (formato de /cadena, con 'hash')
+            "origen": "localhost:5001"    (opcional: a quién pedir lo que falte)
+        }
+
+    Returns:
+        JSON con el estado del anuncio (ver Blockchain.recibir_anuncio)
+    """
+    valores = request.get_json(silent=True)
+    if not isinstance(valores, dict) or not isinstance(valores.get('bloque'), dict):
+        return jsonify({'mensaje': "Falta el bloque anunciado"}), 400
+
+    origen = valores.get('origen')
+    if origen is not None and not isinstance(origen, str):
+        return jsonify({'mensaje': "'origen' debe ser host:puerto"}), 400
+
+    try:
+        estado = blockchain.recibir_anuncio(valores['bloque'], origen)
+    except (KeyError, TypeError, ValueError) as e:
+        blockchain.metricas.anuncios.incrementar(1, 'invalido')
+        return jsonify({'mensaje': f'Bloque anunciado inválido: {e}'}), 400
+
+    blockchain.metricas.anuncios.incrementar(1, estado)
+
+    if estado == 'invalido':
+        return jsonify({'mensaje': 'Bloque anunciado inválido', 'estado': estado}), 400
+
+    return jsonify({
+        'mensaje': 'Anuncio procesado',
+        'estado': estado,
+        'longitud': len(blockchain.cadena),
+        'hash_punta': blockchain.ultimo_bloque.hash,
+    }), 200
+
+
+@rutas.route('/nodos/registrar', methods=['POST'])
+def registrar_nodos():
+    """
+    Endpoint para registrar nuevos nodos en la red.
+    
+    Body esperado:
+        {
+            "nodos": ["http://localhost:5001", "http://localhost:5002"]
+        }
+    
+    Returns:
+        JSON con lista de nodos registrados
+    """
+    valores = request.get_json()
+    nodos = valores.get('nodos')
+    
+    if nodos is None:
+        return "Error: Lista de nodos inválida", 400
+
+    for nodo in nodos:
+        blockchain.registrar_nodo(nodo)
+
+    respuesta = {
+        'mensaje': 'Nuevos nodos registrados',
+        'nodos_totales': list(blockchain.nodos),
+    }
+    return jsonify(respuesta), 201
+
+
+@rutas.route('/nodos/resolver', methods=['GET'])
+def consenso():
+    """
+    Endpoint para ejecutar algoritmo de consenso.
+    
+    Aplica la regla de la cadena más larga para resolver
+    conflictos entre nodos.
+    
+    Returns:
+        JSON indicando si la cadena fue reemplazada
+    """
+    logger.info("Ejecutando consenso")
+    reemplazada = blockchain.resolver_conflictos()
+
+    if reemplazada:
+        respuesta = {
+            'mensaje': 'Cadena reemplazada',
+            'nueva_cadena': [bloque.to_dict(incluir_hash=True) for bloque in blockchain.cadena],
+            'ronda': blockchain.ultima_ronda,
+        }
+    else:
+        respuesta = {
+            'mensaje': 'Cadena autoritativa',
+            'cadena': [bloque.to_dict(incluir_hash=True) for bloque in blockchain.cadena],
+            'ronda': blockchain.ultima_ronda,
+        }
+
+    logger.info("Consenso completado")
+    return jsonify(respuesta), 200
+
+
+@rutas.route('/', methods=['GET'])
+def info():
+    """
+    Endpoint de información del nodo.
+    
+    Returns:
+        JSON con información básica del nodo
+    """
+    respuesta = {
+        'mensaje': 'Blockchain Educativo - Nodo Activo',
+        'nodo_id': nodo_actual().identificador,
+        'bloques': len(blockchain.cadena),
+        'endpoints': {
+            'minar': '/minar',
+            'iniciar_minado': '/minar/iniciar',
+            'estado_minado': '/minar/estado/<id>',
+            'cancelar_minado': '/minar/cancelar/<id>',
+            'nueva_transaccion': '/transacciones/nueva',
+            'lote_transacciones': '/transacciones/lote',
+            'mempool': '/mempool',
+            'cadena': '/cadena',
+            'punta': '/cadena/punta',
+            'cadena_desde': '/cadena/desde/<altura>',
+            'prueba_inclusion': '/transacciones/<hash>/prueba',
+            'saldo': '/saldo/<direccion>',
+            'transaccion': '/transacciones/<hash>',
+            'historial': '/direcciones/<direccion>/transacciones',
+            'anunciar_bloque': '/bloques/anunciar',
+            'metricas': '/metricas',
+            'registrar_nodos': '/nodos/registrar',
+            'consenso': '/nodos/resolver'
+        }
+    }
+    return jsonify(respuesta), 200
+
+
+def main():
+    """Arranca un nodo con la configuración de la línea de comandos"""
+    from argparse import ArgumentParser
+
+    from almacenamiento import FORMATOS
+    from mempool import MAX_BYTES, MAX_TRANSACCIONES, MAX_TRANSACCIONES_BLOQUE, POLITICAS
+    from mineria import BACKENDS, obtener_kernel
+    from puntos_control import INTERVALO_PUNTOS, RETENCION_PUNTOS
+    from red import PLAZO_RONDA
+
+    parser = ArgumentParser()
+    parser.add_argument('-p', '--puerto', default=5000, type=int, 
+                       help='Puerto para el servidor')
+    parser.add_argument('-t', '--trabajadores', default=None, type=int,
+                       help='Procesos para el Proof of Work (por defecto: núcleos disponibles)')
+    parser.add_argument('-b', '--backend', default='hashlib', choices=BACKENDS,
+                       help='Backend de búsqueda del Proof of Work')
+    parser.add_argument('--plazo-consenso', default=PLAZO_RONDA, type=float,
+                       help='Segundos máximos por ronda de consenso')
+    parser.add_argument('--paranoico', action='store_true',
+                       help='Revalidar desde el génesis las cadenas recibidas por consenso')
+    parser.add_argument('-d', '--datos', default=None,
+                       help='Directorio donde persistir la cadena (por defecto: solo memoria)')
+    parser.add_argument('--intervalo-puntos', default=INTERVALO_PUNTOS, type=int,
+                       help='Bloques entre puntos de control (0 para desactivarlos)')
+    parser.add_argument('--retencion-puntos', default=RETENCION_PUNTOS, type=int,
+                       help='Puntos de control que se conservan en disco')
+    parser.add_argument('--max-mempool', default=MAX_TRANSACCIONES, type=int,
+                       help='Transacciones máximas en el mempool')
+    parser.add_argument('--max-bytes-mempool', default=MAX_BYTES, type=int,
+                       help='Bytes máximos ocupados por el mempool')
+    parser.add_argument('--politica-mempool', default='antiguas', choices=POLITICAS,
+                       help='Con el mempool lleno: expulsar las más antiguas o rechazar')
+    parser.add_argument('--max-tx-bloque', default=MAX_TRANSACCIONES_BLOQUE, type=int,
+                       help='Transacciones máximas por bloque')
+    parser.add_argument('--formato-almacen', default='json', choices=FORMATOS,
+                       help='Formato en que se escriben los bloques en disco')
+    parser.add_argument('--direccion', default=None,
+                       help='host:puerto con el que este nodo se anuncia a sus vecinos '
+                            '(por defecto: localhost:<puerto>)')
+    parser.add_argument('--nivel-log', default='INFO',
+                       choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                       help='Nivel mínimo de los mensajes de diagnóstico')
+    parser.add_argument('--minado-continuo', action='store_true',
+                       help='Minar bloques en segundo plano desde el arranque')
+    args = parser.parse_args()
+    puerto = args.puerto
+    logging.basicConfig(level=args.nivel_log, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    try:
+        obtener_kernel(args.backend)
+    except ValueError as error:
+        parser.error(str(error))
+
+    # Nodo con la configuración de la línea de comandos
+    app = create_app(dict(
+        trabajadores=args.trabajadores,
+        backend_mineria=args.backend,
+        validacion_paranoica=args.paranoico,
+        plazo_consenso=args.plazo_consenso,
+        directorio_datos=args.datos,
+        intervalo_puntos_control=args.intervalo_puntos,
+        retencion_puntos_control=args.retencion_puntos,
+        max_mempool=args.max_mempool,
+        max_bytes_mempool=args.max_bytes_mempool,
+        politica_mempool=args.politica_mempool,
+        max_transacciones_bloque=args.max_tx_bloque,
+        formato_almacen=args.formato_almacen,
+        direccion=args.direccion or f'localhost:{puerto}',
+    ))
+    nodo = app.extensions['nodo']
+
+    print("\n" + "="*60)
+    print("BLOCKCHAIN EDUCATIVO - SISTEMA DISTRIBUIDO")
+    print("="*60)
+    print(f"\nNodo ID: {nodo.identificador}")
+    print(f"Puerto: {puerto}")
+    print(f"Trabajadores de minería: {nodo.blockchain.trabajadores}")
+    print(f"Backend de minería: {nodo.blockchain.backend_mineria}")
+    print(f"Datos: {args.datos or 'solo en memoria'}")
+    print(f"\nServidor iniciado en: http://localhost:{puerto}")
+    print("\nEndpoints disponibles:")
+    print("  GET  /           - Información del nodo")
+    print("  GET  /cadena     - Ver blockchain completa")
+    print("  GET  /cadena/punta - Ver punta de la cadena")
+    print("  GET  /cadena/desde/<altura> - Bloques posteriores a una altura")
+    print("  GET  /minar      - Minar nuevo bloque")
+    print("  POST /minar/iniciar       - Iniciar minado en segundo plano")
+    print("  GET  /minar/estado/<id>   - Estado de un trabajo de minado")
+    print("  POST /minar/cancelar/<id> - Cancelar un trabajo de minado")
+    print("  POST /transacciones/nueva - Crear transacción")
+    print("  POST /transacciones/lote  - Crear transacciones en lote")
+    print("  GET  /mempool             - Estadísticas del mempool")
+    print("  GET  /transacciones/<hash>/prueba - Prueba de inclusión de Merkle")
+    print("  GET  /saldo/<direccion>   - Saldo de una dirección")
+    print("  GET  /transacciones/<hash> - Localizar una transacción")
+    print("  GET  /direcciones/<direccion>/transacciones - Historial de una dirección")
+    print("  POST /bloques/anunciar    - Recibir el anuncio de un bloque")
+    print("  POST /nodos/registrar     - Registrar nodos")
+    print("  GET  /nodos/resolver      - Ejecutar consenso")
+    print("  GET  /metricas            - Métricas en formato Prometheus")
+    print("\n" + "="*60 + "\n")
+
+    if args.minado_continuo:
+        trabajo, _ = nodo.minero.iniciar(continuo=True)
+        print(f"Minado continuo iniciado (trabajo {trabajo.id})")
+
+    app.run(host='0.0.0.0', port=puerto, debug=True, use_reloader=False)
+
+
+if __name__ == '__main__':
+    main()
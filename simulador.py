@@ -0,0 +1,501 @@
+"""
+Simulador de Red - Blockchain Educativo
+=======================================
+Cluster de nodos en un solo proceso para estudiar el consenso a escala
+
+Componentes:
+- RedSimulada: reloj virtual, cola de eventos y condiciones de la red
+  (latencia, pérdida de mensajes y particiones)
+- TransporteSimulado: sustituye al HTTP entre nodos (ver red.py) y entrega
+  cada petición a la aplicación Flask del nodo destino
+- ClienteSimulado: difusión de anuncios y consultas concurrentes en
+  tiempo virtual
+- Simulador: crea N nodos (servidor.Nodo) con una topología aleatoria,
+  genera minado y transacciones, y mide tiempo de convergencia, bytes por
+  ronda de consenso y trabajo huérfano
+
+Los nodos son los de servidor.py (rutas, anuncios, consenso y
+validación reales); solo cambia el transporte. El Proof of Work también
+es real, pero el momento en que cada nodo encuentra un bloque lo decide el
+simulador (un proceso de Poisson con intervalo medio configurable), de
+modo que el reloj virtual no depende de la velocidad de la máquina.
+
+Modelo de tiempo:
+- Los anuncios (POST asíncronos) se entregan como eventos tras la
+  latencia de un mensaje.
+- Las peticiones síncronas (sincronización y consenso) se resuelven al
+  momento, pero su ida y vuelta se suma al tiempo consumido por el evento
+  en curso; las consultas concurrentes cuentan solo la más lenta.
+- Un mensaje perdido o que cruza una partición cuesta TIMEOUT_NODO.
+
+Uso:
+    python simulador.py [--nodos 100] [--bloques 30] [--latencia 0.05]
+                        [--perdida 0.01] [--particion 60 180]
+                        [--semillas 1 2 3 --procesos 3]
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import random
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean, median
+from time import perf_counter
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from blockchain import Blockchain
+from red import PLAZO_RONDA, TIMEOUT_NODO, ClienteNodos
+from servidor import Nodo
+
+# Nodos vecinos de cada nodo en la topología aleatoria
+VECINOS = 8
+
+# Segundos virtuales medios entre bloques (en toda la red)
+INTERVALO_BLOQUE = 10.0
+
+# Segundos virtuales entre rondas de consenso de cada nodo
+INTERVALO_CONSENSO = 30.0
+
+# Segundos virtuales medios entre transacciones (en toda la red)
+INTERVALO_TRANSACCIONES = 1.0
+
+
+class RedSimulada:
+    """
+    Red en memoria con reloj virtual.
+
+    Los eventos se ejecutan en orden de tiempo virtual; cada uno puede
+    programar otros (p. ej. la entrega de un anuncio).
+    """
+
+    def __init__(self, latencia=0.05, variacion=0.02, perdida=0.0, semilla=0):
+        """
+        Args:
+            latencia: Segundos medios que tarda un mensaje en un sentido
+            variacion: Variación máxima (±) de la latencia
+            perdida: Probabilidad de que se pierda un mensaje
+            semilla: Semilla de las decisiones aleatorias de la red
+        """
+        self.latencia = latencia
+        self.variacion = variacion
+        self.perdida = perdida
+        self.aleatorio = random.Random(semilla)
+
+        self.nodos = {}
+        self.clientes_prueba = {}
+        # Grupo de cada nodo mientras hay una partición (None: red unida)
+        self.grupos = None
+
+        self.ahora = 0.0
+        # Tiempo consumido por las peticiones síncronas del evento en curso
+        self.transcurrido = 0.0
+        self.eventos = []
+        self._secuencia = itertools.count()
+        # Se llama con el nodo afectado tras cada evento
+        self.observador = None
+
+        # Qué está haciendo el evento en curso, para repartir el tráfico
+        self.fase = 'sincronizacion'
+        self.bytes = Counter()
+        self.mensajes = Counter()
+        self.perdidos = 0
+
+    def agregar(self, direccion, nodo):
+        self.nodos[direccion] = nodo
+        self.clientes_prueba[direccion] = nodo.app.test_client()
+
+    def particionar(self, *grupos):
+        """Divide la red: solo se comunican los nodos del mismo grupo"""
+        self.grupos = {direccion: numero for numero, grupo in enumerate(grupos)
+                       for direccion in grupo}
+
+    def reparar(self):
+        """Elimina la partición"""
+        self.grupos = None
+
+    def conectados(self, origen, destino):
+        if self.grupos is None:
+            return True
+        return self.grupos.get(origen) == self.grupos.get(destino)
+
+    def retardo(self):
+        """Latencia de un mensaje en un sentido"""
+        return max(0.0, self.latencia + self.aleatorio.uniform(-self.variacion, self.variacion))
+
+    def perdido(self, origen, destino):
+        return not self.conectados(origen, destino) or self.aleatorio.random() < self.perdida
+
+    @property
+    def tiempo(self):
+        """Instante virtual del evento en curso, incluidas sus peticiones"""
+        return self.ahora + self.transcurrido
+
+    def programar(self, retardo, destino, accion, *args):
+        """
+        Programa accion(*args) tras retardo segundos virtuales.
+
+        Args:
+            destino: Nodo cuya cadena puede cambiar con el evento (o None)
+        """
+        heapq.heappush(self.eventos, (self.tiempo + retardo, next(self._secuencia),
+                                      destino, accion, args))
+
+    def ejecutar(self, hasta):
+        """Procesa los eventos en orden hasta el instante virtual hasta"""
+        while self.eventos and self.eventos[0][0] <= hasta:
+            self.ahora, _, destino, accion, args = heapq.heappop(self.eventos)
+            self.transcurrido = 0.0
+            self.fase = 'sincronizacion'
+            accion(*args)
+            if destino is not None and self.observador is not None:
+                self.observador(destino)
+        self.ahora = max(self.ahora, hasta)
+        self.transcurrido = 0.0
+
+    def enviar(self, origen, destino, ruta, datos):
+        """POST asíncrono: se entrega como evento tras la latencia (o se pierde)"""
+        if self.perdido(origen, destino):
+            self.perdidos += 1
+            return
+        self.programar(self.retardo(), destino, self.despachar, destino, 'POST', ruta, None, datos)
+
+    def despachar(self, destino, metodo, ruta, params=None, datos=None, cabeceras=None):
+        """
+        Entrega una petición a la aplicación Flask del nodo destino.
+
+        Returns:
+            requests.Response: La respuesta, como la devolvería el transporte HTTP
+        """
+        resultado = self.clientes_prueba[destino].open(ruta, method=metodo, query_string=params,
+                                                       json=datos, headers=cabeceras)
+        respuesta = requests.Response()
+        respuesta.status_code = resultado.status_code
+        respuesta.headers = CaseInsensitiveDict(resultado.headers)
+        respuesta._content = resultado.get_data()
+        respuesta.encoding = 'utf-8'
+        respuesta.url = f'http://{destino}{ruta}'
+
+        categoria = 'anuncios' if ruta == '/bloques/anunciar' else self.fase
+        cuerpo = len(json.dumps(datos, separators=(',', ':'))) if datos is not None else 0
+        self.bytes[categoria] += cuerpo + len(respuesta._content)
+        self.mensajes[categoria] += 1
+        return respuesta
+
+
+class TransporteSimulado:
+    """Transporte de un nodo sobre la RedSimulada (misma interfaz que TransporteHTTP)"""
+
+    def __init__(self, red, origen):
+        self.red = red
+        self.origen = origen
+
+    def solicitar(self, nodo, metodo, ruta, timeout=TIMEOUT_NODO, params=None, json=None,
+                  cabeceras=None):
+        if nodo not in self.red.nodos or self.red.perdido(self.origen, nodo):
+            self.red.perdidos += 1
+            self.red.transcurrido += timeout
+            raise requests.exceptions.ConnectionError(f'Sin respuesta de {nodo}')
+        ida_y_vuelta = self.red.retardo() + self.red.retardo()
+        if ida_y_vuelta > timeout:
+            self.red.transcurrido += timeout
+            raise requests.exceptions.Timeout(f'Sin respuesta de {nodo}')
+        self.red.transcurrido += ida_y_vuelta
+        return self.red.despachar(nodo, metodo, ruta, params, json, cabeceras)
+
+
+class ClienteSimulado(ClienteNodos):
+    """
+    ClienteNodos sin hilos: los anuncios se programan en la red simulada y
+    las consultas concurrentes se resuelven una tras otra, contando como
+    tiempo de la ronda solo la más lenta.
+    """
+
+    def __init__(self, red, origen):
+        super().__init__(max_hilos=1, transporte=TransporteSimulado(red, origen))
+        self.red = red
+        self.origen = origen
+
+    def reloj(self):
+        # Los plazos de las rondas se miden en tiempo virtual
+        return self.red.tiempo
+
+    def difundir(self, nodos, ruta, datos):
+        for nodo in nodos:
+            self.red.enviar(self.origen, nodo, ruta, datos)
+        return []
+
+    def consultar_todos(self, nodos, ruta, plazo=PLAZO_RONDA, binario=False):
+        inicio = self.red.transcurrido
+        fin = inicio
+        resultados = []
+        for nodo in nodos:
+            self.red.transcurrido = inicio
+            datos, error, estado = None, None, 200
+            try:
+                datos = self.obtener(nodo, ruta, timeout=min(TIMEOUT_NODO, plazo), binario=binario)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                respuesta = getattr(e, 'response', None)
+                error = str(e)
+                estado = respuesta.status_code if respuesta is not None else None
+            latencia = self.red.transcurrido - inicio
+            if latencia > plazo:
+                datos, error, estado, latencia = None, 'Plazo de la ronda agotado', None, plazo
+            fin = max(fin, inicio + latencia)
+            resultados.append({'nodo': nodo, 'datos': datos, 'error': error, 'estado': estado,
+                               'latencia_ms': round(latencia * 1000, 2)})
+        self.red.transcurrido = fin
+        return resultados
+
+
+class Simulador:
+    """
+    Cluster de nodos simulados con una carga de minado y transacciones.
+
+    Todos los nodos parten del mismo bloque génesis y conocen a `vecinos`
+    nodos (un anillo más enlaces aleatorios, así que la red es conexa).
+    """
+
+    def __init__(self, nodos=100, vecinos=VECINOS, latencia=0.05, variacion=0.02, perdida=0.0,
+                 intervalo_bloque=INTERVALO_BLOQUE, intervalo_consenso=INTERVALO_CONSENSO,
+                 intervalo_transacciones=INTERVALO_TRANSACCIONES, semilla=0):
+        self.red = RedSimulada(latencia, variacion, perdida, semilla)
+        self.red.observador = self._comprobar
+        self.aleatorio = random.Random(semilla + 1)
+        self.intervalo_bloque = intervalo_bloque
+        self.intervalo_consenso = intervalo_consenso
+        self.intervalo_transacciones = intervalo_transacciones
+
+        self.direcciones = [f'nodo{i}' for i in range(nodos)]
+        genesis = None
+        for numero, direccion in enumerate(self.direcciones):
+            opciones = {'trabajadores': 1, 'direccion': direccion,
+                        'cliente': ClienteSimulado(self.red, direccion)}
+            if genesis is None:
+                cadena = Blockchain(**opciones)
+                genesis = cadena.ultimo_bloque
+            else:
+                cadena = Blockchain.desde_bloques([genesis], **opciones)
+            self.red.agregar(direccion, Nodo(cadena, identificador=f'minero{numero}'))
+
+        for numero, direccion in enumerate(self.direcciones):
+            self._enlazar(direccion, self.direcciones[(numero + 1) % nodos])
+        for direccion in self.direcciones:
+            candidatos = [otro for otro in self.direcciones if otro != direccion]
+            while len(self.red.nodos[direccion].blockchain.nodos) < min(vecinos, nodos - 1):
+                self._enlazar(direccion, self.aleatorio.choice(candidatos))
+
+        # Bloques minados: hash -> nodo, instante, índice y hashes del PoW
+        self.minados = {}
+        # Bloques que aún no han llegado a todos: hash -> nodos que faltan
+        self.pendientes = {}
+        self.rondas_consenso = 0
+        self.transacciones = 0
+        self.fin = None
+
+    def _enlazar(self, a, b):
+        if a != b:
+            self.red.nodos[a].blockchain.registrar_nodo(b)
+            self.red.nodos[b].blockchain.registrar_nodo(a)
+
+    def _comprobar(self, direccion):
+        """Anota qué bloques pendientes tiene ya en su cadena el nodo"""
+        cadena = self.red.nodos[direccion].blockchain.cadena
+        for hash_bloque, faltan in list(self.pendientes.items()):
+            if direccion not in faltan:
+                continue
+            indice = self.minados[hash_bloque]['indice']
+            if len(cadena) >= indice and cadena[indice - 1].hash == hash_bloque:
+                faltan.discard(direccion)
+                if not faltan:
+                    bloque = self.minados[hash_bloque]
+                    bloque['convergencia'] = self.red.tiempo - bloque['tiempo']
+                    del self.pendientes[hash_bloque]
+
+    def _minar(self, direccion, restantes):
+        """Un nodo encuentra un bloque sobre su punta y lo anuncia"""
+        self.red.fase = 'mineria'
+        cadena = self.red.nodos[direccion].blockchain
+        bloque = cadena.minar_bloque(self.red.nodos[direccion].identificador)
+        self.minados[bloque.hash] = {
+            'nodo': direccion,
+            'tiempo': self.red.tiempo,
+            'indice': bloque.indice,
+            'hashes': sum(estadistica['hashes'] for estadistica in cadena.estadisticas_mineria),
+        }
+        self.pendientes[bloque.hash] = set(self.direcciones) - {direccion}
+
+        if restantes > 1:
+            siguiente = self.aleatorio.choice(self.direcciones)
+            self.red.programar(self.aleatorio.expovariate(1 / self.intervalo_bloque), siguiente,
+                               self._minar, siguiente, restantes - 1)
+        else:
+            self.fin = self.red.tiempo + 2 * self.intervalo_consenso
+
+    def _transaccion(self):
+        """Un cliente envía una transacción a un nodo cualquiera"""
+        if self.fin is not None:
+            return
+        self.red.fase = 'transacciones'
+        direccion = self.aleatorio.choice(self.direcciones)
+        emisor, receptor = self.aleatorio.sample(range(1000), 2)
+        self.red.despachar(direccion, 'POST', '/transacciones/nueva',
+                           datos={'emisor': f'usuario{emisor}', 'receptor': f'usuario{receptor}',
+                                  'cantidad': self.aleatorio.randint(1, 100)})
+        self.transacciones += 1
+        self.red.programar(self.aleatorio.expovariate(1 / self.intervalo_transacciones), None,
+                           self._transaccion)
+
+    def _consenso(self, direccion):
+        """Ronda de consenso periódica de un nodo"""
+        if self.fin is not None and self.red.ahora > self.fin:
+            return
+        self.red.fase = 'consenso'
+        self.red.nodos[direccion].blockchain.resolver_conflictos()
+        self.rondas_consenso += 1
+        self.red.programar(self.intervalo_consenso, direccion, self._consenso, direccion)
+
+    def ejecutar(self, bloques=30, particion=None):
+        """
+        Ejecuta la simulación hasta minar `bloques` bloques y dejar después
+        dos intervalos de consenso para que la red converja.
+
+        Args:
+            bloques: Bloques a minar en toda la red
+            particion: (inicio, fin) en segundos virtuales durante los que
+                la red queda dividida en dos mitades
+
+        Returns:
+            dict: Resultados de la simulación (ver resultados)
+        """
+        comienzo = perf_counter()
+        red = self.red
+        primero = self.aleatorio.choice(self.direcciones)
+        red.programar(self.aleatorio.expovariate(1 / self.intervalo_bloque), primero, self._minar,
+                      primero, bloques)
+        red.programar(0, None, self._transaccion)
+        for direccion in self.direcciones:
+            red.programar(self.aleatorio.uniform(0, self.intervalo_consenso), direccion,
+                          self._consenso, direccion)
+        if particion is not None:
+            mitad = len(self.direcciones) // 2
+            red.programar(particion[0], None, red.particionar, self.direcciones[:mitad],
+                          self.direcciones[mitad:])
+            red.programar(particion[1], None, red.reparar)
+
+        # Tras self.fin ya no se programan rondas ni transacciones: la cola
+        # se vacía cuando terminan de entregarse los últimos anuncios
+        while red.eventos:
+            red.ejecutar(red.eventos[0][0])
+        return self.resultados(perf_counter() - comienzo)
+
+    def resultados(self, segundos_reales=0.0):
+        """
+        Métricas de la simulación.
+
+        La cadena de referencia es la de más trabajo acumulado; los bloques
+        minados que no están en ella son huérfanos, y su Proof of Work,
+        trabajo desperdiciado.
+        """
+        nodos = [self.red.nodos[direccion].blockchain for direccion in self.direcciones]
+        referencia = max(nodos, key=lambda cadena: (cadena.trabajo_acumulado, len(cadena.cadena)))
+        en_referencia = {bloque.hash for bloque in referencia.cadena}
+
+        huerfanos = [bloque for hash_bloque, bloque in self.minados.items()
+                     if hash_bloque not in en_referencia]
+        convergencias = [bloque['convergencia'] for hash_bloque, bloque in self.minados.items()
+                         if hash_bloque in en_referencia and 'convergencia' in bloque]
+        hashes = sum(bloque['hashes'] for bloque in self.minados.values())
+        bytes_consenso = self.red.bytes['consenso']
+
+        return {
+            'nodos': len(nodos),
+            'bloques_minados': len(self.minados),
+            'altura_final': len(referencia.cadena),
+            'convergida': all(cadena.ultimo_bloque.hash == referencia.ultimo_bloque.hash
+                              for cadena in nodos),
+            'nodos_en_referencia': sum(cadena.ultimo_bloque.hash == referencia.ultimo_bloque.hash
+                                       for cadena in nodos),
+            'convergencia_media_s': round(mean(convergencias), 3) if convergencias else None,
+            'convergencia_mediana_s': round(median(convergencias), 3) if convergencias else None,
+            'convergencia_max_s': round(max(convergencias), 3) if convergencias else None,
+            'bloques_huerfanos': len(huerfanos),
+            'trabajo_huerfano': round(sum(bloque['hashes'] for bloque in huerfanos) / hashes, 4)
+                                if hashes else 0.0,
+            'rondas_consenso': self.rondas_consenso,
+            'bytes_por_ronda_consenso': round(bytes_consenso / self.rondas_consenso)
+                                        if self.rondas_consenso else 0,
+            'bytes': dict(self.red.bytes),
+            'mensajes': dict(self.red.mensajes),
+            'mensajes_perdidos': self.red.perdidos,
+            'transacciones': self.transacciones,
+            'tiempo_virtual_s': round(self.red.ahora, 2),
+            'tiempo_real_s': round(segundos_reales, 2),
+        }
+
+
+def simular(parametros):
+    """Ejecuta un escenario completo (función de módulo para el pool de procesos)"""
+    bloques = parametros.pop('bloques')
+    particion = parametros.pop('particion')
+    return Simulador(**parametros).ejecutar(bloques=bloques, particion=particion)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Simulador de un cluster de nodos en un solo proceso')
+    parser.add_argument('-n', '--nodos', default=100, type=int, help='Nodos simulados')
+    parser.add_argument('--vecinos', default=VECINOS, type=int, help='Vecinos de cada nodo')
+    parser.add_argument('--bloques', default=30, type=int, help='Bloques a minar en toda la red')
+    parser.add_argument('--latencia', default=0.05, type=float,
+                        help='Latencia media de un mensaje (segundos)')
+    parser.add_argument('--variacion', default=0.02, type=float,
+                        help='Variación máxima (±) de la latencia (segundos)')
+    parser.add_argument('--perdida', default=0.0, type=float,
+                        help='Probabilidad de perder un mensaje')
+    parser.add_argument('--intervalo-bloque', default=INTERVALO_BLOQUE, type=float,
+                        help='Segundos virtuales medios entre bloques')
+    parser.add_argument('--intervalo-consenso', default=INTERVALO_CONSENSO, type=float,
+                        help='Segundos virtuales entre rondas de consenso de cada nodo')
+    parser.add_argument('--intervalo-transacciones', default=INTERVALO_TRANSACCIONES, type=float,
+                        help='Segundos virtuales medios entre transacciones')
+    parser.add_argument('--particion', nargs=2, type=float, default=None, metavar=('INICIO', 'FIN'),
+                        help='Dividir la red en dos mitades entre esos instantes virtuales')
+    parser.add_argument('--semillas', nargs='+', type=int, default=[0],
+                        help='Un escenario por semilla')
+    parser.add_argument('--procesos', default=1, type=int,
+                        help='Procesos para ejecutar varios escenarios a la vez')
+    parser.add_argument('--salida', default=None, help='Fichero JSON donde guardar los resultados')
+    parser.add_argument('--nivel-log', default='ERROR',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Nivel mínimo de los mensajes de diagnóstico de los nodos')
+    args = parser.parse_args()
+    logging.basicConfig(level=args.nivel_log, format='%(levelname)s %(name)s: %(message)s')
+
+    escenarios = [{
+        'nodos': args.nodos, 'vecinos': args.vecinos, 'latencia': args.latencia,
+        'variacion': args.variacion, 'perdida': args.perdida,
+        'intervalo_bloque': args.intervalo_bloque, 'intervalo_consenso': args.intervalo_consenso,
+        'intervalo_transacciones': args.intervalo_transacciones, 'semilla': semilla,
+        'bloques': args.bloques, 'particion': args.particion,
+    } for semilla in args.semillas]
+
+    if args.procesos > 1 and len(escenarios) > 1:
+        with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+            resultados = list(pool.map(simular, escenarios))
+    else:
+        resultados = [simular(escenario) for escenario in escenarios]
+
+    for semilla, resultado in zip(args.semillas, resultados):
+        print(f"\nSemilla {semilla}")
+        print("-" * 50)
+        for clave, valor in resultado.items():
+            print(f"  {clave:<28}{valor}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as fichero:
+            json.dump(resultados, fichero, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
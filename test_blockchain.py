@@ -4,6 +4,7 @@ Script de Pruebas - Blockchain Educativo
 Ejecuta pruebas automáticas de todas las funcionalidades
 """
 
+import hashlib
 import requests
 import json
 from time import time, sleep
@@ -82,6 +83,15 @@ def test_transacciones():
         print(f"  {i}. {tx['emisor']} -> {tx['receptor']}: {tx['cantidad']} unidades")
         print(f"     {resultado['mensaje']}")
     
+    print("\nReenviando una transacción ya pendiente:")
+    response = requests.post(f"{BASE_URL}/transacciones/nueva", json=transacciones[0])
+    print(f"  {response.json()['mensaje']}")
+    assert response.status_code == 409, "Una transacción duplicada debe rechazarse"
+    
+    mempool = requests.get(f"{BASE_URL}/mempool").json()
+    print(f"\nMempool: {mempool['transacciones']} transacciones, {mempool['bytes']} bytes")
+    assert mempool['transacciones'] == len(transacciones), "El mempool no debe contener duplicados"
+    
     print("\nResultado: PASS")
 
 
@@ -192,6 +202,698 @@ def test_estadisticas():
     print("\nResultado: PASS")
 
 
+def test_punta_cadena():
+    """Prueba 8: Metadatos de la punta de la cadena"""
+    seccion("PRUEBA 8: PUNTA DE LA CADENA")
+    
+    cadena = requests.get(f"{BASE_URL}/cadena").json()
+    punta = requests.get(f"{BASE_URL}/cadena/punta").json()
+    
+    print(f"Longitud: {punta['longitud']}")
+    print(f"Hash de la punta: {punta['hash_punta'][:32]}...")
+    print(f"Trabajo acumulado: {punta['trabajo_acumulado']}")
+    
+    assert punta['longitud'] == cadena['longitud'], "La longitud debe coincidir con /cadena"
+    assert punta['hash_punta'] == cadena['cadena'][-1]['hash'], "Debe ser el hash del último bloque"
+    assert punta['trabajo_acumulado'] > 0, "Una cadena con bloques minados tiene trabajo"
+    
+    print("\nSincronización incremental desde la altura 3 (límite 1):")
+    delta = requests.get(f"{BASE_URL}/cadena/desde/3", params={"limite": 1}).json()
+    print(f"  Bloques recibidos: {[bloque['indice'] for bloque in delta['bloques']]}")
+    assert [bloque['indice'] for bloque in delta['bloques']] == [4], "Debe devolver solo el bloque 4"
+    assert delta['bloques'][0]['hash_previo'] == cadena['cadena'][2]['hash'], "Debe enlazar con el bloque 3"
+    
+    delta = requests.get(f"{BASE_URL}/cadena/desde/{punta['longitud']}").json()
+    assert delta['bloques'] == [], "Un nodo al día no recibe bloques"
+
+    print("\nConsenso con un nodo lento (plazo de la ronda 0.7 s):")
+    from blockchain import Blockchain
+    from red import ClienteNodos, TransporteHTTP
+
+    class TransporteLento(TransporteHTTP):
+        """Cada petición tarda 0.5 s más (o agota su timeout)"""
+        def solicitar(self, nodo, metodo, ruta, timeout=5, **opciones):
+            if timeout < 0.5:
+                sleep(timeout)
+                raise requests.exceptions.Timeout(f"Sin respuesta de {nodo}")
+            sleep(0.5)
+            return super().solicitar(nodo, metodo, ruta, timeout=timeout, **opciones)
+
+    nodo = Blockchain(trabajadores=1, plazo_consenso=0.7, cliente=ClienteNodos(transporte=TransporteLento()))
+    nodo.registrar_nodo(BASE_URL)
+    inicio = time()
+    nodo.resolver_conflictos()
+    duracion = time() - inicio
+    print(f"  Duración de la ronda: {duracion:.2f} s")
+    assert duracion < 0.9, "La sincronización y las descargas comparten el plazo de la ronda"
+    servidor = next(iter(nodo.nodos))
+    assert nodo.sincronizar_con(servidor, limite=nodo.cliente.reloj()) == 'plazo_agotado', \
+        "Con el plazo vencido no se piden más páginas"
+    assert len(nodo.cadena) == 1, "Sin bloques recibidos la cadena local no cambia"
+
+    print("\nResultado: PASS")
+
+
+def test_kernel_pow():
+    """Prueba 9: Kernel de minería frente al verificador de referencia"""
+    seccion("PRUEBA 9: KERNEL DE PROOF OF WORK")
+    
+    from blockchain import Blockchain
+    from mineria import buscar_en_rango
+    
+    casos = [(100, "1"), (35293, "a" * 64), (7, "d6b14a22163197e4c920f22270a1f114")]
+    
+    print("Comparando kernel por lotes con prueba_valida (dificultad 2):")
+    for ultima_prueba, ultimo_hash in casos:
+        esperadas = [
+            prueba for prueba in range(5000)
+            if hashlib.sha256(f'{ultima_prueba}{prueba}{ultimo_hash}'.encode()).hexdigest()[:2] == "00"
+        ]
+        
+        encontradas = []
+        inicio = 0
+        while True:
+            prueba, _ = buscar_en_rango(ultima_prueba, ultimo_hash, inicio, 5000, dificultad=2)
+            if prueba is None:
+                break
+            encontradas.append(prueba)
+            inicio = prueba + 1
+        
+        assert encontradas == esperadas, "El kernel debe encontrar las mismas pruebas"
+        print(f"  Prueba anterior {ultima_prueba}: {len(encontradas)} pruebas coinciden")
+    
+    try:
+        import mineria_numpy
+    except ImportError:
+        mineria_numpy = None
+        print("\nNumPy no instalado: se omite el backend 'numpy'")
+    
+    if mineria_numpy:
+        print("\nComparando backend NumPy con el kernel hashlib:")
+        for ultima_prueba, ultimo_hash in casos:
+            prueba_numpy, _ = mineria_numpy.buscar_en_rango(ultima_prueba, ultimo_hash, 0, 10 ** 7)
+            prueba_hashlib, _ = buscar_en_rango(ultima_prueba, ultimo_hash, 0, 10 ** 7)
+            assert prueba_numpy == prueba_hashlib, "Ambos backends deben dar la misma prueba"
+            print(f"  Prueba anterior {ultima_prueba}: prueba {prueba_numpy} en ambos backends")
+    
+    print("\nComparando con prueba_valida (dificultad por defecto):")
+    for ultima_prueba, ultimo_hash in casos:
+        prueba, _ = buscar_en_rango(ultima_prueba, ultimo_hash, 0, 10 ** 7)
+        assert Blockchain.prueba_valida(ultima_prueba, prueba, ultimo_hash), "Prueba inválida"
+        assert not any(Blockchain.prueba_valida(ultima_prueba, menor, ultimo_hash)
+                       for menor in range(prueba)), "Debe ser la menor prueba válida"
+        print(f"  Prueba anterior {ultima_prueba}: prueba {prueba} verificada")
+    
+    print("\nResultado: PASS")
+
+
+def test_lote_transacciones():
+    """Prueba 10: Ingesta de transacciones en lote"""
+    seccion("PRUEBA 10: TRANSACCIONES EN LOTE")
+    
+    antes = requests.get(f"{BASE_URL}/mempool").json()['transacciones']
+    lote = [{"emisor": f"lote{i}", "receptor": "Bob", "cantidad": i} for i in range(1, 6)]
+    lote.append(lote[0])
+    lote.append({"emisor": "Alice", "receptor": "Bob"})
+    
+    print("Enviando lote JSON de 7 transacciones (1 duplicada, 1 incompleta):")
+    response = requests.post(f"{BASE_URL}/transacciones/lote", json=lote)
+    assert response.status_code == 201, "Código de respuesta debe ser 201"
+    resultado = response.json()
+    print(f"  {resultado['mensaje']}")
+    print(f"  Aceptadas: {resultado['aceptadas']}, rechazadas: {resultado['rechazadas']}")
+    for item in resultado['resultados'][-2:]:
+        print(f"  Posición {item['posicion']}: {item['estado']} ({item['motivo']})")
+    
+    assert resultado['aceptadas'] == 5, "Deben aceptarse las 5 transacciones distintas"
+    assert [item['estado'] for item in resultado['resultados']][-2:] == ['rechazada', 'rechazada']
+    
+    print("\nEnviando lote NDJSON de 3 transacciones (1 línea inválida):")
+    cuerpo = "\n".join([
+        json.dumps({"emisor": "ndjson1", "receptor": "Bob", "cantidad": 1}),
+        "{no es json",
+        json.dumps({"emisor": "ndjson2", "receptor": "Bob", "cantidad": 2}),
+    ])
+    response = requests.post(f"{BASE_URL}/transacciones/lote", data=cuerpo,
+                             headers={"Content-Type": "application/x-ndjson"})
+    resultado = response.json()
+    print(f"  Aceptadas: {resultado['aceptadas']}, rechazadas: {resultado['rechazadas']}")
+    assert resultado['aceptadas'] == 2, "Deben aceptarse las 2 líneas válidas"
+    assert resultado['resultados'][1]['estado'] == 'rechazada', "La línea inválida se rechaza"
+    
+    despues = requests.get(f"{BASE_URL}/mempool").json()['transacciones']
+    assert despues == antes + 7, "El mempool debe contener las 7 transacciones aceptadas"
+    
+    print("\nResultado: PASS")
+
+
+def test_prueba_merkle():
+    """Prueba 11: Prueba de inclusión de Merkle"""
+    seccion("PRUEBA 11: PRUEBA DE INCLUSIÓN DE MERKLE")
+    
+    from merkle import raiz_merkle, verificar_inclusion
+    
+    cadena = requests.get(f"{BASE_URL}/cadena").json()['cadena']
+    for bloque in cadena:
+        assert bloque['raiz_merkle'] == raiz_merkle(bloque['transacciones']), \
+            f"La raíz de Merkle del bloque {bloque['indice']} no coincide"
+    print(f"Raíces de Merkle de {len(cadena)} bloques verificadas")
+    
+    bloque = cadena[1]
+    tx = bloque['transacciones'][1]
+    hash_tx = hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+    print(f"\nTransacción {tx['emisor']} -> {tx['receptor']} ({hash_tx[:16]}...):")
+    
+    response = requests.get(f"{BASE_URL}/transacciones/{hash_tx}/prueba")
+    assert response.status_code == 200, "La transacción confirmada debe tener prueba"
+    prueba = response.json()
+    print(f"  Bloque {prueba['bloque']}, posición {prueba['posicion']}, "
+          f"{len(prueba['prueba'])} hashes en la prueba")
+    
+    assert prueba['bloque'] == bloque['indice'], "Debe localizar el bloque correcto"
+    assert verificar_inclusion(hash_tx, prueba['prueba'], bloque['raiz_merkle']), \
+        "La prueba debe verificarse contra la raíz del bloque"
+    assert not verificar_inclusion("00" * 32, prueba['prueba'], bloque['raiz_merkle']), \
+        "Una transacción ajena no debe verificarse"
+    
+    response = requests.get(f"{BASE_URL}/transacciones/{'00' * 32}/prueba")
+    assert response.status_code == 404, "Una transacción inexistente devuelve 404"
+    
+    print("\nResultado: PASS")
+
+
+def test_saldos():
+    """Prueba 12: Libro de saldos"""
+    seccion("PRUEBA 12: SALDOS POR DIRECCIÓN")
+    
+    cadena = requests.get(f"{BASE_URL}/cadena").json()['cadena']
+    esperados = {}
+    for bloque in cadena:
+        for tx in bloque['transacciones']:
+            if tx['emisor'] != "0":
+                esperados[tx['emisor']] = esperados.get(tx['emisor'], 0) - tx['cantidad']
+            esperados[tx['receptor']] = esperados.get(tx['receptor'], 0) + tx['cantidad']
+    
+    print("Saldos calculados recorriendo /cadena frente a /saldo:")
+    for direccion in ["Alice", "Bob", "Charlie", "David", "nadie"]:
+        respuesta = requests.get(f"{BASE_URL}/saldo/{direccion}").json()
+        print(f"  {direccion}: {respuesta['saldo']}")
+        assert respuesta['saldo'] == esperados.get(direccion, 0), f"Saldo incorrecto de {direccion}"
+        assert respuesta['altura'] == len(cadena), "El saldo corresponde a la punta actual"
+    
+    print("\nReorganización sin servidor (descartar y reaplicar bloques):")
+    from blockchain import Blockchain
+    
+    nodo = Blockchain(trabajadores=1)
+    for i in range(1, 4):
+        nodo.nueva_transaccion("Alice", "Bob", i)
+        nodo.nueva_transaccion("0", "Alice", 0.1)
+        nodo.nuevo_bloque(prueba=i)
+    antes = nodo.estado_derivado()
+    
+    bloques = nodo.cadena[1:]
+    nodo._truncar_cadena(1)
+    assert nodo.estado_derivado() == {'saldos': {}}, "Sin bloques no debe haber saldos"
+    for bloque in bloques:
+        nodo._anexar_bloque(bloque)
+    
+    print(f"  Saldos tras reaplicar: {nodo.estado_derivado()['saldos']}")
+    assert nodo.estado_derivado() == antes, "Revertir y reaplicar debe dejar los mismos saldos"
+    assert nodo.saldo("Bob")['saldo'] == 6, "Bob debe haber recibido 1 + 2 + 3"
+
+    print("\nBloque con una transacción sin emisor:")
+    from blockchain import Bloque
+    from mineria import buscar_prueba
+
+    punta = Bloque.desde_dict(cadena[-1])
+    prueba, _ = buscar_prueba(punta.prueba, punta.hash, trabajadores=1)
+    bloque = Bloque(punta.indice + 1, time(), [{"receptor": "x", "cantidad": 1}], prueba, punta.hash)
+    respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json={"bloque": bloque.to_dict(incluir_hash=True)})
+    print(f"  Anuncio: HTTP {respuesta.status_code} ({respuesta.json().get('estado')})")
+    assert respuesta.status_code == 400 and respuesta.json().get('estado') == 'invalido', \
+        "La validación debe rechazar el bloque"
+    assert len(requests.get(f"{BASE_URL}/cadena").json()['cadena']) == len(cadena), \
+        "El bloque rechazado no debe quedar en la cadena"
+
+    respuesta = requests.post(f"{BASE_URL}/transacciones/nueva",
+                              json={"emisor": "Alice", "receptor": "Bob", "cantidad": "5"})
+    assert respuesta.status_code == 400, "Una cantidad que no es un número se rechaza"
+
+    print("\nResultado: PASS")
+
+
+def test_indices():
+    """Prueba 13: Índices de transacciones y direcciones"""
+    seccion("PRUEBA 13: ÍNDICES DE TRANSACCIONES Y DIRECCIONES")
+    
+    cadena = requests.get(f"{BASE_URL}/cadena").json()['cadena']
+    tx = cadena[1]['transacciones'][2]
+    hash_tx = hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+    
+    respuesta = requests.get(f"{BASE_URL}/transacciones/{hash_tx}").json()
+    print(f"Transacción {tx['emisor']} -> {tx['receptor']}: {respuesta['ubicaciones']}")
+    assert respuesta['transaccion'] == tx, "Debe devolver la transacción indexada"
+    assert [(u['bloque'], u['posicion']) for u in respuesta['ubicaciones']] == [(2, 2)], \
+        "Debe estar en el bloque 2, posición 2"
+    
+    response = requests.get(f"{BASE_URL}/transacciones/{'00' * 32}")
+    assert response.status_code == 404, "Una transacción inexistente devuelve 404"
+    
+    esperado = [(bloque['indice'], posicion)
+                for bloque in cadena
+                for posicion, t in enumerate(bloque['transacciones'])
+                if "Bob" in (t['emisor'], t['receptor'])]
+    
+    print("\nHistorial de Bob en páginas de 1 transacción:")
+    paginas = []
+    desde = 0
+    while True:
+        pagina = requests.get(f"{BASE_URL}/direcciones/Bob/transacciones",
+                              params={"desde": desde, "limite": 1}).json()
+        if not pagina['transacciones']:
+            break
+        paginas.extend((t['bloque'], t['posicion']) for t in pagina['transacciones'])
+        desde += 1
+    print(f"  {pagina['total']} transacciones: {paginas}")
+    
+    assert paginas == esperado, "El historial debe coincidir con el recorrido de /cadena"
+    assert pagina['total'] == len(esperado), "El total debe contar todo el historial"
+
+    print("\nHashes mal formados:")
+    for ruta, esperado in (("/transacciones/xyz", 404), ("/transacciones/zz/prueba", 404),
+                           ("/transacciones/" + "g" * 64, 400), ("/transacciones/" + "g" * 64 + "/prueba", 400),
+                           ("/transacciones/nueva", 405)):
+        codigo = requests.get(f"{BASE_URL}{ruta}").status_code
+        print(f"  GET {ruta[:40]}: {codigo}")
+        assert codigo == esperado, f"GET {ruta} debe responder {esperado}"
+
+    print("\nÍndice con ubicaciones obsoletas (sin servidor):")
+    from blockchain import Blockchain
+    from mempool import hash_transaccion
+
+    nodo = Blockchain(trabajadores=1)
+    nodo.nueva_transaccion("Alice", "Bob", 1)
+    nodo.nuevo_bloque(prueba=1)
+    hash_tx = hash_transaccion({"emisor": "Alice", "receptor": "Bob", "cantidad": 1})
+    assert len(nodo.ubicar_transaccion(hash_tx)) == 1, "La transacción está indexada"
+    nodo.indices
+    del nodo.cadena[1:]
+    assert nodo.ubicar_transaccion(hash_tx) == [], "Las ubicaciones que ya no existen se descartan"
+    assert nodo.historial_direccion("Alice")['transacciones'] == [], "El historial omite los bloques descartados"
+    print("  Sin excepciones tras truncar la cadena por debajo del índice")
+    
+    print("\nResultado: PASS")
+
+
+def test_formato_binario():
+    """Prueba 14: Formato binario de la cadena"""
+    seccion("PRUEBA 14: FORMATO BINARIO")
+    
+    from formato_binario import TIPO_BINARIO, decodificar_cadena
+    from red import ClienteNodos
+    
+    json_resp = requests.get(f"{BASE_URL}/cadena")
+    bin_resp = requests.get(f"{BASE_URL}/cadena", headers={"Accept": TIPO_BINARIO})
+    print(f"JSON:    {len(json_resp.content)} bytes ({json_resp.headers['Content-Type']})")
+    print(f"Binario: {len(bin_resp.content)} bytes ({bin_resp.headers['Content-Type']})")
+    
+    assert bin_resp.headers['Content-Type'].startswith(TIPO_BINARIO), "Debe negociar el formato binario"
+    assert len(bin_resp.content) < len(json_resp.content), "El formato binario debe ser más compacto"
+    
+    esperada = [{clave: valor for clave, valor in bloque.items() if clave != 'hash'}
+                for bloque in json_resp.json()['cadena']]
+    assert decodificar_cadena(bin_resp.content) == esperada, "Ambos formatos deben tener los mismos bloques"
+    
+    nodo = BASE_URL.split("://")[1]
+    datos = ClienteNodos().obtener(nodo, '/cadena', binario=True)
+    assert datos['longitud'] == len(esperada), "El cliente decodifica la respuesta binaria"
+    print("\nBloques decodificados idénticos a la respuesta JSON")
+
+    from blockchain import Bloque
+    from mineria import buscar_prueba
+
+    punta = Bloque.desde_dict(json_resp.json()['cadena'][-1])
+    prueba, _ = buscar_prueba(punta.prueba, punta.hash, trabajadores=1)
+    bloque = Bloque(punta.indice + 1, time(), [{"emisor": "\ud800", "receptor": "B", "cantidad": 1}],
+                    prueba, punta.hash)
+    respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json={"bloque": bloque.to_dict(incluir_hash=True)})
+    print(f"Bloque con texto no representable en UTF-8: HTTP {respuesta.status_code}")
+    assert respuesta.status_code == 400 and respuesta.json().get('estado') == 'invalido', \
+        "La validación rechaza el bloque antes de que llegue al formato binario"
+    bin_resp = requests.get(f"{BASE_URL}/cadena", headers={"Accept": TIPO_BINARIO})
+    assert bin_resp.status_code == 200, "La cadena binaria se sigue pudiendo servir"
+
+    print("\nResultado: PASS")
+
+
+def test_cadena_columnar():
+    """Prueba 15: Cadena en memoria por columnas"""
+    seccion("PRUEBA 15: CADENA COLUMNAR")
+    
+    from blockchain import Bloque
+    from cadena_columnar import CadenaColumnar
+    
+    cadena = requests.get(f"{BASE_URL}/cadena").json()['cadena']
+    bloques = [Bloque.desde_dict(bloque) for bloque in cadena]
+    bloques.append(Bloque(len(bloques) + 1, 1700000000, [{"emisor": "A", "receptor": "B",
+                          "cantidad": 1, "nota": "x"}], 7, bloques[-1].hash))
+    
+    columnar = CadenaColumnar(Bloque.desde_dict, tamano_cache=1)
+    for bloque in bloques:
+        columnar.append(bloque)
+    
+    print(f"Bloques guardados por columnas: {len(columnar)}")
+    reconstruidos = [bloque.to_dict(incluir_hash=True) for bloque in columnar]
+    assert reconstruidos == [bloque.to_dict(incluir_hash=True) for bloque in bloques], \
+        "La reconstrucción debe ser exacta"
+    assert [bloque.hash for bloque in columnar] == [bloque['hash'] for bloque in cadena] + [bloques[-1].hash], \
+        "Los hashes deben coincidir con los del servidor"
+    assert columnar[-1].to_dict() == bloques[-1].to_dict(), "Acceso desde el final"
+    
+    del columnar[2:]
+    print(f"Tras descartar desde la posición 2: {len(columnar)} bloques")
+    assert [bloque.indice for bloque in columnar] == [1, 2], "Solo deben quedar 2 bloques"
+    columnar.append(bloques[2])
+    assert columnar[2].hash == bloques[2].hash, "Se puede volver a anexar tras truncar"
+
+    invalido = Bloque(4, 1700000000.5, [{"emisor": "\ud800", "receptor": "B", "cantidad": 1}],
+                      7, "a" * 64, "b" * 64)
+    try:
+        columnar.append(invalido)
+        raise AssertionError("Un texto no representable en UTF-8 no se puede codificar")
+    except UnicodeEncodeError:
+        pass
+    assert len(columnar) == 3 and columnar[-1].hash == bloques[2].hash, \
+        "Un error al anexar no debe desalinear las columnas"
+
+    cuerpo = '{"emisor": "\\ud800", "receptor": "Bob", "cantidad": 1}'
+    response = requests.post(f"{BASE_URL}/transacciones/nueva", data=cuerpo,
+                             headers={"Content-Type": "application/json"})
+    print(f"Transacción con un surrogate suelto: {response.status_code} ({response.text})")
+    assert response.status_code == 400, "El nodo debe rechazar texto no representable en UTF-8"
+
+    print("\nResultado: PASS")
+
+
+def esperar_trabajo(id_trabajo, plazo=60):
+    """Consulta el estado de un trabajo de minado hasta que termina"""
+    limite = time() + plazo
+    while time() < limite:
+        trabajo = requests.get(f"{BASE_URL}/minar/estado/{id_trabajo}").json()
+        if trabajo['estado'] in ('completado', 'cancelado', 'error'):
+            return trabajo
+        sleep(0.2)
+    raise AssertionError(f"El trabajo {id_trabajo} no terminó en {plazo} s")
+
+
+def test_minero_segundo_plano():
+    """Prueba 16: Minado en segundo plano"""
+    seccion("PRUEBA 16: MINADO EN SEGUNDO PLANO")
+    
+    longitud = requests.get(f"{BASE_URL}/cadena/punta").json()['longitud']
+    
+    respuesta = requests.post(f"{BASE_URL}/minar/iniciar")
+    assert respuesta.status_code == 202, "Debe aceptar el trabajo"
+    trabajo = respuesta.json()['trabajo']
+    print(f"Trabajo iniciado: {trabajo['id']} ({trabajo['estado']})")
+    
+    trabajo = esperar_trabajo(trabajo['id'])
+    print(f"Estado final: {trabajo['estado']}, {trabajo['hashes']} hashes")
+    assert trabajo['estado'] == 'completado', "El trabajo debe completarse"
+    assert len(trabajo['bloques']) == 1, "Un trabajo simple mina un bloque"
+    punta = requests.get(f"{BASE_URL}/cadena/punta").json()
+    assert punta['longitud'] == longitud + 1, "El bloque debe añadirse a la cadena"
+    assert punta['hash_punta'] == trabajo['bloques'][0]['hash'], "El bloque minado es la punta"
+    
+    continuo = requests.post(f"{BASE_URL}/minar/iniciar", json={"continuo": True}).json()['trabajo']
+    duplicado = requests.post(f"{BASE_URL}/minar/iniciar")
+    assert duplicado.status_code == 409, "Solo puede haber un trabajo activo"
+    assert duplicado.json()['trabajo']['id'] == continuo['id'], "Debe informar del trabajo en curso"
+    
+    sleep(1)
+    cancelado = requests.post(f"{BASE_URL}/minar/cancelar/{continuo['id']}")
+    assert cancelado.status_code == 200, "Debe aceptar la cancelación"
+    trabajo = esperar_trabajo(continuo['id'])
+    print(f"Trabajo continuo: {trabajo['estado']} tras {len(trabajo['bloques'])} bloque(s)")
+    assert trabajo['estado'] == 'cancelado', "El trabajo continuo debe quedar cancelado"
+    
+    assert requests.get(f"{BASE_URL}/minar/estado/desconocido").status_code == 404, \
+        "Un trabajo desconocido debe dar 404"
+    
+    print("\nResultado: PASS")
+
+
+def test_cadena_fragmentos():
+    """Prueba 17: /cadena enviada por fragmentos"""
+    seccion("PRUEBA 17: /CADENA POR FRAGMENTOS")
+    
+    from benchmarks.bench_cadena import generar_cadena, materializada, medir
+    from blockchain import generar_cadena_json
+    
+    inicio = time()
+    respuesta = requests.get(f"{BASE_URL}/cadena", stream=True)
+    next(respuesta.iter_content(chunk_size=None))
+    primer_byte = time() - inicio
+    respuesta.close()
+    print(f"Servidor: primer byte de /cadena en {primer_byte * 1000:.1f} ms "
+          f"(Transfer-Encoding: {respuesta.headers.get('Transfer-Encoding')})")
+    assert respuesta.headers.get('Transfer-Encoding') == 'chunked', "La respuesta debe enviarse por fragmentos"
+    
+    print("\nSin servidor (pico de memoria y primer bloque por petición):")
+    picos = {}
+    for cantidad in (500, 4000):
+        cadena = generar_cadena(cantidad)
+        _, primero, _, pico = medir(generar_cadena_json(cadena))
+        _, primero_total, _, pico_total = medir(materializada(cadena))
+        picos[cantidad] = pico
+        print(f"  {cantidad} bloques: fragmentos {pico:.0f} KiB / {primero:.1f} ms, "
+              f"materializada {pico_total:.0f} KiB / {primero_total:.1f} ms")
+        assert pico < pico_total, "Enviar por fragmentos debe usar menos memoria"
+        assert primero < primero_total, "El primer bloque debe salir antes"
+        documento = json.loads(''.join(generar_cadena_json(cadena)))
+        assert documento['longitud'] == len(documento['cadena']) == cantidad, "Documento completo"
+    
+    assert picos[4000] < 2 * picos[500], "El pico de memoria no debe crecer con la cadena"
+    
+    print("\nResultado: PASS")
+
+
+def test_anuncio_bloques():
+    """Prueba 18: Anuncios de bloques entre nodos"""
+    seccion("PRUEBA 18: ANUNCIO DE BLOQUES")
+    
+    from blockchain import Bloque
+    from mineria import buscar_prueba
+    
+    punta = Bloque.desde_dict(requests.get(f"{BASE_URL}/cadena").json()['cadena'][-1])
+    prueba, _ = buscar_prueba(punta.prueba, punta.hash, trabajadores=1)
+    bloque = Bloque(punta.indice + 1, time(), [{"emisor": "0", "receptor": "vecino", "cantidad": 1}],
+                    prueba, punta.hash)
+    anuncio = {"bloque": bloque.to_dict(incluir_hash=True)}
+    
+    respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json=anuncio)
+    print(f"Bloque {bloque.indice} anunciado: {respuesta.json()['estado']}")
+    assert respuesta.json()['estado'] == 'anexado', "El bloque que enlaza con la punta se añade"
+    assert respuesta.json()['hash_punta'] == bloque.hash, "El bloque anunciado es la nueva punta"
+    
+    repetido = requests.post(f"{BASE_URL}/bloques/anunciar", json=anuncio).json()
+    print(f"Mismo anuncio otra vez: {repetido['estado']}")
+    assert repetido['estado'] == 'duplicado', "Los anuncios repetidos se descartan"
+    
+    falso = Bloque(bloque.indice + 1, time(), [], prueba, bloque.hash)
+    respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json={"bloque": falso.to_dict(incluir_hash=True)})
+    print(f"Bloque con Proof of Work inválido: HTTP {respuesta.status_code}")
+    assert respuesta.status_code == 400, "Un bloque inválido se rechaza"
+    
+    punta = bloque
+    prueba_siguiente, _ = buscar_prueba(punta.prueba, punta.hash, trabajadores=1)
+    for indice in (punta.indice + 5, -1):
+        saltado = Bloque(indice, time(), [], prueba_siguiente, punta.hash)
+        respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json={"bloque": saltado.to_dict(incluir_hash=True)})
+        print(f"Bloque con índice {indice} tras el {punta.indice}: HTTP {respuesta.status_code}")
+        assert respuesta.status_code == 400, "Un índice no consecutivo se rechaza aunque el PoW sea válido"
+
+    alterado = dict(anuncio['bloque'], hash="0" * 64)
+    respuesta = requests.post(f"{BASE_URL}/bloques/anunciar", json={"bloque": alterado})
+    assert respuesta.status_code == 400, "Un hash que no corresponde al bloque se rechaza"
+    
+    saldo = requests.get(f"{BASE_URL}/saldo/vecino").json()['saldo']
+    assert saldo >= 1, "El bloque anunciado actualiza los saldos"
+    
+    print("\nResultado: PASS")
+
+
+def test_validacion_paralela():
+    """Prueba 19: Validación paralela de la cadena"""
+    seccion("PRUEBA 19: VALIDACIÓN PARALELA")
+    
+    from benchmarks.bench_validacion import comprobar_enlace, corromper, generar_cadena
+    from blockchain import Blockchain, Bloque
+    from validacion import primer_invalido, primer_invalido_secuencial
+    
+    cadena = generar_cadena(3000, transacciones=2)
+    print(f"Cadena de prueba: {len(cadena)} bloques, trozos de 250 con 3 procesos")
+    
+    assert primer_invalido(cadena, comprobar_enlace, trabajadores=3, tamano_trozo=250) is None, \
+        "La cadena generada es válida"
+    
+    # Bordes de trozo incluidos: 250 es el primer bloque del segundo trozo
+    for posicion in (1, 249, 250, 251, 1777, 2999):
+        alterada = corromper(cadena, posicion)
+        esperado = primer_invalido_secuencial(alterada, comprobar_enlace)
+        obtenido = primer_invalido(alterada, comprobar_enlace, trabajadores=3, tamano_trozo=250)
+        print(f"  Bloque {posicion} alterado: secuencial {esperado}, paralelo {obtenido}")
+        assert obtenido == esperado, "El primer bloque inválido debe coincidir"
+    
+    alterada = corromper(corromper(cadena, 2500), 900)
+    assert primer_invalido(alterada, comprobar_enlace, trabajadores=3, tamano_trozo=250)[0] == 900, \
+        "Con varios bloques inválidos se devuelve el primero"
+    
+    servidor = [Bloque.desde_dict(bloque) for bloque in requests.get(f"{BASE_URL}/cadena").json()['cadena']]
+    nodo = Blockchain(trabajadores=3)
+    assert nodo.primer_bloque_invalido(servidor) is None, "La cadena del servidor es válida"
+
+    # Reparación al arrancar: se recorta justo antes del bloque inválido,
+    # no en el último punto de control, y el mempool queda vacío
+    import tempfile
+    from mineria import buscar_prueba
+    directorio = tempfile.mkdtemp()
+    en_disco = Blockchain(trabajadores=1, directorio_datos=directorio)
+    for cantidad in range(1, 6):
+        en_disco.nueva_transaccion("a", "b", cantidad)
+        ultimo = en_disco.ultimo_bloque
+        prueba, _ = buscar_prueba(ultimo.prueba, ultimo.hash, trabajadores=1)
+        # El cuarto bloque minado (posición 4) lleva una prueba inválida
+        en_disco.nuevo_bloque(prueba + (cantidad == 4))
+    reabierto = Blockchain(trabajadores=1, directorio_datos=directorio)
+    print(f"Cadena en disco: {len(en_disco.cadena)} bloques, reabierta con {len(reabierto.cadena)}")
+    assert len(reabierto.cadena) == 4, "Se conservan los bloques anteriores al inválido"
+    assert not reabierto.mempool, "Las transacciones descartadas no vuelven al mempool"
+    assert reabierto.saldos.saldo("b") == 1 + 2 + 3, "Los saldos corresponden a la cadena conservada"
+
+    print("\nResultado: PASS")
+
+
+def leer_metricas():
+    """Muestras de /metricas como diccionario {serie con etiquetas: valor}"""
+    texto = requests.get(f"{BASE_URL}/metricas").text
+    return {linea.rsplit(" ", 1)[0]: float(linea.rsplit(" ", 1)[1])
+            for linea in texto.splitlines() if linea and not linea.startswith("#")}
+
+
+def test_metricas():
+    """Prueba 20: Métricas en formato Prometheus"""
+    seccion("PRUEBA 20: MÉTRICAS")
+    
+    respuesta = requests.get(f"{BASE_URL}/metricas")
+    assert respuesta.headers['Content-Type'].startswith("text/plain; version=0.0.4"), \
+        "Debe usar el tipo de contenido de Prometheus"
+    antes = leer_metricas()
+    
+    requests.post(f"{BASE_URL}/transacciones/nueva", json={"emisor": "Eve", "receptor": "Bob", "cantidad": 2})
+    assert leer_metricas()['blockchain_mempool_transacciones'] >= 1, "El mempool debe reflejar la transacción"
+    requests.get(f"{BASE_URL}/minar")
+    despues = leer_metricas()
+    
+    for serie in ('blockchain_mineria_hashes_total', 'blockchain_mineria_hashes_por_segundo',
+                  'blockchain_altura', 'blockchain_mempool_bytes',
+                  'blockchain_validacion_segundos_por_bloque_count',
+                  'blockchain_consenso_ronda_segundos_count'):
+        print(f"  {serie} = {despues[serie]:g}")
+        assert serie in despues, f"Falta la serie {serie}"
+    
+    pow_encontrada = 'blockchain_pow_segundos_count{resultado="encontrada"}'
+    latencia_minar = 'blockchain_http_peticion_segundos_count{ruta="/minar",metodo="GET",codigo="200"}'
+    assert despues[pow_encontrada] == antes.get(pow_encontrada, 0) + 1, "Debe registrarse un Proof of Work"
+    assert despues['blockchain_mineria_hashes_total'] > antes['blockchain_mineria_hashes_total'], \
+        "Deben contarse los hashes calculados"
+    assert despues['blockchain_altura'] == antes['blockchain_altura'] + 1, "La altura debe aumentar"
+    assert despues[latencia_minar] == antes.get(latencia_minar, 0) + 1, "Debe medirse la latencia de /minar"
+    assert despues['blockchain_mempool_transacciones'] == 0, "El bloque vacía el mempool"
+    print(f"  {pow_encontrada} = {despues[pow_encontrada]:g}")
+
+    # Las consultas del consenso se agregan por fase, no por nodo vecino
+    requests.get(f"{BASE_URL}/nodos/resolver")
+    consultas = [serie for serie in leer_metricas() if serie.startswith("blockchain_consenso_")]
+    assert not any("nodo=" in serie for serie in consultas), "Las series no deben etiquetarse por nodo"
+    
+    print("\nResultado: PASS")
+
+
+def test_simulador():
+    """Prueba 21: Cluster de nodos simulado en un solo proceso"""
+    seccion("PRUEBA 21: CLUSTER SIMULADO")
+    
+    from simulador import Simulador
+    
+    resultado = Simulador(nodos=12, vecinos=3, semilla=7).ejecutar(bloques=6)
+    for clave in ('altura_final', 'bloques_huerfanos', 'convergencia_max_s',
+                  'rondas_consenso', 'bytes_por_ronda_consenso', 'tiempo_real_s'):
+        print(f"  {clave}: {resultado[clave]}")
+    
+    assert resultado['convergida'], "Todos los nodos deben acabar en la misma punta"
+    assert resultado['altura_final'] == resultado['bloques_minados'] - resultado['bloques_huerfanos'] + 1, \
+        "La cadena final contiene los bloques no huérfanos"
+    assert resultado['convergencia_max_s'] is not None, "Los bloques deben llegar a todos los nodos"
+    assert resultado['rondas_consenso'] > 0 and resultado['bytes_por_ronda_consenso'] > 0, \
+        "Debe medirse el tráfico del consenso"
+    
+    # Partición: el bloque solo llega a la mitad del minero hasta que se repara
+    simulador = Simulador(nodos=6, vecinos=2, semilla=3)
+    red = simulador.red
+    mitad_a, mitad_b = simulador.direcciones[:3], simulador.direcciones[3:]
+    red.particionar(mitad_a, mitad_b)
+    red.nodos['nodo0'].blockchain.minar_bloque('minero0')
+    red.ejecutar(5)
+    alturas = {direccion: len(red.nodos[direccion].blockchain.cadena) for direccion in simulador.direcciones}
+    print(f"  Alturas con la red partida: {alturas}")
+    assert all(alturas[direccion] == 2 for direccion in mitad_a), "La mitad del minero recibe el bloque"
+    assert all(alturas[direccion] == 1 for direccion in mitad_b), "La otra mitad no lo recibe"
+    
+    red.reparar()
+    red.nodos['nodo3'].blockchain.resolver_conflictos()
+    red.ejecutar(10)
+    alturas = {direccion: len(red.nodos[direccion].blockchain.cadena) for direccion in simulador.direcciones}
+    print(f"  Alturas tras reparar la red: {alturas}")
+    assert set(alturas.values()) == {2}, "Tras el consenso el bloque se propaga a toda la red"
+    
+    print("\nResultado: PASS")
+
+
+def test_fabrica_aplicaciones():
+    """Prueba 22: Fábrica de aplicaciones e importación ligera"""
+    seccion("PRUEBA 22: FÁBRICA DE APLICACIONES")
+    
+    import os
+    import subprocess
+    import sys
+    
+    # El intérprete nuevo debe encontrar blockchain.py aunque las pruebas
+    # se lancen desde otro directorio
+    programa = 'import sys, blockchain; print(sorted({"flask", "requests", "servidor"} & set(sys.modules)))'
+    cargados = subprocess.run([sys.executable, '-c', programa], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    print(f"  Módulos pesados tras import blockchain: {cargados}")
+    assert cargados == "[]", "import blockchain no debe cargar Flask, requests ni la API"
+    
+    from servidor import create_app
+    
+    app_a = create_app({'identificador': 'nodo-a', 'trabajadores': 1})
+    app_b = create_app({'identificador': 'nodo-b', 'trabajadores': 1})
+    assert app_a.extensions['nodo'].blockchain is not app_b.extensions['nodo'].blockchain, \
+        "Cada aplicación tiene su propia Blockchain"
+    
+    cliente_a, cliente_b = app_a.test_client(), app_b.test_client()
+    assert cliente_a.get("/").get_json()['nodo_id'] == 'nodo-a', "El identificador viene de la configuración"
+    cliente_a.post("/transacciones/nueva", json={"emisor": "Alice", "receptor": "Bob", "cantidad": 1})
+    pendientes_a = cliente_a.get("/mempool").get_json()['transacciones']
+    pendientes_b = cliente_b.get("/mempool").get_json()['transacciones']
+    print(f"  Transacciones pendientes: nodo-a {pendientes_a}, nodo-b {pendientes_b}")
+    assert pendientes_a == 1 and pendientes_b == 0, "Los nodos del mismo proceso no comparten estado"
+    
+    print("\nResultado: PASS")
+
+
 def ejecutar_todas_las_pruebas():
     """Ejecuta todas las pruebas en secuencia"""
     
@@ -228,6 +930,51 @@ def ejecutar_todas_las_pruebas():
         sleep(1)
         
         test_estadisticas()
+        sleep(1)
+        
+        test_punta_cadena()
+        sleep(1)
+        
+        test_kernel_pow()
+        sleep(1)
+        
+        test_lote_transacciones()
+        sleep(1)
+        
+        test_prueba_merkle()
+        sleep(1)
+        
+        test_saldos()
+        sleep(1)
+        
+        test_indices()
+        sleep(1)
+        
+        test_formato_binario()
+        sleep(1)
+        
+        test_cadena_columnar()
+        sleep(1)
+        
+        test_minero_segundo_plano()
+        sleep(1)
+        
+        test_cadena_fragmentos()
+        sleep(1)
+        
+        test_anuncio_bloques()
+        sleep(1)
+        
+        test_validacion_paralela()
+        sleep(1)
+        
+        test_metricas()
+        sleep(1)
+        
+        test_simulador()
+        sleep(1)
+        
+        test_fabrica_aplicaciones()
         
         # Resumen final
         print("\n")
@@ -244,6 +991,21 @@ def ejecutar_todas_las_pruebas():
         print("  [OK] Algoritmo de minado (PoW)")
         print("  [OK] Encadenamiento de bloques")
         print("  [OK] Integridad de la cadena")
+        print("  [OK] Punta de la cadena")
+        print("  [OK] Kernel de Proof of Work")
+        print("  [OK] Transacciones en lote")
+        print("  [OK] Pruebas de inclusión de Merkle")
+        print("  [OK] Saldos por dirección")
+        print("  [OK] Índices de transacciones y direcciones")
+        print("  [OK] Formato binario")
+        print("  [OK] Cadena columnar")
+        print("  [OK] Minado en segundo plano")
+        print("  [OK] /cadena por fragmentos")
+        print("  [OK] Anuncio de bloques")
+        print("  [OK] Validación paralela")
+        print("  [OK] Métricas")
+        print("  [OK] Cluster simulado")
+        print("  [OK] Fábrica de aplicaciones")
         print()
         print("El sistema blockchain está funcionando correctamente.")
         print()
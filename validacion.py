@@ -0,0 +1,128 @@
+"""
+Validación Paralela - Blockchain Educativo
+==========================================
+Validación de cadenas largas repartida entre varios procesos
+
+Componentes:
+- Validación secuencial de referencia: primer bloque inválido
+- División de la cadena en trozos consecutivos que se solapan en un
+  bloque (el último del trozo anterior), de modo que cada enlace se
+  comprueba exactamente una vez
+- Pool de procesos que valida los trozos en paralelo
+- Resultados consumidos en orden: el primer bloque inválido es siempre
+  el mismo que devolvería la validación secuencial
+
+Cada comprobación depende solo de dos bloques consecutivos (hash y prueba
+del anterior, campos del actual), así que los trozos son independientes.
+Las reglas concretas las aplica la función comprobar que se recibe como
+argumento (Blockchain.motivo_invalido), que debe poder enviarse a otro
+proceso.
+"""
+
+import os
+from collections import deque
+
+# Bloques que valida un trabajador en cada tarea
+TAMANO_TROZO = 2000
+
+# Con menos trozos que estos no compensa arrancar procesos
+MIN_TROZOS_PARALELO = 2
+
+
+def primer_invalido_secuencial(cadena, comprobar, inicio=1):
+    """
+    Busca el primer bloque que no enlaza correctamente con el anterior.
+
+    Args:
+        cadena: Secuencia de bloques
+        comprobar: Función (bloque anterior, bloque) -> motivo del error o None
+        inicio: Primera posición a validar; las anteriores se consideran válidas
+
+    Returns:
+        tuple: (posición, motivo) del primer bloque inválido, o None si
+        todos los bloques desde inicio son válidos
+    """
+    posicion = max(inicio, 1)
+    if posicion >= len(cadena):
+        return None
+
+    # Solo se accede a los bloques desde inicio - 1 (la cadena puede ser perezosa)
+    anterior = cadena[posicion - 1]
+    while posicion < len(cadena):
+        bloque = cadena[posicion]
+        motivo = comprobar(anterior, bloque)
+        if motivo is not None:
+            return posicion, motivo
+        anterior = bloque
+        posicion += 1
+    return None
+
+
+def _validar_trozo(comprobar, bloques, desplazamiento):
+    """
+    Tarea de un trabajador: valida un trozo cuyo primer bloque es el último
+    del trozo anterior (ya validado).
+
+    Returns:
+        tuple: (posición en la cadena, motivo) del primer bloque inválido, o None
+    """
+    resultado = primer_invalido_secuencial(bloques, comprobar)
+    if resultado is None:
+        return None
+    posicion, motivo = resultado
+    return desplazamiento + posicion, motivo
+
+
+def primer_invalido(cadena, comprobar, inicio=1, trabajadores=None, tamano_trozo=TAMANO_TROZO):
+    """
+    Igual que primer_invalido_secuencial, repartiendo la cadena en trozos
+    entre varios procesos.
+
+    Los trozos se envían en orden con una ventana acotada (la memoria no
+    depende de la longitud de la cadena) y sus resultados se recogen en el
+    mismo orden: en cuanto un trozo contiene un bloque inválido, todos los
+    anteriores ya se han comprobado válidos, así que ese es el primero. Los
+    trozos posteriores se cancelan.
+
+    Args:
+        cadena: Secuencia de bloques (se envían a otros procesos con pickle)
+        comprobar: Función (bloque anterior, bloque) -> motivo o None,
+            definida a nivel de módulo o de clase
+        inicio: Primera posición a validar
+        trabajadores: Procesos a utilizar (por defecto os.cpu_count())
+        tamano_trozo: Bloques validados por tarea
+
+    Returns:
+        tuple: (posición, motivo) del primer bloque inválido, o None
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    inicio = max(inicio, 1)
+    longitud = len(cadena)
+    if trabajadores == 1 or longitud - inicio < MIN_TROZOS_PARALELO * tamano_trozo:
+        return primer_invalido_secuencial(cadena, comprobar, inicio)
+
+    # multiprocessing solo se importa si hace falta el pool
+    from concurrent.futures import ProcessPoolExecutor
+
+    trozos = iter(range(inicio, longitud, tamano_trozo))
+    pendientes = deque()
+
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        def enviar():
+            desde = next(trozos, None)
+            if desde is not None:
+                bloques = cadena[desde - 1:min(desde + tamano_trozo, longitud)]
+                pendientes.append(pool.submit(_validar_trozo, comprobar, bloques, desde - 1))
+
+        for _ in range(trabajadores * 2):
+            enviar()
+
+        while pendientes:
+            resultado = pendientes.popleft().result()
+            if resultado is not None:
+                for futuro in pendientes:
+                    futuro.cancel()
+                return resultado
+            enviar()
+
+    return None